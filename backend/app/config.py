@@ -1,5 +1,6 @@
 from functools import lru_cache
 from pathlib import Path
+from typing import List
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -17,20 +18,61 @@ class Settings(BaseSettings):
     )
 
     database_url: str = "sqlite:///./storycircle.db"
+    # JSON list of read-replica URLs; empty means every read goes to database_url.
+    database_replica_urls: List[str] = []
+    read_your_writes_seconds: float = 5.0
+    # Workers upgrade the schema at startup (serialized by a lock). Set false when a release step
+    # runs `alembic upgrade head` instead; workers then refuse to start on an outdated schema.
+    migrate_on_startup: bool = True
     storage_dir: Path = Path("storage/audio")
+    # Uploads are transcoded to Opus in the background when this ffmpeg binary is on PATH.
+    ffmpeg_path: str = "ffmpeg"
+    audio_bitrate_kbps: int = 24
+    audio_waveform_peaks: int = 128
+    audio_timeout_seconds: float = 300.0
+    # POST /stories waits this long for the waveform; longer decodes move to the background task
+    audio_probe_timeout_seconds: float = 5.0
+    # Storage reconciliation (services/storage_gc.py): unreferenced audio and audio of removed
+    # stories is quarantined after the grace period and deleted after the quarantine period.
+    storage_gc_interval_hours: float = 24.0  # 0 disables the periodic run
+    storage_gc_grace_hours: float = 24.0
+    storage_gc_quarantine_hours: float = 168.0  # 0 deletes instead of quarantining
     elevenlabs_api_key: str = ""
     elevenlabs_voice_id: str = ""
     elevenlabs_agent_id: str = "agent_5601ka2ded7yfj4b3dv8v5k32srr"
     openai_api_key: str = ""
     openai_model: str = "gpt-5-mini"
     openai_reasoning_effort: str = "low"
+    # sentence-transformers model for story embeddings; empty uses the built-in hashing TF-IDF embedder
+    embedding_model: str = ""
+    embedding_index_ttl_seconds: float = 300.0
+    # Transcript enrichment (services/enrichment.py): generated tags are appended to the user's up
+    # to this many in total; the model path sends a whole batch in one request and needs the key.
+    enrichment_max_tags: int = 5
+    enrichment_batch_size: int = 20
+    enrichment_use_llm: bool = False
+    # tags in use are re-aggregated at most this often per worker for matching generated tags
+    enrichment_vocabulary_ttl_seconds: float = 300.0
+    # similar stories: weight of text similarity vs. tag overlap (0-1)
+    similar_vector_weight: float = 0.7
     admin_token: str = ""  # simple hackathon auth
+    # Distinct reporters needed before a story is flagged for review / pulled from public listings.
+    report_flag_threshold: int = 1
+    report_hide_threshold: int = 3
+    # Throttling of POST /react and /report per client token and per IP; 0 disables a limit.
+    # A redis:// URL shares the counters between workers (empty keeps them per worker).
+    rate_limit_url: str = ""
+    rate_limit_reactions_per_minute: int = 30
+    rate_limit_reports_per_hour: int = 10
+    rate_limit_ip_writes_per_minute: int = 120
+    # Reaction deltas on /stories/{id}/live are coalesced for this long before they are sent.
+    live_reaction_flush_ms: int = 250
     share_token_secret: str = "change-me"
     base_url: str = "http://localhost:8000"
+    slow_request_threshold_ms: float = 1000.0  # 0 disables slow-request logging
 
 
 @lru_cache
 def get_settings() -> Settings:
-    settings = Settings()
-    settings.storage_dir.mkdir(parents=True, exist_ok=True)
-    return settings
+    # No filesystem side effects here: storage is created on first write (services/storage.py).
+    return Settings()
@@ -1,28 +1,195 @@
 from __future__ import annotations
 
+import itertools
+import math
+import sqlite3
+import time
 from contextlib import contextmanager
-from typing import Iterator
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional
 
-from sqlmodel import Session, SQLModel, create_engine
+from fastapi import Request
+from sqlalchemy import event, inspect, text
+from sqlalchemy.engine import Engine
+from sqlmodel import Session, create_engine
 
 from .config import get_settings
 
 
-_settings = get_settings()
-connect_args = {}
-if _settings.database_url.startswith("sqlite"):
-    connect_args = {"check_same_thread": False}
+MIGRATIONS_DIR = Path(__file__).resolve().parent / "migrations"
+# Revision matching the tables the prototype created with create_all before migrations existed.
+BASELINE_REVISION = "0001"
 
-db_engine = create_engine(_settings.database_url, connect_args=connect_args)
+# pg_try_advisory_lock key shared by every worker and `alembic upgrade`; any constant works.
+MIGRATION_LOCK_KEY = 0x5C0A11
+MIGRATION_LOCK_POLL_SECONDS = 0.5
 
+# Cookie set after a successful write; until it expires the client's reads stay on the primary.
+PRIMARY_STICKY_COOKIE = "storycircle_primary_until"
+WRITE_METHODS = frozenset({"POST", "PUT", "PATCH", "DELETE"})
 
-def init_db() -> None:
-    SQLModel.metadata.create_all(db_engine)
+# Built on first use so importing the app stays cheap; tests may assign their own engines here.
+db_engine: Optional[Engine] = None
+replica_engines: Optional[List[Engine]] = None
+_replica_cycle = itertools.count()
+
+
+def _sqlite_math_functions(dbapi_connection, connection_record) -> None:
+    # SQLite builds without SQLITE_ENABLE_MATH_FUNCTIONS lack ln()/exp() (used by trending scores)
+    try:
+        dbapi_connection.execute("SELECT ln(1), exp(0)")
+    except sqlite3.OperationalError:
+        dbapi_connection.create_function("ln", 1, math.log, deterministic=True)
+        dbapi_connection.create_function("exp", 1, math.exp, deterministic=True)
+
+
+def install_sqlite_functions(engine: Engine) -> None:
+    if engine.dialect.name == "sqlite" and not event.contains(engine, "connect", _sqlite_math_functions):
+        event.listen(engine, "connect", _sqlite_math_functions)
+
+
+def _create_engine(url: str) -> Engine:
+    connect_args = {}
+    if url.startswith("sqlite"):
+        connect_args = {"check_same_thread": False}
+    engine = create_engine(url, connect_args=connect_args)
+    install_sqlite_functions(engine)
+    return engine
+
+
+def get_engine() -> Engine:
+    global db_engine
+    if db_engine is None:
+        db_engine = _create_engine(get_settings().database_url)
+    return db_engine
+
+
+def get_replica_engines() -> List[Engine]:
+    global replica_engines
+    if replica_engines is None:
+        replica_engines = [_create_engine(url) for url in get_settings().database_replica_urls]
+    return replica_engines
+
+
+def get_read_engine(prefer_primary: bool = False) -> Engine:
+    """Round-robin over the replicas; the primary when none are configured or stickiness applies."""
+    replicas = get_replica_engines()
+    if prefer_primary or not replicas:
+        return get_engine()
+    return replicas[next(_replica_cycle) % len(replicas)]
+
+
+def _alembic_config(connection=None):
+    from alembic.config import Config
+
+    config = Config()
+    config.set_main_option("script_location", str(MIGRATIONS_DIR))
+    config.attributes["connection"] = connection
+    return config
+
+
+@contextmanager
+def file_lock(path: Path, blocking: bool = True) -> Iterator[bool]:
+    """Hold an exclusive ``flock`` on ``path`` between processes sharing its filesystem.
+
+    Yields whether the lock is held: without ``blocking``, False when another holder has it.
+    """
+    try:
+        import fcntl
+    except ImportError:  # Windows: single-process development only
+        yield True
+        return
+    with open(path, "a") as lock_file:
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+@contextmanager
+def migration_lock(engine: Engine) -> Iterator[None]:
+    """Let one process at a time upgrade the schema: workers starting together, or a release step.
+
+    PostgreSQL uses a session advisory lock, polled on an autocommit connection: a backend blocked
+    in ``pg_advisory_lock`` keeps a snapshot open, which ``CREATE INDEX CONCURRENTLY`` in the
+    holder would wait for. File-backed SQLite uses an ``flock`` next to the database file.
+    """
+    if engine.dialect.name == "postgresql":
+        with engine.connect() as connection:
+            connection.execution_options(isolation_level="AUTOCOMMIT")
+            lock = text("SELECT pg_try_advisory_lock(:key)")
+            while not connection.execute(lock, {"key": MIGRATION_LOCK_KEY}).scalar():
+                time.sleep(MIGRATION_LOCK_POLL_SECONDS)
+            try:
+                yield
+            finally:
+                connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": MIGRATION_LOCK_KEY})
+        return
+    database = engine.url.database
+    if engine.dialect.name != "sqlite" or not database or database == ":memory:":
+        yield
+        return
+    with file_lock(Path(f"{database}.migrate-lock")):
+        yield
+
+
+def _revisions(connection) -> tuple:
+    from alembic.runtime.migration import MigrationContext
+    from alembic.script import ScriptDirectory
+
+    head = ScriptDirectory.from_config(_alembic_config(connection)).get_current_head()
+    current = MigrationContext.configure(connection).get_current_revision()
+    legacy = current is None and inspect(connection).has_table("stories")
+    # release the read transaction so each revision can manage (or autocommit) its own
+    connection.commit()
+    return head, current, legacy
+
+
+def init_db(engine: Optional[Engine] = None) -> bool:
+    """Bring the schema to the latest Alembic revision; a no-op when it is already there.
+
+    Returns True when migrations were applied. Upgrades run under ``migration_lock``, so of several
+    workers starting at once one migrates and the others find the schema current. Databases
+    created by ``create_all`` before migrations existed (tables but no ``alembic_version``) are
+    adopted at the baseline first.
+    """
+    from alembic import command
+
+    engine = engine or get_engine()
+    with engine.connect() as connection:
+        head, current, _ = _revisions(connection)
+    if current == head:
+        return False
+    with migration_lock(engine), engine.connect() as connection:
+        # checked again under the lock: another worker may have upgraded meanwhile
+        head, current, legacy = _revisions(connection)
+        if current == head:
+            return False
+        config = _alembic_config(connection)
+        if legacy:
+            command.stamp(config, BASELINE_REVISION)
+            connection.commit()
+        command.upgrade(config, "head")
+        connection.commit()
+    return True
+
+
+def require_current_schema(engine: Optional[Engine] = None) -> None:
+    """For workers that do not migrate: refuse to serve a schema behind the code."""
+    with (engine or get_engine()).connect() as connection:
+        head, current, _ = _revisions(connection)
+    if current != head:
+        raise RuntimeError(f"database schema is at {current}, the code needs {head}: run `alembic upgrade head`")
 
 
 @contextmanager
 def session_scope() -> Iterator[Session]:
-    session = Session(db_engine)
+    session = Session(get_engine())
     try:
         yield session
         session.commit()
@@ -34,5 +201,50 @@ def session_scope() -> Iterator[Session]:
 
 
 def get_session() -> Iterator[Session]:
-    with Session(db_engine) as session:
+    with Session(get_engine()) as session:
         yield session
+
+
+def _recently_wrote(request: Request) -> bool:
+    try:
+        return float(request.cookies.get(PRIMARY_STICKY_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+def get_read_session(request: Request) -> Iterator[Session]:
+    """Session for read-only endpoints: a replica unless this client wrote within the sticky window."""
+    with Session(get_read_engine(prefer_primary=_recently_wrote(request))) as session:
+        yield session
+
+
+class ReadYourWritesMiddleware:
+    """Marks clients that just wrote so their following reads skip (possibly lagging) replicas."""
+
+    def __init__(self, app, window_seconds: float, read_only_paths: Iterable[str] = ()) -> None:
+        self.app = app
+        self.window_seconds = window_seconds
+        # POST endpoints that only read (e.g. batch lookups) must not pin the client to the primary
+        self.read_only_paths = frozenset(read_only_paths)
+
+    async def __call__(self, scope, receive, send) -> None:
+        if (
+            scope["type"] != "http"
+            or scope["method"] not in WRITE_METHODS
+            or scope["path"] in self.read_only_paths
+            or not get_replica_engines()
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message) -> None:
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                until = time.time() + self.window_seconds
+                cookie = (
+                    f"{PRIMARY_STICKY_COOKIE}={until:.3f}; Max-Age={int(self.window_seconds) + 1}; "
+                    "Path=/; HttpOnly; SameSite=Lax"
+                )
+                message = {**message, "headers": [*message.get("headers", []), (b"set-cookie", cookie.encode("latin-1"))]}
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
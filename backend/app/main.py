@@ -1,17 +1,54 @@
 from __future__ import annotations
 
+import asyncio
+import contextlib
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 
 from .config import get_settings
-from .database import init_db
-from .routers import admin, stories, conversations
-from .services.storage import ensure_storage_root
+from .database import ReadYourWritesMiddleware, get_engine, get_replica_engines, init_db, require_current_schema
+from .routers import admin, stories, conversations, metrics
+from .services.live import get_reaction_hub
+from .services.metrics import MetricsMiddleware, instrument_engine
+from .services.storage_gc import run_periodic_reconciliation
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    # Engine, schema check and instrumentation happen per worker at startup, not at import.
+    engine = get_engine()
+    instrument_engine(engine)
+    # replicas are migrated by replication from the primary; only instrument them
+    for replica in get_replica_engines():
+        instrument_engine(replica)
+    settings = get_settings()
+    if settings.migrate_on_startup:
+        init_db(engine)
+    else:
+        require_current_schema(engine)
+    tasks = [asyncio.create_task(get_reaction_hub().run(settings.live_reaction_flush_ms / 1000))]
+    if settings.storage_gc_interval_hours > 0:
+        tasks.append(asyncio.create_task(run_periodic_reconciliation(settings.storage_gc_interval_hours * 3600)))
+    yield
+    for task in tasks:
+        task.cancel()
+    for task in tasks:
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
 
 
 def create_app() -> FastAPI:
     settings = get_settings()
-    app = FastAPI(title="StoryCircle Backend", version="0.1.0")
+    app = FastAPI(
+        title="StoryCircle Backend",
+        version="0.1.0",
+        lifespan=lifespan,
+        default_response_class=ORJSONResponse,
+    )
 
     app.add_middleware(
         CORSMiddleware,
@@ -20,15 +57,17 @@ def create_app() -> FastAPI:
         allow_methods=["*"],
         allow_headers=["*"],
     )
-
-    @app.on_event("startup")
-    def _startup() -> None:
-        init_db()
-        ensure_storage_root()
+    app.add_middleware(
+        ReadYourWritesMiddleware,
+        window_seconds=settings.read_your_writes_seconds,
+        read_only_paths={"/stories/batch"},
+    )
+    app.add_middleware(MetricsMiddleware, slow_request_threshold_ms=settings.slow_request_threshold_ms)
 
     app.include_router(stories.router)
     app.include_router(conversations.router)
     app.include_router(admin.router)
+    app.include_router(metrics.router)
 
     @app.get("/")
     def health() -> dict:
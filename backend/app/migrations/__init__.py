@@ -0,0 +1,15 @@
+"""Alembic revisions for the StoryCircle schema (applied by ``app.database.init_db``)."""
+from __future__ import annotations
+
+from typing import Callable
+
+from ..models import POSTGRES_ONLY_INDEXES
+
+
+def include_object_for(dialect_name: str) -> Callable[..., bool]:
+    """Autogenerate filter hiding dialect-specific indexes from other dialects."""
+
+    def include_object(obj, name, type_, reflected, compare_to) -> bool:
+        return not (type_ == "index" and name in POSTGRES_ONLY_INDEXES and dialect_name != "postgresql")
+
+    return include_object
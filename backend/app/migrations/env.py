@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+from logging.config import fileConfig
+
+from alembic import context
+from sqlmodel import SQLModel
+
+from app import models  # noqa: F401 - registers the tables on SQLModel.metadata
+from app.database import get_engine, migration_lock
+from app.migrations import include_object_for
+
+config = context.config
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name, disable_existing_loggers=False)
+
+target_metadata = SQLModel.metadata
+
+
+def _configure(connection) -> None:
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        include_object=include_object_for(connection.dialect.name),
+        # each revision commits on its own so revisions with autocommit blocks (CONCURRENTLY) can run
+        transaction_per_migration=True,
+        # SQLite cannot ALTER most constraints in place; batch mode rebuilds the table instead.
+        render_as_batch=connection.dialect.name == "sqlite",
+    )
+
+
+def run_migrations_online() -> None:
+    # init_db hands over its own connection (outside any transaction) instead of a URL.
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        _configure(connection)
+        with context.begin_transaction():
+            context.run_migrations()
+        return
+
+    # `alembic upgrade` as a release step: wait for any worker that is migrating
+    with migration_lock(get_engine()), get_engine().connect() as connection:
+        _configure(connection)
+        with context.begin_transaction():
+            context.run_migrations()
+        connection.commit()
+
+
+if context.is_offline_mode():
+    raise SystemExit("Offline (--sql) migrations are not supported; run against a database.")
+run_migrations_online()
@@ -0,0 +1,83 @@
+"""Baseline: the schema the hackathon prototype created with ``create_all``.
+
+Revision ID: 0001
+Revises:
+Create Date: 2025-11-15
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "stories",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("title", sqlmodel.sql.sqltypes.AutoString(length=255), nullable=False),
+        sa.Column("text", sa.String(), server_default="", nullable=False),
+        sa.Column("raw_transcript", sa.String(), server_default="", nullable=False),
+        sa.Column("abstract", sqlmodel.sql.sqltypes.AutoString(length=512), nullable=True),
+        sa.Column("audio_url", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("visibility", sa.Enum("private", "link", "public_anon", name="visibility"), nullable=True),
+        sa.Column("age_range", sqlmodel.sql.sqltypes.AutoString(length=32), nullable=True),
+        sa.Column("city", sqlmodel.sql.sqltypes.AutoString(length=64), nullable=True),
+        sa.Column("tags", sa.JSON(), server_default="[]", nullable=False),
+        sa.Column("share_token", sa.String(), nullable=True),
+        sa.Column("consent_choice", sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+        sa.Column("consent_timestamp", sa.DateTime(), nullable=True),
+        sa.Column(
+            "moderation_status",
+            sa.Enum("ok", "flagged", "removed", name="moderationstatus"),
+            server_default="ok",
+            nullable=True,
+        ),
+        sa.Column("created_at", sa.DateTime(), server_default=sa.func.now(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), server_default=sa.func.now(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_stories_share_token", "stories", ["share_token"], unique=True)
+
+    op.create_table(
+        "reactions",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("story_id", sa.Integer(), nullable=False),
+        sa.Column("type", sa.Enum("heart", "thanks", "star", name="reactiontype"), nullable=True),
+        sa.Column("client_hash", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), server_default=sa.func.now(), nullable=False),
+        sa.ForeignKeyConstraint(["story_id"], ["stories.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_reactions_client_hash", "reactions", ["client_hash"])
+
+    op.create_table(
+        "reports",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("story_id", sa.Integer(), nullable=False),
+        sa.Column("reason", sqlmodel.sql.sqltypes.AutoString(length=500), nullable=False),
+        sa.Column("client_hash", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("handled", sa.Boolean(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), server_default=sa.func.now(), nullable=False),
+        sa.ForeignKeyConstraint(["story_id"], ["stories.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_reports_client_hash", "reports", ["client_hash"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_reports_client_hash", table_name="reports")
+    op.drop_table("reports")
+    op.drop_index("ix_reactions_client_hash", table_name="reactions")
+    op.drop_table("reactions")
+    op.drop_index("ix_stories_share_token", table_name="stories")
+    op.drop_table("stories")
+    sa.Enum(name="reactiontype").drop(op.get_bind(), checkfirst=True)
+    sa.Enum(name="moderationstatus").drop(op.get_bind(), checkfirst=True)
+    sa.Enum(name="visibility").drop(op.get_bind(), checkfirst=True)
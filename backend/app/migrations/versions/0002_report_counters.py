@@ -0,0 +1,64 @@
+"""Distinct-reporter counters on stories and one report per client per story.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2025-11-16
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    # Databases built with create_all after the counters landed already carry them; only add what's missing.
+    story_columns = {column["name"] for column in inspector.get_columns("stories")}
+
+    if bind.dialect.name == "postgresql":
+        with op.get_context().autocommit_block():
+            op.execute("ALTER TYPE moderationstatus ADD VALUE IF NOT EXISTS 'hidden'")
+
+    with op.batch_alter_table("stories") as batch:
+        if "report_count" not in story_columns:
+            batch.add_column(sa.Column("report_count", sa.Integer(), server_default="0", nullable=False))
+        if "first_reported_at" not in story_columns:
+            batch.add_column(sa.Column("first_reported_at", sa.DateTime(), nullable=True))
+        if "last_reported_at" not in story_columns:
+            batch.add_column(sa.Column("last_reported_at", sa.DateTime(), nullable=True))
+
+    # keep the earliest report per (story, client) so the unique constraint can be enforced
+    op.execute(
+        "DELETE FROM reports WHERE id NOT IN "
+        "(SELECT keep_id FROM (SELECT MIN(id) AS keep_id FROM reports GROUP BY story_id, client_hash) AS firsts)"
+    )
+    unique_constraints = {constraint["name"] for constraint in inspector.get_unique_constraints("reports")}
+    if "uq_reports_story_client" not in unique_constraints:
+        with op.batch_alter_table("reports") as batch:
+            batch.create_unique_constraint("uq_reports_story_client", ["story_id", "client_hash"])
+
+    op.execute(
+        """
+        UPDATE stories SET
+            report_count = (SELECT COUNT(*) FROM reports WHERE reports.story_id = stories.id),
+            first_reported_at = (SELECT MIN(created_at) FROM reports WHERE reports.story_id = stories.id),
+            last_reported_at = (SELECT MAX(created_at) FROM reports WHERE reports.story_id = stories.id)
+        """
+    )
+
+
+def downgrade() -> None:
+    # PostgreSQL cannot drop enum values; 'hidden' stays in moderationstatus.
+    with op.batch_alter_table("reports") as batch:
+        batch.drop_constraint("uq_reports_story_client", type_="unique")
+    with op.batch_alter_table("stories") as batch:
+        batch.drop_column("last_reported_at")
+        batch.drop_column("first_reported_at")
+        batch.drop_column("report_count")
@@ -0,0 +1,42 @@
+"""Indexes for the lookups the routers issue on every request.
+
+- ``ix_stories_feed``: public wall / similar stories filter on visibility + moderation status and
+  order by ``created_at``.
+- ``ix_reactions_story_type``: per-story reaction counts grouped by type.
+- ``ix_reports_open``: open-report listing and the moderation queue aggregate.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2025-11-16
+"""
+from __future__ import annotations
+
+from alembic import op
+
+
+INDEXES = [
+    ("ix_stories_feed", "stories", ["visibility", "moderation_status", "created_at"]),
+    ("ix_reactions_story_type", "reactions", ["story_id", "type"]),
+    ("ix_reports_open", "reports", ["handled", "story_id"]),
+]
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        # CONCURRENTLY avoids locking writes on a live table but cannot run inside a transaction
+        with op.get_context().autocommit_block():
+            for name, table, columns in INDEXES:
+                op.create_index(name, table, columns, postgresql_concurrently=True, if_not_exists=True)
+        return
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns)
+
+
+def downgrade() -> None:
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
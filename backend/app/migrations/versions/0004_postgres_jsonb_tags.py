@@ -0,0 +1,60 @@
+"""PostgreSQL: store tags as JSONB with a GIN index for containment/overlap filters.
+
+No-op on SQLite, where tags stay JSON and tag filters use ``json_each``.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2025-11-17
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    # the json default cannot be cast in place; drop it around the type change
+    op.alter_column("stories", "tags", server_default=None)
+    op.alter_column(
+        "stories",
+        "tags",
+        type_=postgresql.JSONB(),
+        existing_type=sa.JSON(),
+        existing_nullable=False,
+        postgresql_using="tags::jsonb",
+    )
+    op.alter_column("stories", "tags", server_default="[]")
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_stories_tags_gin",
+            "stories",
+            ["tags"],
+            postgresql_using="gin",
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.drop_index("ix_stories_tags_gin", table_name="stories")
+    op.alter_column("stories", "tags", server_default=None)
+    op.alter_column(
+        "stories",
+        "tags",
+        type_=sa.JSON(),
+        existing_type=postgresql.JSONB(),
+        existing_nullable=False,
+        postgresql_using="tags::json",
+    )
+    op.alter_column("stories", "tags", server_default="[]")
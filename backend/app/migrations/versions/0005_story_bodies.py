@@ -0,0 +1,126 @@
+"""Move story text and raw transcript out of ``stories`` into compressed ``story_bodies``.
+
+Rows are copied in id-ordered batches so large tables never sit in memory at once. SQLite only
+returns the freed pages to the filesystem after a ``VACUUM``. The codecs are copied from
+``app/services/compression.py`` as it was at this revision, so later changes there cannot alter
+what this migration writes.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2025-11-18
+"""
+from __future__ import annotations
+
+import zlib
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - depends on the environment
+    zstandard = None
+
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 500
+ZSTD_LEVEL = 9
+ZLIB_LEVEL = 6
+CODEC = "zstd" if zstandard is not None else "zlib"
+
+stories = sa.table(
+    "stories", sa.column("id", sa.Integer), sa.column("text", sa.String), sa.column("raw_transcript", sa.String)
+)
+story_bodies = sa.table(
+    "story_bodies",
+    sa.column("story_id", sa.Integer),
+    sa.column("codec", sa.String),
+    sa.column("text", sa.LargeBinary),
+    sa.column("raw_transcript", sa.LargeBinary),
+)
+
+
+def compress_text(value: str) -> bytes:
+    data = (value or "").encode("utf-8")
+    if CODEC == "zstd":
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    return zlib.compress(data, ZLIB_LEVEL)
+
+
+def decompress_text(blob: bytes, codec: str) -> str:
+    if not blob:
+        return ""
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("Reading zstd-compressed text requires the 'zstandard' package")
+        return zstandard.ZstdDecompressor().decompress(blob).decode("utf-8")
+    return zlib.decompress(blob).decode("utf-8")
+
+
+def _batches(bind, query, key):
+    last_id = 0
+    while True:
+        rows = bind.execute(query.where(key > last_id).order_by(key).limit(BATCH_SIZE)).all()
+        if not rows:
+            return
+        yield rows
+        last_id = rows[-1][0]
+
+
+def upgrade() -> None:
+    op.create_table(
+        "story_bodies",
+        sa.Column("story_id", sa.Integer(), nullable=False),
+        sa.Column("codec", sqlmodel.sql.sqltypes.AutoString(length=8), nullable=False),
+        sa.Column("text", sa.LargeBinary(), nullable=False),
+        sa.Column("raw_transcript", sa.LargeBinary(), nullable=False),
+        sa.ForeignKeyConstraint(["story_id"], ["stories.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("story_id"),
+    )
+
+    bind = op.get_bind()
+    query = sa.select(stories.c.id, stories.c.text, stories.c.raw_transcript).where(
+        sa.or_(stories.c.text != "", stories.c.raw_transcript != "")
+    )
+    for rows in _batches(bind, query, stories.c.id):
+        bind.execute(
+            story_bodies.insert(),
+            [
+                {
+                    "story_id": story_id,
+                    "codec": CODEC,
+                    "text": compress_text(text),
+                    "raw_transcript": compress_text(raw_transcript),
+                }
+                for story_id, text, raw_transcript in rows
+            ],
+        )
+
+    with op.batch_alter_table("stories") as batch:
+        batch.drop_column("text")
+        batch.drop_column("raw_transcript")
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("stories") as batch:
+        batch.add_column(sa.Column("text", sa.String(), server_default="", nullable=False))
+        batch.add_column(sa.Column("raw_transcript", sa.String(), server_default="", nullable=False))
+
+    bind = op.get_bind()
+    query = sa.select(
+        story_bodies.c.story_id, story_bodies.c.codec, story_bodies.c.text, story_bodies.c.raw_transcript
+    )
+    for rows in _batches(bind, query, story_bodies.c.story_id):
+        for story_id, codec, text, raw_transcript in rows:
+            bind.execute(
+                stories.update()
+                .where(stories.c.id == story_id)
+                .values(text=decompress_text(text, codec), raw_transcript=decompress_text(raw_transcript, codec))
+            )
+
+    op.drop_table("story_bodies")
@@ -0,0 +1,32 @@
+"""Audio pipeline results on stories: size, duration, waveform peaks, processed timestamp.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2025-11-18
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("stories") as batch:
+        batch.add_column(sa.Column("audio_size_bytes", sa.Integer(), nullable=True))
+        batch.add_column(sa.Column("audio_duration_seconds", sa.Float(), nullable=True))
+        batch.add_column(sa.Column("audio_peaks", sa.LargeBinary(), nullable=True))
+        batch.add_column(sa.Column("audio_processed_at", sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("stories") as batch:
+        batch.drop_column("audio_processed_at")
+        batch.drop_column("audio_peaks")
+        batch.drop_column("audio_duration_seconds")
+        batch.drop_column("audio_size_bytes")
@@ -0,0 +1,41 @@
+"""Sample rate next to the duration and waveform measured at upload.
+
+Peaks written by revision 0006's pipeline were unsigned bytes (0-255); they are rescaled to the
+packed int8 range (0-127) the API now exposes.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2025-11-19
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+
+stories = sa.table("stories", sa.column("id", sa.Integer), sa.column("audio_peaks", sa.LargeBinary))
+
+
+def _rescale_peaks(convert) -> None:
+    bind = op.get_bind()
+    rows = bind.execute(sa.select(stories.c.id, stories.c.audio_peaks).where(stories.c.audio_peaks.is_not(None)))
+    for story_id, peaks in rows.all():
+        bind.execute(stories.update().where(stories.c.id == story_id).values(audio_peaks=convert(peaks)))
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("stories") as batch:
+        batch.add_column(sa.Column("audio_sample_rate", sa.Integer(), nullable=True))
+    _rescale_peaks(lambda peaks: bytes(round(value * 127 / 255) for value in peaks))
+
+
+def downgrade() -> None:
+    _rescale_peaks(lambda peaks: bytes(round(value * 255 / 127) for value in peaks))
+    with op.batch_alter_table("stories") as batch:
+        batch.drop_column("audio_sample_rate")
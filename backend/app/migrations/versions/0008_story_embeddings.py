@@ -0,0 +1,36 @@
+"""Float32 text embeddings for similar-story recommendations.
+
+The table starts empty: embedding needs the app's embedder, so existing stories are embedded by
+``POST /admin/embeddings/backfill`` (``backfill_embeddings``) after the upgrade rather than here.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2025-11-19
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "story_embeddings",
+        sa.Column("story_id", sa.Integer(), nullable=False),
+        sa.Column("model", sqlmodel.sql.sqltypes.AutoString(length=64), nullable=False),
+        sa.Column("vector", sa.LargeBinary(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["story_id"], ["stories.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("story_id"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("story_embeddings")
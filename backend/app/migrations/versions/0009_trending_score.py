@@ -0,0 +1,87 @@
+"""Precomputed trending score on stories, plus the index the trending feed reads.
+
+Existing stories are scored from their reaction history. The scoring is copied from
+``app/services/trending.py`` as it was at this revision, so later changes there cannot alter what
+this migration writes.
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2025-11-20
+"""
+from __future__ import annotations
+
+import math
+from collections import defaultdict
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0009"
+down_revision = "0008"
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 500
+EPOCH = datetime(2025, 1, 1)
+TAU_SECONDS = 24.0 * 3600 / math.log(2)
+INDEX = ("ix_stories_trending", "stories", ["visibility", "moderation_status", "trending_score"])
+
+stories = sa.table(
+    "stories", sa.column("id", sa.Integer), sa.column("created_at", sa.DateTime), sa.column("trending_score", sa.Float)
+)
+reactions = sa.table("reactions", sa.column("story_id", sa.Integer), sa.column("created_at", sa.DateTime))
+
+
+def score_for(created_at, reaction_times) -> float:
+    """log(sum(exp((t - EPOCH) / tau))) over the creation time and every reaction."""
+    exponents = [(at - EPOCH).total_seconds() / TAU_SECONDS for at in [created_at, *reaction_times]]
+    high = max(exponents)
+    return high + math.log(sum(math.exp(exponent - high) for exponent in exponents))
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("stories") as batch:
+        batch.add_column(sa.Column("trending_score", sa.Float(), server_default="0", nullable=False))
+
+    bind = op.get_bind()
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(stories.c.id, stories.c.created_at)
+            .where(stories.c.id > last_id)
+            .order_by(stories.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        last_id = rows[-1].id
+        reaction_times = defaultdict(list)
+        for story_id, created_at in bind.execute(
+            sa.select(reactions.c.story_id, reactions.c.created_at).where(
+                reactions.c.story_id.in_([row.id for row in rows])
+            )
+        ):
+            reaction_times[story_id].append(created_at)
+        bind.execute(
+            stories.update().where(stories.c.id == sa.bindparam("story_id")).values(trending_score=sa.bindparam("score")),
+            [
+                {"story_id": row.id, "score": score_for(row.created_at, sorted(reaction_times[row.id]))}
+                for row in rows
+            ],
+        )
+
+    name, table, columns = INDEX
+    if bind.dialect.name == "postgresql":
+        with op.get_context().autocommit_block():
+            op.create_index(name, table, columns, postgresql_concurrently=True, if_not_exists=True)
+    else:
+        op.create_index(name, table, columns)
+
+
+def downgrade() -> None:
+    name, table, _ = INDEX
+    op.drop_index(name, table_name=table)
+    with op.batch_alter_table("stories") as batch:
+        batch.drop_column("trending_score")
@@ -0,0 +1,34 @@
+"""Index on ``stories.audio_url`` for storage reconciliation.
+
+``reconcile_storage`` looks up every file in ``storage_dir`` with batched
+``audio_url IN (...)`` queries; without this index each batch scans ``stories``.
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2025-11-22
+"""
+from __future__ import annotations
+
+from alembic import op
+
+
+revision = "0010"
+down_revision = "0009"
+branch_labels = None
+depends_on = None
+
+INDEX = ("ix_stories_audio_url", "stories", ["audio_url"])
+
+
+def upgrade() -> None:
+    name, table, columns = INDEX
+    if op.get_bind().dialect.name == "postgresql":
+        with op.get_context().autocommit_block():
+            op.create_index(name, table, columns, postgresql_concurrently=True, if_not_exists=True)
+        return
+    op.create_index(name, table, columns)
+
+
+def downgrade() -> None:
+    name, table, _ = INDEX
+    op.drop_index(name, table_name=table)
@@ -0,0 +1,28 @@
+"""When a story's tags, title and abstract were last derived from its text.
+
+Existing stories start as NULL, which is the backlog ``enrich_backlog`` works through.
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2025-11-23
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0011"
+down_revision = "0010"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("stories") as batch:
+        batch.add_column(sa.Column("enriched_at", sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("stories") as batch:
+        batch.drop_column("enriched_at")
@@ -0,0 +1,29 @@
+"""Drop the interim ``schema_version`` table.
+
+A short-lived startup check recorded a DDL fingerprint there before Alembic owned the schema;
+``alembic_version`` replaces it. Only databases started in that window have the table.
+
+Revision ID: 0012
+Revises: 0011
+Create Date: 2025-11-24
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0012"
+down_revision = "0011"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    if sa.inspect(op.get_bind()).has_table("schema_version"):
+        op.drop_table("schema_version")
+
+
+def downgrade() -> None:
+    # nothing reads it any more; there is nothing to restore
+    pass
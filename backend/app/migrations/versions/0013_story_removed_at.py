@@ -0,0 +1,30 @@
+"""When moderation removed a story; the storage grace period for its audio counts from here.
+
+``updated_at`` moves on every later write to the row, so it cannot date the removal. Stories
+already removed start from their last update, the closest value available.
+
+Revision ID: 0013
+Revises: 0012
+Create Date: 2025-11-25
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0013"
+down_revision = "0012"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("stories") as batch:
+        batch.add_column(sa.Column("removed_at", sa.DateTime(), nullable=True))
+    op.execute("UPDATE stories SET removed_at = updated_at WHERE moderation_status = 'removed'")
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("stories") as batch:
+        batch.drop_column("removed_at")
@@ -0,0 +1,79 @@
+"""Rescore trending with a creation prior of a tenth of a reaction instead of a whole one.
+
+With a full reaction at creation, a story nobody reacted to outranked older stories whose real
+reactions had decayed below one, so ``sort=trending`` mostly sorted by recency. Scores are
+rebuilt from the reaction history; the scoring is copied from ``app/services/trending.py`` as it
+is at this revision.
+
+Revision ID: 0014
+Revises: 0013
+Create Date: 2025-11-26
+"""
+from __future__ import annotations
+
+import math
+from collections import defaultdict
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0014"
+down_revision = "0013"
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 500
+EPOCH = datetime(2025, 1, 1)
+TAU_SECONDS = 24.0 * 3600 / math.log(2)
+
+stories = sa.table(
+    "stories", sa.column("id", sa.Integer), sa.column("created_at", sa.DateTime), sa.column("trending_score", sa.Float)
+)
+reactions = sa.table("reactions", sa.column("story_id", sa.Integer), sa.column("created_at", sa.DateTime))
+
+
+def score_for(created_at, reaction_times, creation_weight: float) -> float:
+    """log(w * exp(c) + sum(exp(r))) with every time as (t - EPOCH) / tau."""
+    terms = [((created_at - EPOCH).total_seconds() / TAU_SECONDS, creation_weight)]
+    terms += [((at - EPOCH).total_seconds() / TAU_SECONDS, 1.0) for at in reaction_times]
+    high = max(exponent for exponent, _ in terms)
+    return high + math.log(sum(weight * math.exp(exponent - high) for exponent, weight in terms))
+
+
+def _rescore(creation_weight: float) -> None:
+    bind = op.get_bind()
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(stories.c.id, stories.c.created_at)
+            .where(stories.c.id > last_id)
+            .order_by(stories.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            return
+        last_id = rows[-1].id
+        reaction_times = defaultdict(list)
+        for story_id, created_at in bind.execute(
+            sa.select(reactions.c.story_id, reactions.c.created_at).where(
+                reactions.c.story_id.in_([row.id for row in rows])
+            )
+        ):
+            reaction_times[story_id].append(created_at)
+        bind.execute(
+            stories.update().where(stories.c.id == sa.bindparam("story_id")).values(trending_score=sa.bindparam("score")),
+            [
+                {"story_id": row.id, "score": score_for(row.created_at, reaction_times[row.id], creation_weight)}
+                for row in rows
+            ],
+        )
+
+
+def upgrade() -> None:
+    _rescore(0.1)
+
+
+def downgrade() -> None:
+    _rescore(1.0)
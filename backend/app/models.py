@@ -4,9 +4,34 @@ import enum
 from datetime import datetime
 from typing import List, Optional
 
-from sqlalchemy import Column, Enum, String, func
-from sqlalchemy.dialects.sqlite import JSON
-from sqlmodel import Field, SQLModel
+from sqlalchemy import (
+    JSON,
+    Column,
+    Enum,
+    ForeignKey,
+    Index,
+    Integer,
+    LargeBinary,
+    String,
+    UniqueConstraint,
+    exists,
+    func,
+    select,
+    type_coerce,
+)
+from sqlalchemy.dialects.postgresql import JSONB, array
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql.elements import ColumnElement
+from sqlmodel import Field, Relationship, SQLModel
+
+from .services.compression import DEFAULT_CODEC, compress_text, decompress_text
+from .services.trending import initial_score
+
+
+# JSON on SQLite, JSONB (indexable with GIN) on PostgreSQL.
+TagList = JSON().with_variant(JSONB(), "postgresql")
+# Created only on PostgreSQL (ddl_if); autogenerate comparisons skip them elsewhere.
+POSTGRES_ONLY_INDEXES = frozenset({"ix_stories_tags_gin"})
 
 
 class Visibility(str, enum.Enum):
@@ -18,6 +43,7 @@ class Visibility(str, enum.Enum):
 class ModerationStatus(str, enum.Enum):
     ok = "ok"
     flagged = "flagged"
+    hidden = "hidden"
     removed = "removed"
 
 
@@ -29,17 +55,31 @@ class ReactionType(str, enum.Enum):
 
 class Story(SQLModel, table=True):
     __tablename__ = "stories"
+    # Schema changes ship as Alembic revisions in app/migrations; keep both in sync.
+    __table_args__ = (
+        Index("ix_stories_feed", "visibility", "moderation_status", "created_at"),
+        Index("ix_stories_trending", "visibility", "moderation_status", "trending_score"),
+        Index("ix_stories_audio_url", "audio_url"),
+        Index("ix_stories_tags_gin", "tags", postgresql_using="gin").ddl_if(dialect="postgresql"),
+    )
 
     id: Optional[int] = Field(default=None, primary_key=True)
     title: str = Field(default="Untitled Story", max_length=255)
-    text: str = Field(default="", sa_column=Column(String, nullable=False, server_default=""))
-    raw_transcript: str = Field(default="", sa_column=Column(String, nullable=False, server_default=""))
     abstract: Optional[str] = Field(default=None, max_length=512)
     audio_url: str = Field(nullable=False)
+    # Measured at upload (services/audio.py); audio_peaks is a packed int8 waveform (0-127 per bucket).
+    audio_size_bytes: Optional[int] = None
+    audio_duration_seconds: Optional[float] = None
+    audio_sample_rate: Optional[int] = None
+    audio_peaks: Optional[bytes] = Field(default=None, sa_column=Column(LargeBinary, nullable=True))
+    # Set once the background pipeline has replaced the upload with its Opus transcode.
+    audio_processed_at: Optional[datetime] = None
     visibility: Visibility = Field(default=Visibility.private, sa_column=Column(Enum(Visibility)))
     age_range: Optional[str] = Field(default=None, max_length=32)
     city: Optional[str] = Field(default=None, max_length=64)
-    tags: List[str] = Field(default_factory=list, sa_column=Column(JSON, nullable=False, server_default="[]"))
+    tags: List[str] = Field(default_factory=list, sa_column=Column(TagList, nullable=False, server_default="[]"))
+    # Set when services/enrichment.py derived tags/title/abstract from the text; NULL is the backlog.
+    enriched_at: Optional[datetime] = None
     share_token: Optional[str] = Field(
         default=None,
         sa_column=Column(String, unique=True, index=True, nullable=True),
@@ -50,6 +90,17 @@ class Story(SQLModel, table=True):
         default=ModerationStatus.ok,
         sa_column=Column(Enum(ModerationStatus), server_default=ModerationStatus.ok.value),
     )
+    # Set by DELETE /admin/stories/{id}; the storage grace period for the story's audio counts from here.
+    removed_at: Optional[datetime] = None
+    # Distinct-reporter counters maintained by `report_story`; never derived from `reports` at read time.
+    report_count: int = Field(default=0, sa_column_kwargs={"server_default": "0"})
+    first_reported_at: Optional[datetime] = None
+    last_reported_at: Optional[datetime] = None
+    # Log-space, time-decayed reaction score behind sort=trending; bumped by `react_to_story` only.
+    trending_score: float = Field(
+        default_factory=lambda: initial_score(datetime.utcnow()),
+        sa_column_kwargs={"server_default": "0"},
+    )
     created_at: datetime = Field(
         default_factory=datetime.utcnow,
         nullable=False,
@@ -60,20 +111,112 @@ class Story(SQLModel, table=True):
         nullable=False,
         sa_column_kwargs={"server_default": func.now(), "onupdate": func.now()},
     )
+    # Text and transcript live compressed in `story_bodies` so feed scans never page them in;
+    # loaded on first access of `text` / `raw_transcript` (detail endpoints only).
+    body: Optional[StoryBody] = Relationship(
+        sa_relationship=relationship(
+            "StoryBody", back_populates="story", uselist=False, lazy="select", cascade="all, delete-orphan"
+        )
+    )
+
+    # Properties are not constructor arguments: assign them after building the Story.
+    @property
+    def text(self) -> str:
+        return self.body.read("text") if self.body else ""
+
+    @text.setter
+    def text(self, value: Optional[str]) -> None:
+        self._write_body("text", value)
+
+    @property
+    def raw_transcript(self) -> str:
+        return self.body.read("raw_transcript") if self.body else ""
+
+    @raw_transcript.setter
+    def raw_transcript(self, value: Optional[str]) -> None:
+        self._write_body("raw_transcript", value)
+
+    def _write_body(self, field: str, value: Optional[str]) -> None:
+        if self.body is None:
+            self.body = StoryBody()
+        self.body.write(field, value)
+        # a body-only edit would otherwise leave the stories row (and its onupdate) untouched
+        self.updated_at = datetime.utcnow()
+
+
+class StoryBody(SQLModel, table=True):
+    """Compressed story text and raw transcript, one row per story."""
+
+    __tablename__ = "story_bodies"
+
+    story_id: Optional[int] = Field(
+        default=None,
+        sa_column=Column(Integer, ForeignKey("stories.id", ondelete="CASCADE"), primary_key=True),
+    )
+    codec: str = Field(default=DEFAULT_CODEC, max_length=8)
+    text: bytes = Field(default=b"", sa_column=Column(LargeBinary, nullable=False))
+    raw_transcript: bytes = Field(default=b"", sa_column=Column(LargeBinary, nullable=False))
+    story: Optional[Story] = Relationship(sa_relationship=relationship("Story", back_populates="body"))
+
+    def read(self, field: str) -> str:
+        return decompress_text(getattr(self, field), self.codec)
+
+    def write(self, field: str, value: Optional[str]) -> None:
+        # re-encode the sibling field when an older codec is being replaced
+        if self.codec != DEFAULT_CODEC:
+            other = "raw_transcript" if field == "text" else "text"
+            setattr(self, other, compress_text(self.read(other)))
+            self.codec = DEFAULT_CODEC
+        setattr(self, field, compress_text(value))
+
+
+class StoryEmbedding(SQLModel, table=True):
+    """Float32 text embedding of a story, written whenever its text changes (services/embeddings.py)."""
+
+    __tablename__ = "story_embeddings"
+
+    story_id: Optional[int] = Field(
+        default=None,
+        sa_column=Column(Integer, ForeignKey("stories.id", ondelete="CASCADE"), primary_key=True),
+    )
+    # embedder that produced the vector; the index only compares vectors of the active one
+    model: str = Field(max_length=64)
+    vector: bytes = Field(sa_column=Column(LargeBinary, nullable=False))
+    updated_at: datetime = Field(default_factory=datetime.utcnow, nullable=False)
+
+
+def tags_overlap(tags: List[str], dialect_name: str, case_insensitive: bool = False) -> ColumnElement[bool]:
+    """SQL predicate: the story carries at least one of ``tags`` (JSONB ``?|`` on PostgreSQL).
+
+    ``case_insensitive`` compares lower-cased elements instead; on PostgreSQL that cannot use the
+    GIN index, so keep it for queries already narrowed by another index.
+    """
+    if dialect_name == "postgresql" and not case_insensitive:
+        return type_coerce(Story.tags, JSONB).has_any(array(tags))
+    elements = func.jsonb_array_elements_text if dialect_name == "postgresql" else func.json_each
+    tag = elements(Story.tags).table_valued("value").alias("tag")
+    if case_insensitive:
+        return exists(select(1).select_from(tag).where(func.lower(tag.c.value).in_(sorted({t.lower() for t in tags}))))
+    return exists(select(1).select_from(tag).where(tag.c.value.in_(tags)))
 
 
 class Reaction(SQLModel, table=True):
     __tablename__ = "reactions"
+    __table_args__ = (Index("ix_reactions_story_type", "story_id", "type"),)
 
     id: Optional[int] = Field(default=None, primary_key=True)
     story_id: int = Field(foreign_key="stories.id")
     type: ReactionType = Field(sa_column=Column(Enum(ReactionType)))
     client_hash: str = Field(index=True)
-    created_at: datetime = Field(default_factory=datetime.utcnow, nullable=False, sa_column_kwargs={"server_default": func.utcnow()})
+    created_at: datetime = Field(default_factory=datetime.utcnow, nullable=False, sa_column_kwargs={"server_default": func.now()})
 
 
 class Report(SQLModel, table=True):
     __tablename__ = "reports"
+    __table_args__ = (
+        UniqueConstraint("story_id", "client_hash", name="uq_reports_story_client"),
+        Index("ix_reports_open", "handled", "story_id"),
+    )
 
     id: Optional[int] = Field(default=None, primary_key=True)
     story_id: int = Field(foreign_key="stories.id")
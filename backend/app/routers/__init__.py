@@ -1,3 +1,3 @@
-from . import admin, stories, conversations
+from . import admin, stories, conversations, metrics
 
-__all__ = ["admin", "stories", "conversations"]
+__all__ = ["admin", "stories", "conversations", "metrics"]
@@ -1,15 +1,21 @@
 from __future__ import annotations
 
+from datetime import datetime
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, Header, HTTPException, Response, status
-from sqlalchemy import select
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from sqlalchemy import DateTime, Float, cast, func, literal, select
 from sqlmodel import Session
 
-from ..database import get_session
+from ..database import get_read_session, get_session
 from ..models import ModerationStatus, Report, Story
-from ..schemas import ReportRead
+from ..schemas import ModerationQueueItem, ReportRead
+from ..services.embeddings import backfill_embeddings
+from ..services.enrichment import enrich_backlog
+from ..services.openai_story import get_openai_story_service
 from ..services.security import ensure_admin
+from ..services.serialization import REPORT_LIST
+from ..services.storage_gc import reconcile_storage
 
 router = APIRouter(prefix="/admin", tags=["admin"])
 
@@ -17,11 +23,72 @@ router = APIRouter(prefix="/admin", tags=["admin"])
 @router.get("/reports", response_model=List[ReportRead])
 def list_reports(
     admin_token: Optional[str] = Header(default=None, alias="x-admin-token"),
-    session: Session = Depends(get_session),
-) -> List[ReportRead]:
+    session: Session = Depends(get_read_session),
+) -> Response:
     ensure_admin(admin_token)
     reports = session.exec(select(Report).where(Report.handled.is_(False))).scalars().all()
-    return [ReportRead.model_validate(report) for report in reports]
+    # one TypeAdapter pass validates and encodes the whole list in pydantic-core
+    payload = REPORT_LIST.dump_json(REPORT_LIST.validate_python(reports, from_attributes=True))
+    return Response(payload, media_type="application/json")
+
+
+def _hours_since(column, now: datetime, dialect_name: str):
+    """SQL expression for the hours from ``column`` to ``now``."""
+    if dialect_name == "postgresql":
+        return cast(func.extract("epoch", literal(now, DateTime) - column), Float) / 3600
+    return (func.julianday(literal(now, DateTime)) - func.julianday(column)) * 24
+
+
+@router.get("/queue", response_model=List[ModerationQueueItem])
+def moderation_queue(
+    limit: int = Query(default=50, ge=1, le=500),
+    admin_token: Optional[str] = Header(default=None, alias="x-admin-token"),
+    session: Session = Depends(get_read_session),
+) -> List[ModerationQueueItem]:
+    """Stories with open reports, most urgent (highest distinct-reporter velocity) first."""
+    ensure_admin(admin_token)
+    open_reports = (
+        select(Report.story_id, func.count(Report.id).label("open_reports"))
+        .where(Report.handled.is_(False))
+        .group_by(Report.story_id)
+        .subquery()
+    )
+    now = datetime.utcnow()
+    dialect_name = session.get_bind().dialect.name
+    # SQLite spells GREATEST as the two-argument scalar max()
+    greatest = func.greatest if dialect_name == "postgresql" else func.max
+    since = func.coalesce(Story.first_reported_at, Story.last_reported_at, literal(now, DateTime))
+    # at least an hour, so a single fresh report does not outrank everything
+    velocity = (Story.report_count / greatest(_hours_since(since, now, dialect_name), 1.0)).label("velocity")
+    rows = session.exec(
+        select(
+            Story.id,
+            Story.title,
+            Story.moderation_status,
+            Story.report_count,
+            open_reports.c.open_reports,
+            Story.first_reported_at,
+            Story.last_reported_at,
+            velocity,
+        )
+        .join(open_reports, open_reports.c.story_id == Story.id)
+        .where(Story.moderation_status != ModerationStatus.removed)
+        .order_by(velocity.desc(), Story.report_count.desc())
+        .limit(limit)
+    ).all()
+    return [
+        ModerationQueueItem(
+            story_id=row.id,
+            title=row.title,
+            moderation_status=row.moderation_status,
+            report_count=row.report_count,
+            open_reports=row.open_reports,
+            first_reported_at=row.first_reported_at,
+            last_reported_at=row.last_reported_at,
+            reports_per_hour=round(float(row.velocity), 3),
+        )
+        for row in rows
+    ]
 
 
 @router.patch("/reports/{report_id}", response_model=ReportRead)
@@ -51,7 +118,45 @@ def remove_story(
     story = session.get(Story, story_id)
     if not story:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Story not found")
-    story.moderation_status = ModerationStatus.removed
+    if story.moderation_status != ModerationStatus.removed:
+        story.moderation_status = ModerationStatus.removed
+        story.removed_at = datetime.utcnow()
     session.add(story)
     session.commit()
     return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+
+@router.post("/storage/reconcile")
+def reconcile_audio_storage(
+    dry_run: bool = False,
+    admin_token: Optional[str] = Header(default=None, alias="x-admin-token"),
+    session: Session = Depends(get_session),
+) -> dict:
+    """Run the storage reconciliation now; ``dry_run`` only reports what it would do."""
+    ensure_admin(admin_token)
+    return reconcile_storage(session, dry_run=dry_run).as_dict()
+
+
+@router.post("/enrichment/backlog")
+def enrich_story_backlog(
+    limit: int = Query(default=500, ge=1, le=10_000),
+    admin_token: Optional[str] = Header(default=None, alias="x-admin-token"),
+    session: Session = Depends(get_session),
+    openai_story_service=Depends(get_openai_story_service),
+) -> dict:
+    """Derive tags, titles and abstracts for up to ``limit`` stories that were never enriched.
+
+    A plain ``def``: the blocking run happens in FastAPI's threadpool, not on the event loop.
+    """
+    ensure_admin(admin_token)
+    return enrich_backlog(session, openai_story_service, limit=limit).as_dict()
+
+
+@router.post("/embeddings/backfill")
+def backfill_story_embeddings(
+    admin_token: Optional[str] = Header(default=None, alias="x-admin-token"),
+    session: Session = Depends(get_session),
+) -> dict:
+    """Embed stories without a vector from the active embedder: after upgrading, or switching models."""
+    ensure_admin(admin_token)
+    return {"embedded_stories": backfill_embeddings(session)}
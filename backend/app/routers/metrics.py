@@ -0,0 +1,12 @@
+from __future__ import annotations
+
+from fastapi import APIRouter, Response
+
+from ..services.metrics import PROMETHEUS_CONTENT_TYPE, registry
+
+router = APIRouter(tags=["metrics"])
+
+
+@router.get("/metrics", include_in_schema=False)
+async def prometheus_metrics() -> Response:
+    return Response(content=registry.render(), media_type=PROMETHEUS_CONTENT_TYPE)
@@ -1,36 +1,79 @@
 from __future__ import annotations
 
+import asyncio
 import json
-import textwrap
+from datetime import datetime
 from pathlib import Path
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, File, Form, Header, HTTPException, UploadFile, status
-from sqlalchemy import select, func
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    Depends,
+    File,
+    Form,
+    Header,
+    HTTPException,
+    Request,
+    UploadFile,
+    WebSocket,
+    WebSocketDisconnect,
+    status,
+)
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import and_, case, cast, select, func, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import selectinload
 from sqlmodel import Session
 
-from ..database import get_session
-from ..models import ModerationStatus, Reaction, ReactionType, Report, Story, Visibility
+from ..config import get_settings
+from ..database import get_read_engine, get_read_session, get_session
+from ..models import ModerationStatus, Reaction, ReactionType, Report, Story, Visibility, tags_overlap
 from ..schemas import (
+    FeedSort,
+    ReactionEvent,
     ReactionRequest,
     ReactionResponse,
     ReactionSummary,
     ReportCreate,
-    SimilarStory,
     SimilarStoriesResponse,
+    StoryBatchRequest,
+    StoryBatchResponse,
+    StoryBatchResult,
     StoryDetail,
     StoryRead,
     StoryUpdate,
     TranscriptStoryRequest,
     TranscriptionResponse,
 )
+from ..services.audio import analyse_audio, process_story_audio
 from ..services.elevenlabs import get_elevenlabs_service
+from ..services.embeddings import blend_scores, embed_story, get_vector_index, tag_similarity
+from ..services.enrichment import apply_enrichment, enrich_text
+from ..services.live import RESYNC, get_reaction_hub
 from ..services.openai_story import get_openai_story_service
+from ..services.ratelimit import enforce_write_limit
 from ..services.security import hash_client_token, make_share_token, record_consent
-from ..services.storage import ensure_storage_root, resolve_audio_path, save_audio_file
+from ..services.serialization import story_card, story_card_columns
+from ..services.storage import LIVE_AGENT_AUDIO_URL, resolve_audio_path, save_audio_file
+from ..services.trending import add_reaction
 
 router = APIRouter(prefix="/stories", tags=["stories"])
 
+# Flagged stories stay listed while they wait for review; hidden/removed ones drop out.
+LISTED_MODERATION_STATUSES = (ModerationStatus.ok, ModerationStatus.flagged)
+# readable only with the story's share token
+RESTRICTED_VISIBILITIES = frozenset({Visibility.private, Visibility.link})
+SIMILAR_LIMIT = 5
+# per source (vector index, tag overlap) before blending
+SIMILAR_CANDIDATES = 20
+
+
+def _can_view(visibility: Visibility, share_token: Optional[str], token: Optional[str]) -> bool:
+    """Visibility rule shared by every endpoint that reads a single story."""
+    return visibility not in RESTRICTED_VISIBILITIES or token == share_token
+
 
 def _parse_tags(raw: Optional[str]) -> List[str]:
     if not raw:
@@ -44,8 +87,11 @@ def _parse_tags(raw: Optional[str]) -> List[str]:
     return [tag.strip() for tag in raw.split(",") if tag.strip()]
 
 
+# Plain ``def``: the file copy and DB writes block, so FastAPI runs this in its threadpool
+# instead of stalling the event loop (and every other request) behind them.
 @router.post("", response_model=StoryDetail, status_code=status.HTTP_201_CREATED)
-async def create_story(
+def create_story(
+    background_tasks: BackgroundTasks,
     audio: UploadFile = File(...),
     age_range: Optional[str] = Form(default=None),
     city: Optional[str] = Form(default=None),
@@ -53,11 +99,16 @@ async def create_story(
     title: Optional[str] = Form(default=None),
     session: Session = Depends(get_session),
 ) -> StoryDetail:
-    ensure_storage_root()
     filename = save_audio_file(audio)
+    audio_path = resolve_audio_path(filename)
+    # measured before the insert so the feed can draw the card as soon as the story is public;
+    # uploads that take longer to decode are analysed by the background task instead
+    analysis = analyse_audio(audio_path, get_settings().audio_probe_timeout_seconds)
     story = Story(
         title=title or "Untitled Story",
         audio_url=filename,
+        audio_size_bytes=audio_path.stat().st_size,
+        **(analysis.as_columns() if analysis else {}),
         age_range=age_range,
         city=city,
         tags=_parse_tags(tags),
@@ -66,6 +117,8 @@ async def create_story(
     session.add(story)
     session.commit()
     session.refresh(story)
+    # transcode after the response; the upload is playable as recorded meanwhile
+    background_tasks.add_task(process_story_audio, story.id)
     return StoryDetail.model_validate(story)
 
 
@@ -86,19 +139,24 @@ async def create_story_from_transcript(
     except Exception as exc:  # pragma: no cover - upstream errors
         raise HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail="Unable to generate story") from exc
 
-    abstract = textwrap.shorten(story_text, width=200, placeholder="...") if story_text else None
+    # before anything is written: with the model enabled this is another upstream call
+    enrichment = await enrich_text(story_text, openai_story_service)
     story = Story(
         title=(payload.title or "Untitled Story").strip() or "Untitled Story",
-        text=story_text,
-        raw_transcript=transcript,
-        abstract=abstract,
         age_range=payload.age_range,
         city=payload.city,
         tags=payload.tags or [],
-        audio_url="live-agent",
+        audio_url=LIVE_AGENT_AUDIO_URL,
         share_token=make_share_token(),
     )
+    # stored compressed in story_bodies; not accepted as constructor arguments
+    story.text = story_text
+    story.raw_transcript = transcript
+    if enrichment:
+        apply_enrichment(story, enrichment)
     session.add(story)
+    session.flush()
+    embed_story(session, story)
     session.commit()
     session.refresh(story)
     return StoryDetail.model_validate(story)
@@ -109,6 +167,7 @@ async def transcribe_story(
     story_id: int,
     session: Session = Depends(get_session),
     elevenlabs_service=Depends(get_elevenlabs_service),
+    openai_story_service=Depends(get_openai_story_service),
 ) -> TranscriptionResponse:
     story = session.get(Story, story_id)
     if not story:
@@ -117,10 +176,14 @@ async def transcribe_story(
     if not audio_path.exists():
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Audio not found")
     result = await elevenlabs_service.transcribe_audio(audio_path)
+    # generated from the in-memory text, before the write transaction starts
+    enrichment = await enrich_text(result["text"], openai_story_service)
     story.text = result["text"]
     story.raw_transcript = result["raw_transcript"]
-    story.title = story.title or result["title"]
-    story.abstract = result["abstract"]
+    if enrichment:
+        # fills a placeholder title and replaces the abstract; tags are only added to the storyteller's
+        apply_enrichment(story, enrichment, replace_abstract=True)
+    embed_story(session, story)
     session.add(story)
     session.commit()
     session.refresh(story)
@@ -154,8 +217,13 @@ async def update_story(
         value = update_data.get(field)
         if value is not None:
             setattr(story, field, value)
+    if update_data.get("text") is not None:
+        # new text: the enrichment backlog derives tags (and a missing title/abstract) again
+        story.enriched_at = None
     if payload.consent_choice:
         story.consent_timestamp = record_consent(payload.consent_choice)
+    if update_data.get("text") is not None or update_data.get("title") is not None:
+        embed_story(session, story)
 
     session.add(story)
     session.commit()
@@ -166,66 +234,112 @@ async def update_story(
 @router.get("/public", response_model=List[StoryRead])
 def get_public_stories(
     tag: Optional[str] = None,
+    sort: FeedSort = FeedSort.recent,
     page: int = 1,
     size: int = 20,
-    session: Session = Depends(get_session),
-) -> List[StoryRead]:
+    session: Session = Depends(get_read_session),
+) -> ORJSONResponse:
+    # trending reads the precomputed score (ix_stories_trending); nothing aggregates reactions here
+    order = Story.trending_score.desc() if sort == FeedSort.trending else Story.created_at.desc()
     query = (
-        select(Story)
+        select(*story_card_columns())
         .where(Story.visibility == Visibility.public_anon)
-        .where(Story.moderation_status == ModerationStatus.ok)
-        .order_by(Story.created_at.desc())
+        .where(Story.moderation_status.in_(LISTED_MODERATION_STATUSES))
+        .order_by(order, Story.id.desc())
     )
-    stories = session.exec(query).scalars().all()
-    filtered = stories
     if tag:
-        filtered = [story for story in stories if tag in (story.tags or [])]
-    start = (page - 1) * size
-    end = start + size
-    return [StoryRead.model_validate(story) for story in filtered[start:end]]
+        query = query.where(tags_overlap([tag], session.get_bind().dialect.name))
+    query = query.offset(max(page - 1, 0) * size).limit(size)
+    # rows straight to JSON: no ORM entities, no StoryRead instances, no response_model pass
+    return ORJSONResponse([story_card(row) for row in session.exec(query)])
 
 
 @router.get("/{story_id}", response_model=StoryDetail)
 def get_story(
     story_id: int,
     token: Optional[str] = None,
-    session: Session = Depends(get_session),
+    session: Session = Depends(get_read_session),
 ) -> StoryDetail:
     story = session.get(Story, story_id)
     if not story:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Story not found")
 
-    if story.visibility in {Visibility.private, Visibility.link}:
-        if token != story.share_token:
-            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Story is restricted")
+    if not _can_view(story.visibility, story.share_token, token):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Story is restricted")
 
     return StoryDetail.model_validate(story)
 
 
+@router.post("/batch", response_model=StoryBatchResponse)
+def get_stories_batch(payload: StoryBatchRequest, session: Session = Depends(get_read_session)) -> StoryBatchResponse:
+    """Several ``GET /stories/{id}`` in one request: one IN query, results in request order."""
+    ids = {item.id for item in payload.stories}
+    stories = {
+        story.id: story
+        for story in session.exec(
+            select(Story).where(Story.id.in_(ids)).options(selectinload(Story.body))
+        ).scalars()
+    }
+    results = []
+    for item in payload.stories:
+        story = stories.get(item.id)
+        if story is None:
+            result = StoryBatchResult(id=item.id, status=status.HTTP_404_NOT_FOUND, detail="Story not found")
+        elif not _can_view(story.visibility, story.share_token, item.token):
+            result = StoryBatchResult(id=item.id, status=status.HTTP_403_FORBIDDEN, detail="Story is restricted")
+        else:
+            result = StoryBatchResult(id=item.id, status=status.HTTP_200_OK, story=StoryDetail.model_validate(story))
+        results.append(result)
+    return StoryBatchResponse(results=results)
+
+
 @router.get("/{story_id}/similar", response_model=SimilarStoriesResponse)
-def similar_stories(story_id: int, session: Session = Depends(get_session)) -> SimilarStoriesResponse:
+def similar_stories(story_id: int, session: Session = Depends(get_read_session)) -> ORJSONResponse:
     story = session.get(Story, story_id)
     if not story:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Story not found")
-    if not story.tags:
-        return SimilarStoriesResponse(stories=[])
-
-    public_stories = session.exec(
-        select(Story).where(
-            Story.visibility == Visibility.public_anon,
-            Story.moderation_status == ModerationStatus.ok,
-            Story.id != story_id,
+
+    settings = get_settings()
+    index = get_vector_index()
+    index.ensure_fresh(session, settings.embedding_index_ttl_seconds)
+    cosines = dict(index.search(story_id, SIMILAR_CANDIDATES))
+    listed = and_(
+        Story.visibility == Visibility.public_anon,
+        Story.moderation_status.in_(LISTED_MODERATION_STATUSES),
+        Story.id != story_id,
+    )
+
+    # candidates: nearest texts from the index plus the newest stories sharing a tag (any case);
+    # only the columns the response and the ranking need, not whole rows
+    columns = select(Story.id, Story.title, Story.abstract, Story.tags, Story.created_at)
+    candidates = {}
+    if cosines:
+        for row in session.exec(columns.where(listed, Story.id.in_(list(cosines)))):
+            candidates[row.id] = row
+    if story.tags:
+        tag_matches = session.exec(
+            columns.where(listed, tags_overlap(list(story.tags), session.get_bind().dialect.name, case_insensitive=True))
+            .order_by(Story.created_at.desc())
+            .limit(SIMILAR_CANDIDATES)
+        )
+        for row in tag_matches:
+            candidates[row.id] = row
+
+    scored = []
+    for candidate in candidates.values():
+        score = blend_scores(
+            cosines.get(candidate.id, 0.0),
+            tag_similarity(story.tags or [], candidate.tags or []),
+            settings.similar_vector_weight,
         )
-    ).scalars().all()
-    matches: List[Story] = []
-    for candidate in public_stories:
-        if set(candidate.tags or []).intersection(set(story.tags or [])):
-            matches.append(candidate)
+        if score > 0:
+            scored.append((score, candidate.created_at, candidate))
+    scored.sort(key=lambda item: (item[0], item[1]), reverse=True)
     similar_payload = [
-        SimilarStory(id=candidate.id, title=candidate.title, abstract=candidate.abstract, tags=candidate.tags or [])
-        for candidate in matches[:5]
+        {"id": candidate.id, "title": candidate.title, "abstract": candidate.abstract, "tags": candidate.tags or []}
+        for _, _, candidate in scored[:SIMILAR_LIMIT]
     ]
-    return SimilarStoriesResponse(stories=similar_payload)
+    return ORJSONResponse({"stories": similar_payload})
 
 
 def _reaction_counts(session: Session, story_id: int) -> ReactionSummary:
@@ -238,16 +352,20 @@ def _reaction_counts(session: Session, story_id: int) -> ReactionSummary:
     return summary
 
 
-@router.post("/{story_id}/react", response_model=ReactionResponse)
+def _throttle_reactions(request: Request, payload: ReactionRequest) -> None:
+    enforce_write_limit(request, "react", payload.client_token)
+
+
+def _throttle_reports(request: Request, payload: ReportCreate) -> None:
+    enforce_write_limit(request, "report", payload.client_token)
+
+
+@router.post("/{story_id}/react", response_model=ReactionResponse, dependencies=[Depends(_throttle_reactions)])
 def react_to_story(
     story_id: int,
     payload: ReactionRequest,
     session: Session = Depends(get_session),
 ) -> ReactionResponse:
-    story = session.get(Story, story_id)
-    if not story:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Story not found")
-
     client_hash = hash_client_token(payload.client_token)
     existing = session.exec(
         select(Reaction).where(
@@ -259,14 +377,108 @@ def react_to_story(
     if existing:
         raise HTTPException(status_code=status.HTTP_429_TOO_MANY_REQUESTS, detail="Reaction already recorded")
 
-    reaction = Reaction(story_id=story_id, type=payload.type, client_hash=client_hash)
+    # the trending bump doubles as the existence check: no row updated means no story
+    reacted_at = datetime.utcnow()
+    bumped = session.exec(
+        update(Story)
+        .where(Story.id == story_id)
+        .values(trending_score=add_reaction(Story.trending_score, reacted_at, session.get_bind().dialect.name))
+        .execution_options(synchronize_session=False)
+    )
+    if bumped.rowcount == 0:
+        session.rollback()
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Story not found")
+
+    reaction = Reaction(story_id=story_id, type=payload.type, client_hash=client_hash, created_at=reacted_at)
     session.add(reaction)
     session.commit()
+    get_reaction_hub().publish(story_id, payload.type.value)
     summary = _reaction_counts(session, story_id)
     return ReactionResponse(story_id=story_id, reactions=summary)
 
 
-@router.post("/{story_id}/report", status_code=status.HTTP_202_ACCEPTED)
+def _live_snapshot(story_id: int, token: Optional[str]) -> Optional[str]:
+    """Current counts as a snapshot frame, or None when the story is missing or restricted."""
+    with Session(get_read_engine()) as session:
+        story = session.exec(select(Story.visibility, Story.share_token).where(Story.id == story_id)).first()
+        if story is None or not _can_view(story.visibility, story.share_token, token):
+            return None
+        summary = _reaction_counts(session, story_id)
+    return ReactionEvent(event="snapshot", story_id=story_id, reactions=summary).model_dump_json()
+
+
+@router.websocket("/{story_id}/live")
+async def story_reactions_live(websocket: WebSocket, story_id: int, token: Optional[str] = None) -> None:
+    """Push reaction counts: one snapshot on connect, then coalesced deltas (see services/live.py)."""
+    hub = get_reaction_hub()
+    # subscribe before reading the snapshot so no reaction falls between the two
+    queue = hub.subscribe(story_id)
+    receiver = getter = None
+    try:
+        snapshot = await run_in_threadpool(_live_snapshot, story_id, token)
+        if snapshot is None:
+            await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+            return
+        await websocket.accept()
+        await websocket.send_text(snapshot)
+        # clients never need to send; reading only tells us when they leave
+        receiver = asyncio.ensure_future(websocket.receive())
+        while True:
+            getter = getter or asyncio.ensure_future(queue.get())
+            done, _ = await asyncio.wait({receiver, getter}, return_when=asyncio.FIRST_COMPLETED)
+            if receiver in done:
+                if receiver.result()["type"] == "websocket.disconnect":
+                    return
+                receiver = asyncio.ensure_future(websocket.receive())
+            if getter in done:
+                message, getter = getter.result(), None
+                if message == RESYNC:
+                    message = await run_in_threadpool(_live_snapshot, story_id, token)
+                    if message is None:  # removed or made private meanwhile
+                        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+                        return
+                await websocket.send_text(message)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        hub.unsubscribe(story_id, queue)
+        for task in (receiver, getter):
+            if task is not None:
+                task.cancel()
+
+
+def _register_report(story_id: int, reported_at: datetime):
+    """Bump the distinct-reporter counter and apply moderation thresholds in one UPDATE."""
+    settings = get_settings()
+    report_count = Story.report_count + 1
+    status_type = Story.__table__.c.moderation_status.type
+    moderation_status = case(
+        (Story.moderation_status == ModerationStatus.removed, Story.moderation_status),
+        # explicit casts keep the CASE branches one type on PostgreSQL's native enum
+        (report_count >= settings.report_hide_threshold, cast(ModerationStatus.hidden, status_type)),
+        (
+            and_(
+                Story.moderation_status == ModerationStatus.ok,
+                report_count >= settings.report_flag_threshold,
+            ),
+            cast(ModerationStatus.flagged, status_type),
+        ),
+        else_=Story.moderation_status,
+    )
+    return (
+        update(Story)
+        .where(Story.id == story_id)
+        .values(
+            report_count=report_count,
+            first_reported_at=func.coalesce(Story.first_reported_at, reported_at),
+            last_reported_at=reported_at,
+            moderation_status=moderation_status,
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
+@router.post("/{story_id}/report", status_code=status.HTTP_202_ACCEPTED, dependencies=[Depends(_throttle_reports)])
 def report_story(
     story_id: int,
     payload: ReportCreate,
@@ -278,8 +490,12 @@ def report_story(
     client_hash = hash_client_token(payload.client_token)
     report = Report(story_id=story_id, reason=payload.reason, client_hash=client_hash)
     session.add(report)
-    if story.moderation_status == ModerationStatus.ok:
-        story.moderation_status = ModerationStatus.flagged
-        session.add(story)
+    try:
+        session.flush()
+    except IntegrityError:
+        # one report per client per story; repeats are acknowledged but never counted
+        session.rollback()
+        return {"status": "reported"}
+    session.exec(_register_report(story_id, report.created_at))
     session.commit()
     return {"status": "reported"}
@@ -1,13 +1,20 @@
 from __future__ import annotations
 
+import base64
+import enum
 from datetime import datetime
-from typing import List, Optional
+from typing import List, Literal, Optional
 
-from pydantic import BaseModel, Field, ConfigDict
+from pydantic import BaseModel, Field, ConfigDict, field_validator
 
 from .models import ModerationStatus, ReactionType, Visibility
 
 
+class FeedSort(str, enum.Enum):
+    recent = "recent"
+    trending = "trending"
+
+
 class StoryBase(BaseModel):
     title: Optional[str] = None
     text: Optional[str] = None
@@ -38,6 +45,17 @@ class StoryRead(BaseModel):
     tags: List[str]
     visibility: Visibility
     created_at: datetime
+    audio_duration_seconds: Optional[float] = None
+    audio_sample_rate: Optional[int] = None
+    # base64 of the packed int8 peaks (one 0-127 byte per bucket) so cards draw without the audio
+    waveform: Optional[str] = Field(default=None, validation_alias="audio_peaks")
+
+    @field_validator("waveform", mode="before")
+    @classmethod
+    def _encode_waveform(cls, value):
+        if isinstance(value, (bytes, bytearray)):
+            return base64.b64encode(value).decode("ascii") if value else None
+        return value
 
 
 class StoryDetail(StoryRead):
@@ -50,6 +68,28 @@ class StoryDetail(StoryRead):
     moderation_status: ModerationStatus
 
 
+class StoryBatchItem(BaseModel):
+    id: int
+    token: Optional[str] = None
+
+
+class StoryBatchRequest(BaseModel):
+    stories: List[StoryBatchItem] = Field(min_length=1, max_length=100)
+
+
+class StoryBatchResult(BaseModel):
+    """One entry per requested id, in request order; ``status``/``detail`` match ``GET /stories/{id}``."""
+
+    id: int
+    status: int
+    story: Optional[StoryDetail] = None
+    detail: Optional[str] = None
+
+
+class StoryBatchResponse(BaseModel):
+    results: List[StoryBatchResult]
+
+
 class TranscriptionResponse(BaseModel):
     id: int
     text: str
@@ -74,6 +114,14 @@ class ReactionResponse(BaseModel):
     reactions: ReactionSummary
 
 
+class ReactionEvent(BaseModel):
+    """Frame on ``/stories/{id}/live``: current counts on connect, then increments."""
+
+    event: Literal["snapshot", "delta"]
+    story_id: int
+    reactions: ReactionSummary
+
+
 class ReportCreate(BaseModel):
     reason: str = Field(min_length=3, max_length=500)
     client_token: str = Field(default="anonymous")
@@ -89,6 +137,17 @@ class ReportRead(BaseModel):
     created_at: datetime
 
 
+class ModerationQueueItem(BaseModel):
+    story_id: int
+    title: str
+    moderation_status: ModerationStatus
+    report_count: int
+    open_reports: int
+    first_reported_at: Optional[datetime]
+    last_reported_at: Optional[datetime]
+    reports_per_hour: float
+
+
 class SimilarStory(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
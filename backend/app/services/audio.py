@@ -0,0 +1,207 @@
+"""Audio processing: metadata and waveform at upload, compact Opus transcode in the background.
+
+``analyse_audio`` runs inside ``POST /stories`` so feed cards get duration, sample rate and a
+waveform without fetching audio. It gets a short timeout there; an upload too long to decode in
+time is analysed by ``process_story_audio``, which then transcodes it. Both need an
+``ffmpeg`` binary for browser formats; without one only WAV uploads (read with the standard
+library) are analysed and nothing is transcoded.
+"""
+from __future__ import annotations
+
+import logging
+import re
+import shutil
+import subprocess
+import wave
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+from ..config import get_settings
+from ..database import session_scope
+from ..models import Story
+from .metrics import observe_upstream
+from .storage import resolve_audio_path
+
+
+logger = logging.getLogger("storycircle.audio")
+
+TRANSCODED_SUFFIX = ".ogg"
+# peaks only describe the envelope; decoding at 8 kHz keeps analysis cheap
+ANALYSIS_SAMPLE_RATE = 8000
+# single-pass EBU R128 normalisation to a speech-friendly loudness target
+LOUDNORM_FILTER = "loudnorm=I=-16:LRA=11:TP=-1.5"
+PEAK_MAX = 127
+_STREAM_RATE = re.compile(rb"Audio: .*?(\d+) Hz")
+
+
+@dataclass
+class AudioAnalysis:
+    duration_seconds: float
+    sample_rate: Optional[int]
+    peaks: bytes  # packed int8, one 0-127 value per bucket, scaled to the loudest bucket
+
+    def as_columns(self) -> dict:
+        return {
+            "audio_duration_seconds": round(self.duration_seconds, 3),
+            "audio_sample_rate": self.sample_rate,
+            "audio_peaks": self.peaks,
+        }
+
+
+def ffmpeg_binary() -> Optional[str]:
+    return shutil.which(get_settings().ffmpeg_path)
+
+
+def compute_peaks(pcm: bytes, buckets: int, channels: int = 1) -> bytes:
+    """Max absolute amplitude per bucket of interleaved little-endian 16-bit ``pcm``, as int8."""
+    import numpy as np
+
+    samples = np.frombuffer(pcm, dtype="<i2", count=len(pcm) // 2)
+    # the first channel is enough for a waveform preview
+    samples = samples[:: max(channels, 1)]
+    if not samples.size or buckets <= 0:
+        return b""
+    buckets = min(buckets, samples.size)
+    # int32 so abs(-32768) does not wrap; pad with silence to a whole number of buckets
+    magnitudes = np.abs(samples.astype(np.int32))
+    per_bucket = -(-magnitudes.size // buckets)
+    magnitudes = np.pad(magnitudes, (0, per_bucket * buckets - magnitudes.size))
+    peaks = magnitudes.reshape(buckets, per_bucket).max(axis=1)
+    loudest = int(peaks.max()) or 1
+    return np.rint(peaks * (PEAK_MAX / loudest)).astype(np.int8).tobytes()
+
+
+def analyse_wav(path: Path, buckets: int) -> Optional[AudioAnalysis]:
+    """Metadata and peaks of a 16-bit PCM WAV file without ffmpeg; None for anything else."""
+    try:
+        with wave.open(str(path), "rb") as reader:
+            if reader.getsampwidth() != 2:
+                return None
+            channels = reader.getnchannels()
+            frames = reader.getnframes()
+            rate = reader.getframerate()
+            pcm = reader.readframes(frames)
+    except (wave.Error, EOFError):
+        return None
+    return AudioAnalysis(
+        duration_seconds=frames / rate if rate else 0.0,
+        sample_rate=rate or None,
+        peaks=compute_peaks(pcm, buckets, channels),
+    )
+
+
+def analyse_with_ffmpeg(binary: str, path: Path, buckets: int, timeout: float) -> AudioAnalysis:
+    """Decode to mono 8 kHz PCM on a pipe; the source sample rate comes from ffmpeg's stream info."""
+    command = [
+        binary, "-hide_banner", "-i", str(path),
+        "-ac", "1", "-ar", str(ANALYSIS_SAMPLE_RATE), "-f", "s16le", "-",
+    ]
+    with observe_upstream("ffmpeg", "analyse"):
+        result = subprocess.run(command, capture_output=True, check=True, timeout=timeout)
+    match = _STREAM_RATE.search(result.stderr)
+    return AudioAnalysis(
+        duration_seconds=len(result.stdout) // 2 / ANALYSIS_SAMPLE_RATE,
+        sample_rate=int(match.group(1)) if match else None,
+        peaks=compute_peaks(result.stdout, buckets),
+    )
+
+
+def analyse_audio(path: Path, timeout: float) -> Optional[AudioAnalysis]:
+    """Duration, sample rate and waveform of an upload; None when it cannot be decoded in ``timeout``."""
+    settings = get_settings()
+    binary = ffmpeg_binary()
+    if binary is None:
+        return analyse_wav(path, settings.audio_waveform_peaks)
+    try:
+        return analyse_with_ffmpeg(binary, path, settings.audio_waveform_peaks, timeout)
+    except subprocess.TimeoutExpired:
+        logger.info("analysing %s took over %ss", path.name, timeout)
+        return None
+    except (OSError, subprocess.SubprocessError) as exc:
+        logger.warning("analysing %s failed: %s", path.name, exc)
+        return None
+
+
+def transcode_to_opus(binary: str, source: Path, destination: Path, bitrate_kbps: int, timeout: float) -> None:
+    """Loudness-normalised mono Opus in an Ogg container, tuned for speech."""
+    command = [
+        binary, "-v", "error", "-y", "-i", str(source), "-vn",
+        "-af", LOUDNORM_FILTER, "-ac", "1",
+        "-c:a", "libopus", "-b:a", f"{bitrate_kbps}k", "-application", "voip",
+        str(destination),
+    ]
+    with observe_upstream("ffmpeg", "transcode"):
+        subprocess.run(command, capture_output=True, check=True, timeout=timeout)
+
+
+def _update_story_audio(story_id: int, filename: str, values: dict) -> bool:
+    """Write ``values`` unless the story is gone or no longer plays ``filename``."""
+    with session_scope() as session:
+        story = session.get(Story, story_id)
+        if story is None or story.audio_url != filename:
+            return False
+        for column, value in values.items():
+            setattr(story, column, value)
+        session.add(story)
+    return True
+
+
+def process_story_audio(story_id: int) -> None:
+    """Background task: analyse the upload if the request could not, then swap it for a
+    loudness-normalised Opus transcode."""
+    settings = get_settings()
+    binary = ffmpeg_binary()
+    if binary is None:
+        return
+    with session_scope() as session:
+        story = session.get(Story, story_id)
+        if story is None or story.audio_processed_at is not None:
+            return
+        filename = story.audio_url
+        analysed = story.audio_peaks is not None
+    source = resolve_audio_path(filename)
+    if not source.is_file():
+        logger.warning("story %s: audio file %s is missing", story_id, filename)
+        return
+    if not analysed:
+        # measured on the upload: the transcode is always 48 kHz
+        analysis = analyse_audio(source, settings.audio_timeout_seconds)
+        if analysis is not None:
+            _update_story_audio(story_id, filename, analysis.as_columns())
+
+    destination = source.with_suffix(TRANSCODED_SUFFIX)
+    if destination == source:
+        # .ogg uploads are normalised too, but ffmpeg cannot write over its input
+        destination = source.with_name(f"{source.stem}_opus{TRANSCODED_SUFFIX}")
+    try:
+        transcode_to_opus(binary, source, destination, settings.audio_bitrate_kbps, settings.audio_timeout_seconds)
+    except (OSError, subprocess.SubprocessError) as exc:
+        # keep the original upload playable; the job can be retried later
+        logger.warning("story %s: transcoding %s failed: %s", story_id, filename, exc)
+        destination.unlink(missing_ok=True)
+        return
+
+    transcoded_size = destination.stat().st_size
+    swapped = _update_story_audio(
+        story_id,
+        filename,
+        {"audio_url": destination.name, "audio_size_bytes": transcoded_size, "audio_processed_at": datetime.utcnow()},
+    )
+    if not swapped:
+        # deleted or re-recorded meanwhile: the upload is not ours to remove, the transcode is unused
+        logger.info("story %s: %s was replaced during transcoding", story_id, filename)
+        destination.unlink(missing_ok=True)
+        return
+    # only drop the original once the story points at the transcoded file
+    original_size = source.stat().st_size
+    source.unlink(missing_ok=True)
+    logger.info(
+        "story %s: transcoded %s (%d bytes) -> %s (%d bytes)",
+        story_id,
+        filename,
+        original_size,
+        destination.name,
+        transcoded_size,
+    )
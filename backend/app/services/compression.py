@@ -0,0 +1,45 @@
+"""Compression for large text columns stored out of line (story bodies).
+
+zstd when the optional ``zstandard`` package is installed, zlib otherwise. The codec is
+recorded next to every blob so rows written under either stay readable.
+"""
+from __future__ import annotations
+
+import zlib
+from typing import Optional
+
+try:  # optional: ~20-30% smaller than zlib on transcripts at a similar speed
+    import zstandard
+except ImportError:  # pragma: no cover - depends on the environment
+    zstandard = None
+
+
+ZSTD = "zstd"
+ZLIB = "zlib"
+ZSTD_LEVEL = 9
+ZLIB_LEVEL = 6
+
+DEFAULT_CODEC = ZSTD if zstandard is not None else ZLIB
+
+
+def compress_text(value: Optional[str], codec: str = DEFAULT_CODEC) -> bytes:
+    data = (value or "").encode("utf-8")
+    if codec == ZSTD:
+        if zstandard is None:
+            raise RuntimeError("zstd compression requires the 'zstandard' package")
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    if codec == ZLIB:
+        return zlib.compress(data, ZLIB_LEVEL)
+    raise ValueError(f"Unknown codec: {codec}")
+
+
+def decompress_text(blob: Optional[bytes], codec: str) -> str:
+    if not blob:
+        return ""
+    if codec == ZSTD:
+        if zstandard is None:
+            raise RuntimeError("Reading zstd-compressed text requires the 'zstandard' package")
+        return zstandard.ZstdDecompressor().decompress(blob).decode("utf-8")
+    if codec == ZLIB:
+        return zlib.decompress(blob).decode("utf-8")
+    raise ValueError(f"Unknown codec: {codec}")
@@ -1,12 +1,13 @@
 from __future__ import annotations
 
-import textwrap
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional
 
 import httpx
 
 from ..config import get_settings
+from .metrics import observe_upstream
 
 
 ELEVENLABS_STT_ENDPOINT = "https://api.elevenlabs.io/v1/speech-to-text"
@@ -31,12 +32,13 @@ class ElevenLabsService:
             return simulated_text
 
         headers = {"xi-api-key": self.api_key}
-        async with httpx.AsyncClient(timeout=60) as client:
-            with audio_path.open("rb") as payload:
-                files = {"file": (audio_path.name, payload, "application/octet-stream")}
-                response = await client.post(ELEVENLABS_STT_ENDPOINT, headers=headers, files=files)
-                response.raise_for_status()
-                data = response.json()
+        with observe_upstream("elevenlabs", "speech_to_text"):
+            async with httpx.AsyncClient(timeout=60) as client:
+                with audio_path.open("rb") as payload:
+                    files = {"file": (audio_path.name, payload, "application/octet-stream")}
+                    response = await client.post(ELEVENLABS_STT_ENDPOINT, headers=headers, files=files)
+                    response.raise_for_status()
+                    data = response.json()
         # expected keys differ depending on version; normalize
         transcript = data.get("text") or data.get("transcript") or ""
         cleaned = transcript.strip()
@@ -47,10 +49,11 @@ class ElevenLabsService:
             return text.encode("utf-8")
         headers = {"xi-api-key": self.api_key, "Content-Type": "application/json"}
         payload = {"text": text, "voice_settings": {"stability": 0.4, "similarity_boost": 0.8}}
-        async with httpx.AsyncClient(timeout=60) as client:
-            response = await client.post(f"{ELEVENLABS_TTS_ENDPOINT}/{self.voice_id}", headers=headers, json=payload)
-            response.raise_for_status()
-            return response.content
+        with observe_upstream("elevenlabs", "text_to_speech"):
+            async with httpx.AsyncClient(timeout=60) as client:
+                response = await client.post(f"{ELEVENLABS_TTS_ENDPOINT}/{self.voice_id}", headers=headers, json=payload)
+                response.raise_for_status()
+                return response.content
 
     async def create_conversation_token(self, agent_id: str) -> str:
         if not agent_id:
@@ -58,13 +61,14 @@ class ElevenLabsService:
         if not self.enabled:
             return f"dev-token-{agent_id}"
         headers = {"xi-api-key": self.api_key}
-        async with httpx.AsyncClient(timeout=30) as client:
-            response = await client.get(
-                f"{ELEVENLABS_CONVERSATION_TOKEN_ENDPOINT}?agent_id={agent_id}",
-                headers=headers,
-            )
-            response.raise_for_status()
-            data = response.json()
+        with observe_upstream("elevenlabs", "conversation_token"):
+            async with httpx.AsyncClient(timeout=30) as client:
+                response = await client.get(
+                    f"{ELEVENLABS_CONVERSATION_TOKEN_ENDPOINT}?agent_id={agent_id}",
+                    headers=headers,
+                )
+                response.raise_for_status()
+                data = response.json()
         token = data.get("token")
         if not token:
             raise RuntimeError("Conversation token not present in ElevenLabs response.")
@@ -77,17 +81,12 @@ class ElevenLabsService:
 
     @staticmethod
     def _build_transcription_payload(text: str) -> dict:
+        # title, abstract and tags are derived by services/enrichment.py once the text is stored
         cleaned = text or "Untitled story"
-        title = cleaned.split(".")[0][:80] or "Untitled Story"
-        abstract = textwrap.shorten(cleaned, width=160, placeholder="...")
-        return {
-            "text": cleaned,
-            "raw_transcript": cleaned,
-            "title": title.strip() or "Untitled Story",
-            "abstract": abstract,
-        }
+        return {"text": cleaned, "raw_transcript": cleaned}
 
 
+@lru_cache
 def get_elevenlabs_service() -> ElevenLabsService:
     settings = get_settings()
     return ElevenLabsService(settings.elevenlabs_api_key, settings.elevenlabs_voice_id or None)
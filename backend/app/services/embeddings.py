@@ -0,0 +1,339 @@
+"""Local story embeddings and an in-process cosine index for similar-story recommendations.
+
+Vectors are computed on the CPU when a story's text is written and stored as float32 in
+``story_embeddings``. The default embedder is a hashed bag of words/bigrams (no model download);
+the index weights it with IDF from the indexed corpus and centres it at search time. Setting
+``STORYCIRCLE_EMBEDDING_MODEL`` to a sentence-transformers model name uses that model instead
+when the package is installed.
+
+``VectorIndex`` keeps every vector of the active embedder in one NumPy matrix and answers top-k
+queries by brute force (exact; comfortably fast up to tens of thousands of stories).
+"""
+from __future__ import annotations
+
+import logging
+import re
+import threading
+import time
+import zlib
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload
+from sqlmodel import Session
+
+from ..config import get_settings
+from ..models import Story, StoryEmbedding
+
+
+logger = logging.getLogger("storycircle.embeddings")
+
+HASHING_DIM = 512
+HASHING_MODEL = f"hashing-tfidf-{HASHING_DIM}"
+CENTRE_MIN_STORIES = 50
+# below this, cosine between hashed vectors is mostly bucket collisions
+MIN_COSINE = 0.05
+DEFAULT_STORY_TITLE = "Untitled Story"
+_TOKEN = re.compile(r"[^\W\d_]{2,}")
+STOP_WORDS = frozenset(
+    """
+    a about after again all also am an and any are as at be because been before being but by can
+    could did do does doing down during each few for from had has have having he her here hers him
+    his how i if in into is it its just me more most my no nor not now of off on once only or other
+    our out over own same she should so some such than that the their them then there these they
+    this those through to too under until up very was we were what when where which while who whom
+    why will with would you your
+    """.split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    return [token for token in _TOKEN.findall(text.lower()) if token not in STOP_WORDS]
+
+
+class HashingEmbedder:
+    """Signed feature hashing of unigrams and bigrams with sublinear term frequency."""
+
+    name = HASHING_MODEL
+    # raw vectors carry term frequencies only; the index applies corpus IDF before comparing
+    uses_idf = True
+
+    def __init__(self, dim: int = HASHING_DIM) -> None:
+        self.dim = dim
+
+    def embed(self, texts: Sequence[str]):
+        import numpy as np
+
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            tokens = tokenize(text)
+            features = tokens + [f"{first} {second}" for first, second in zip(tokens, tokens[1:])]
+            if not features:
+                continue
+            # crc32 is stable across processes, unlike hash(); the top bit picks the sign
+            hashes = np.fromiter((zlib.crc32(feature.encode("utf-8")) for feature in features), dtype=np.uint32)
+            signs = np.where(hashes & 0x80000000, -1.0, 1.0)
+            counts = np.bincount(hashes % self.dim, weights=signs, minlength=self.dim)
+            vectors[row] = np.sign(counts) * np.log1p(np.abs(counts))
+        return vectors
+
+
+class SentenceTransformerEmbedder:
+    """Any sentence-transformers model, run on the CPU."""
+
+    uses_idf = False
+
+    def __init__(self, model_name: str) -> None:
+        from sentence_transformers import SentenceTransformer
+
+        self.name = model_name[:64]
+        self._model = SentenceTransformer(model_name, device="cpu")
+        self.dim = self._model.get_sentence_embedding_dimension()
+
+    def embed(self, texts: Sequence[str]):
+        import numpy as np
+
+        return np.asarray(self._model.encode(list(texts), normalize_embeddings=True), dtype=np.float32)
+
+
+@lru_cache
+def get_embedder():
+    model_name = get_settings().embedding_model
+    if model_name:
+        try:
+            return SentenceTransformerEmbedder(model_name)
+        except Exception as exc:  # ImportError, or the model cannot be loaded offline
+            logger.warning("embedding model %s unavailable (%s); using %s", model_name, exc, HASHING_MODEL)
+    return HashingEmbedder()
+
+
+def story_document(title: Optional[str], text: Optional[str]) -> str:
+    # the placeholder title would make every untitled story look alike
+    if title == DEFAULT_STORY_TITLE:
+        title = None
+    return f"{title or ''}\n{text or ''}".strip()
+
+
+class VectorIndex:
+    """Exact top-k cosine search over all stored vectors of one embedder.
+
+    ``upsert`` updates or appends a single row of the built matrix, weighted with the IDF and
+    centre of the last build; the periodic reload from ``ensure_fresh`` rebuilds it from scratch.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        # one reload at a time: requests that find the index stale while another thread reads
+        # the table wait for it instead of reading the table again
+        self._reload_lock = threading.Lock()
+        self._vectors: Dict[int, object] = {}
+        self._model: Optional[str] = None
+        self._loaded_at: Optional[float] = None
+        self._reloading: Optional[Dict[int, object]] = None  # upserts made while a reload reads
+        self._ids = None
+        self._matrix = None  # IDF-weighted and centred (hashing embedder), L2-normalised rows
+        self._count = 0  # rows in use; the matrix grows geometrically as stories are added
+        self._positions: Dict[int, int] = {}
+        self._idf = None
+        self._centre = None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._vectors = {}
+            self._loaded_at = None
+            self._invalidate()
+
+    def _invalidate(self) -> None:
+        """Drop the built matrix; the next search rebuilds it from ``_vectors``. Hold ``_lock``."""
+        self._ids = self._matrix = None
+        self._count = 0
+        self._positions = {}
+
+    def _is_fresh(self, model: str, ttl_seconds: float) -> bool:
+        with self._lock:
+            return (
+                self._loaded_at is not None
+                and self._model == model
+                and time.monotonic() - self._loaded_at < ttl_seconds
+            )
+
+    def ensure_fresh(self, session: Session, ttl_seconds: float) -> None:
+        """Reload from the database when never loaded or older than ``ttl_seconds``.
+
+        Writes in this process are applied immediately via ``upsert``; the reload picks up
+        vectors written by other workers.
+        """
+        import numpy as np
+
+        embedder = get_embedder()
+        if self._is_fresh(embedder.name, ttl_seconds):
+            return
+        with self._reload_lock:
+            if self._is_fresh(embedder.name, ttl_seconds):
+                return
+            with self._lock:
+                self._reloading = {}
+            try:
+                rows = session.exec(
+                    select(StoryEmbedding.story_id, StoryEmbedding.vector).where(StoryEmbedding.model == embedder.name)
+                ).all()
+            finally:
+                with self._lock:
+                    upserted, self._reloading = self._reloading, None
+            vectors = {story_id: np.frombuffer(blob, dtype=np.float32) for story_id, blob in rows}
+            # vectors staged in this process during the read may be missing from the rows
+            vectors.update(upserted)
+            with self._lock:
+                self._vectors = vectors
+                self._model = embedder.name
+                self._loaded_at = time.monotonic()
+                self._invalidate()
+
+    def upsert(self, story_id: int, vector, model: str) -> None:
+        with self._lock:
+            if self._reloading is not None:
+                self._reloading[story_id] = vector
+            if self._loaded_at is None or model != self._model:
+                return  # not loaded yet: the first search reads it from the database
+            self._vectors[story_id] = vector
+            if self._matrix is not None:
+                self._place(story_id, vector)
+            else:
+                self._invalidate()
+
+    def _project(self, matrix):
+        import numpy as np
+
+        if self._idf is not None:
+            matrix = matrix * self._idf
+        if self._centre is not None:
+            matrix = matrix - self._centre
+        norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+        norms[norms == 0] = 1
+        return matrix / norms
+
+    def _place(self, story_id: int, vector) -> None:
+        import numpy as np
+
+        row = self._positions.get(story_id)
+        if row is None:
+            row = self._count
+            if row == len(self._matrix):
+                self._matrix = np.concatenate([self._matrix, np.zeros_like(self._matrix)])
+                self._ids = np.concatenate([self._ids, np.zeros_like(self._ids)])
+            self._ids[row] = story_id
+            self._positions[story_id] = row
+            self._count += 1
+        self._matrix[row] = self._project(np.asarray(vector, dtype=np.float32))
+
+    def _build(self) -> None:
+        import numpy as np
+
+        ids = np.fromiter(self._vectors, dtype=np.int64, count=len(self._vectors))
+        self._idf = self._centre = None
+        if not len(ids):
+            self._ids, self._matrix, self._count, self._positions = ids, None, 0, {}
+            return
+        matrix = np.vstack([self._vectors[story_id] for story_id in ids.tolist()]).astype(np.float32)
+        if get_embedder().uses_idf:
+            document_frequency = np.count_nonzero(matrix, axis=0)
+            self._idf = (np.log((1 + len(ids)) / (1 + document_frequency)) + 1).astype(np.float32)
+            # hashed buckets mix many words; centring removes what every story shares, but on a
+            # handful of stories it would push every pair apart
+            if len(ids) >= CENTRE_MIN_STORIES:
+                self._centre = (matrix * self._idf).mean(axis=0)
+        self._ids, self._matrix, self._count = ids, self._project(matrix), len(ids)
+        self._positions = {story_id: row for row, story_id in enumerate(ids.tolist())}
+
+    def search(self, story_id: int, k: int) -> List[Tuple[int, float]]:
+        """Top ``k`` (story_id, cosine) neighbours of an indexed story, best first."""
+        import numpy as np
+
+        with self._lock:
+            if self._ids is None:
+                self._build()
+            row = self._positions.get(story_id)
+            if row is None or self._matrix is None:
+                return []
+            matrix = self._matrix[: self._count]
+            scores = matrix @ matrix[row]
+            scores[row] = -np.inf
+            k = min(k, len(scores) - 1)
+            if k <= 0:
+                return []
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+            return [(int(self._ids[i]), float(scores[i])) for i in top if scores[i] > MIN_COSINE]
+
+
+vector_index = VectorIndex()
+
+
+def get_vector_index() -> VectorIndex:
+    return vector_index
+
+
+def embed_stories(session: Session, stories: Sequence[Story]) -> int:
+    """Compute and stage embeddings for ``stories`` (which must have ids); caller commits."""
+    embedder = get_embedder()
+    pending = [(story, story_document(story.title, story.text)) for story in stories]
+    pending = [(story, document) for story, document in pending if document]
+    if not pending:
+        return 0
+    vectors = embedder.embed([document for _, document in pending])
+    existing = {
+        row.story_id: row
+        for row in session.exec(
+            select(StoryEmbedding).where(StoryEmbedding.story_id.in_([story.id for story, _ in pending]))
+        ).scalars()
+    }
+    for (story, _), vector in zip(pending, vectors):
+        row = existing.get(story.id) or StoryEmbedding(story_id=story.id)
+        row.model = embedder.name
+        row.vector = vector.tobytes()
+        row.updated_at = datetime.utcnow()
+        session.add(row)
+        vector_index.upsert(story.id, vector, embedder.name)
+    return len(pending)
+
+
+def embed_story(session: Session, story: Story) -> None:
+    """Stage the embedding of one story after its text changed; call once it has an id."""
+    embed_stories(session, [story])
+
+
+def tag_similarity(left: Iterable[str], right: Iterable[str]) -> float:
+    """Case-insensitive Jaccard overlap of two tag lists."""
+    left_keys = {tag.strip().casefold() for tag in left if tag.strip()}
+    right_keys = {tag.strip().casefold() for tag in right if tag.strip()}
+    if not left_keys or not right_keys:
+        return 0.0
+    return len(left_keys & right_keys) / len(left_keys | right_keys)
+
+
+def blend_scores(cosine: float, tags: float, vector_weight: float) -> float:
+    return vector_weight * max(cosine, 0.0) + (1 - vector_weight) * tags
+
+
+def backfill_embeddings(session: Session, batch_size: int = 200) -> int:
+    """Embed stories that have text but no vector from the active embedder; returns the count."""
+    embedder = get_embedder()
+    embedded = 0
+    last_id = 0
+    while True:
+        stories = session.exec(
+            select(Story)
+            .outerjoin(StoryEmbedding, StoryEmbedding.story_id == Story.id)
+            .where(Story.id > last_id)
+            .where(StoryEmbedding.story_id.is_(None) | (StoryEmbedding.model != embedder.name))
+            .options(selectinload(Story.body))
+            .order_by(Story.id)
+            .limit(batch_size)
+        ).scalars().all()
+        if not stories:
+            return embedded
+        embedded += embed_stories(session, stories)
+        session.commit()
+        last_id = stories[-1].id
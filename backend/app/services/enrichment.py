@@ -0,0 +1,427 @@
+"""Tags, title and abstract derived from a story's transcript, one batch at a time.
+
+The local enricher needs no model: it scores each story's terms by sublinear frequency weighted
+with the inverse document frequency of the batch, prefers tags the corpus already uses (so new
+stories land in the existing ``?tag=`` filters and similarity overlap), and picks the best-scoring
+sentences as the abstract. With ``STORYCIRCLE_ENRICHMENT_USE_LLM`` and an OpenAI key, a whole
+batch goes to the model in a single request instead; anything the model leaves out falls back to
+the local result.
+
+Generated tags are only ever appended to the storyteller's own, a title is only filled in while
+the story still has the placeholder, and ``enriched_at`` marks stories the backlog job is done
+with. ``enrich_backlog`` pages through the rest by id and writes each batch back with one
+executemany ``UPDATE`` in its own transaction.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+import re
+import textwrap
+import threading
+import time
+from collections import Counter
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence
+
+from sqlalchemy import String, bindparam, cast, func, select, true, update
+from sqlalchemy.orm import selectinload
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlmodel import Session
+
+from ..config import get_settings
+from ..database import get_read_engine
+from ..models import ModerationStatus, Story, StoryBody
+from .embeddings import DEFAULT_STORY_TITLE, embed_stories, tokenize
+
+
+logger = logging.getLogger("storycircle.enrichment")
+
+TITLE_WIDTH = 80
+ABSTRACT_WIDTH = 240
+ABSTRACT_SENTENCES = 2
+# tags already in use are preferred over new keywords of the same weight
+VOCABULARY_BOOST = 2.0
+VOCABULARY_SIZE = 500
+# a new keyword must recur; one-off words make noisy tags
+MIN_KEYWORD_COUNT = 2
+MIN_KEYWORD_LENGTH = 4
+MAX_TAG_LENGTH = 40
+# spoken-language words that are frequent in every transcript and describe none of them
+FILLER_WORDS = frozenset(
+    """
+    actually again almost always anyway around away back came come could didn even ever every
+    first gone good great just know like little long made make many much never okay one only
+    really remember said say something still story thing things think though time told took
+    two used usually want well went whole yeah year years
+    """.split()
+)
+# a run of text up to sentence-ending punctuation; "3.5" and "...really" do not end a sentence
+_SENTENCE = re.compile(r"(?:[^.!?\n]+|[.!?]+(?=\S))+[.!?]*")
+_WORD = re.compile(r"[^\W\d_]+")
+_LEADING_FILLER = re.compile(r"^(?:(?:so|well|um+|uh+|oh|okay|and|yeah)\b[\s,]*)+", re.IGNORECASE)
+
+
+@dataclass
+class Enrichment:
+    title: str
+    abstract: Optional[str]
+    tags: List[str] = field(default_factory=list)
+
+
+@dataclass
+class EnrichmentReport:
+    scanned_stories: int = 0
+    enriched_stories: int = 0
+    tagged_stories: int = 0
+    titled_stories: int = 0
+    skipped_stories: int = 0  # edited while their batch was being enriched; left for the next run
+    batches: int = 0
+    duration_seconds: float = 0.0
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+def _stem(term: str) -> str:
+    # enough to fold "trams" into "tram" without a stemmer dependency
+    if len(term) > MIN_KEYWORD_LENGTH and term.endswith("s") and not term.endswith("ss"):
+        return term[:-1]
+    return term
+
+
+def _terms(text: str) -> List[str]:
+    return [
+        _stem(token) for token in tokenize(text) if len(token) >= MIN_KEYWORD_LENGTH and token not in FILLER_WORDS
+    ]
+
+
+def _sentences(text: str) -> List[str]:
+    return [sentence.strip() for sentence in _SENTENCE.findall(text or "") if sentence.strip()]
+
+
+def _shorten(text: str, width: int) -> str:
+    # textwrap splits the whole string; no more than ``width`` words can fit, so hand it only those
+    return textwrap.shorten(" ".join(text.split(None, width)[:width]), width=width, placeholder="...")
+
+
+def _without_lead_in(sentence: str) -> str:
+    cleaned = _LEADING_FILLER.sub("", sentence) or sentence
+    return cleaned[:1].upper() + cleaned[1:]
+
+
+def _headline(sentences: List[str], width: int = TITLE_WIDTH) -> str:
+    """First sentence without spoken lead-ins, cut at a word boundary."""
+    if not sentences:
+        return DEFAULT_STORY_TITLE
+    return _shorten(_without_lead_in(sentences[0]).rstrip(".!?,;: "), width) or DEFAULT_STORY_TITLE
+
+
+def _summary(sentences: List[str], weights: Dict[str, float], width: int = ABSTRACT_WIDTH) -> Optional[str]:
+    """The best-scoring sentences, in their original order, cut to ``width``."""
+    if not sentences:
+        return None
+    if len(sentences) > ABSTRACT_SENTENCES:
+
+        def score(index: int) -> float:
+            words = _WORD.findall(sentences[index])
+            return sum(weights.get(term, 0.0) for term in _terms(sentences[index])) / math.sqrt(len(words) + 1)
+
+        # ties go to the earlier sentence
+        best = sorted(range(len(sentences)), key=lambda index: (-score(index), index))[:ABSTRACT_SENTENCES]
+        sentences = [sentences[index] for index in sorted(best)]
+    return _shorten(" ".join(map(_without_lead_in, sentences)), width)
+
+
+def merge_tags(existing: Sequence[str], generated: Sequence[str], max_tags: int) -> List[str]:
+    """``existing`` unchanged, then new ``generated`` tags (case-insensitively) up to ``max_tags``."""
+    merged = list(existing)
+    seen = {tag.casefold() for tag in merged}
+    for tag in generated:
+        if len(merged) >= max_tags:
+            break
+        if tag.casefold() not in seen:
+            seen.add(tag.casefold())
+            merged.append(tag)
+    return merged
+
+
+class KeywordEnricher:
+    """Batch TF-IDF keywords, matched against the tags already in use."""
+
+    name = "keywords"
+
+    def __init__(self, max_tags: int) -> None:
+        self.max_tags = max_tags
+
+    def enrich(self, texts: Sequence[str], vocabulary: Sequence[str] = ()) -> List[Enrichment]:
+        counts = [Counter(_terms(text)) for text in texts]
+        document_frequency = Counter(term for story_counts in counts for term in story_counts)
+        # first spelling wins; the vocabulary comes most-used first
+        known: Dict[str, str] = {}
+        for tag in vocabulary:
+            known.setdefault(tag.strip().casefold(), tag.strip())
+        results = []
+        for text, story_counts in zip(texts, counts):
+            weights = {
+                term: (1 + math.log(count)) * (math.log((1 + len(texts)) / (1 + document_frequency[term])) + 1)
+                for term, count in story_counts.items()
+            }
+            sentences = _sentences(text)
+            results.append(
+                Enrichment(
+                    title=_headline(sentences),
+                    abstract=_summary(sentences, weights),
+                    tags=self._tags(text, story_counts, weights, known),
+                )
+            )
+        return results
+
+    def _tags(self, text: str, counts: Counter, weights: Dict[str, float], known: Dict[str, str]) -> List[str]:
+        scored: Dict[str, float] = {}
+        phrases = f" {' '.join(_WORD.findall(text.casefold()))} "
+        for key, tag in known.items():
+            parts = [_stem(part) for part in key.split()]
+            if f" {key} " in phrases or (len(parts) == 1 and parts[0] in weights):
+                # short or stop-listed words have no weight of their own
+                scored[tag] = max(sum(weights.get(part, 0.0) for part in parts), 1.0) * VOCABULARY_BOOST
+        covered = {_stem(part) for tag in scored for part in tag.casefold().split()}
+        for term, count in counts.items():
+            if count >= MIN_KEYWORD_COUNT and term not in covered:
+                scored[term.capitalize()] = weights[term]
+        ranked = sorted(scored, key=lambda tag: (-scored[tag], tag))
+        return ranked[: self.max_tags]
+
+
+def tag_vocabulary(session: Session, limit: int = VOCABULARY_SIZE) -> List[str]:
+    """The most used tags of live stories, most used first (one aggregate over the tag arrays)."""
+    dialect_name = session.get_bind().dialect.name
+    elements = func.jsonb_array_elements_text if dialect_name == "postgresql" else func.json_each
+    tag = elements(Story.tags).table_valued("value").alias("tag")
+    uses = func.count()
+    rows = session.exec(
+        select(tag.c.value, uses)
+        .select_from(Story)
+        .join(tag, true())
+        .where(Story.moderation_status != ModerationStatus.removed)
+        .group_by(tag.c.value)
+        .order_by(uses.desc(), tag.c.value)
+        .limit(limit)
+    )
+    return [value for value, _ in rows if isinstance(value, str) and value.strip()]
+
+
+class TagVocabulary:
+    """Per-worker ``tag_vocabulary``, reloaded once it is older than the TTL (like ``VectorIndex``)."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._tags: List[str] = []
+        self._loaded_at: Optional[float] = None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._tags = []
+            self._loaded_at = None
+
+    def get(self, ttl_seconds: float) -> List[str]:
+        # checked and loaded under the lock, so concurrent misses share one aggregate
+        with self._lock:
+            if self._loaded_at is None or time.monotonic() - self._loaded_at >= ttl_seconds:
+                with Session(get_read_engine()) as session:
+                    self._tags = tag_vocabulary(session)
+                self._loaded_at = time.monotonic()
+            return self._tags
+
+    def replace(self, tags: Sequence[str]) -> None:
+        with self._lock:
+            self._tags = list(tags)
+            self._loaded_at = time.monotonic()
+
+
+vocabulary_cache = TagVocabulary()
+
+
+def get_tag_vocabulary() -> TagVocabulary:
+    return vocabulary_cache
+
+
+def _clean_llm_result(item: Optional[dict], fallback: Enrichment, max_tags: int) -> Enrichment:
+    if not isinstance(item, dict):
+        return fallback
+    title = item.get("title")
+    abstract = item.get("abstract")
+    tags = item.get("tags")
+    tags = [tag.strip() for tag in tags if isinstance(tag, str) and tag.strip()] if isinstance(tags, list) else []
+    return Enrichment(
+        title=_shorten(title, TITLE_WIDTH)
+        if isinstance(title, str) and title.strip()
+        else fallback.title,
+        abstract=_shorten(abstract, ABSTRACT_WIDTH * 2)
+        if isinstance(abstract, str) and abstract.strip()
+        else fallback.abstract,
+        tags=[tag for tag in tags if len(tag) <= MAX_TAG_LENGTH][:max_tags] or fallback.tags,
+    )
+
+
+def _uses_llm(llm) -> bool:
+    return llm is not None and get_settings().enrichment_use_llm and llm.enabled
+
+
+async def generate_enrichments(texts: Sequence[str], vocabulary: Sequence[str], llm=None) -> List[Enrichment]:
+    """Enrich ``texts`` locally, or with one model request for the batch when that is enabled."""
+    settings = get_settings()
+    local = KeywordEnricher(settings.enrichment_max_tags).enrich(texts, vocabulary)
+    if not _uses_llm(llm):
+        return local
+    try:
+        remote = await llm.enrich_stories(texts, vocabulary, settings.enrichment_max_tags)
+    except Exception:  # the local result is always good enough to store
+        logger.warning("model enrichment of %d stories failed; using keywords", len(texts), exc_info=True)
+        return local
+    # a short answer must not drop the stories after it
+    remote = list(remote)[: len(local)] + [None] * (len(local) - len(remote))
+    return [_clean_llm_result(item, fallback, settings.enrichment_max_tags) for item, fallback in zip(remote, local)]
+
+
+def enriched_values(story: Story, enrichment: Enrichment, *, replace_abstract: bool = False) -> dict:
+    """New ``title``/``abstract``/``tags``/``enriched_at`` for ``story``; user-set values are kept."""
+    untitled = not story.title or story.title == DEFAULT_STORY_TITLE
+    return {
+        "title": enrichment.title if untitled else story.title,
+        "abstract": enrichment.abstract if replace_abstract or not story.abstract else story.abstract,
+        "tags": merge_tags(story.tags or [], enrichment.tags, get_settings().enrichment_max_tags),
+        "enriched_at": datetime.utcnow(),
+    }
+
+
+async def enrich_text(text: str, llm=None) -> Optional[Enrichment]:
+    """Enrichment of one story's text against the cached vocabulary; ``None`` when it is empty.
+
+    Uses no session of the caller, so await it before writing: with the model enabled this is
+    an upstream round trip, which must not run inside an open write transaction.
+    """
+    if not text.strip():
+        return None
+    vocabulary = vocabulary_cache.get(get_settings().enrichment_vocabulary_ttl_seconds)
+    (enrichment,) = await generate_enrichments([text], vocabulary, llm)
+    return enrichment
+
+
+def apply_enrichment(story: Story, enrichment: Enrichment, *, replace_abstract: bool = False) -> None:
+    """Stage ``enriched_values`` on ``story``; the caller embeds and commits."""
+    for name, value in enriched_values(story, enrichment, replace_abstract=replace_abstract).items():
+        setattr(story, name, value)
+
+
+def _enrich_batch(texts: Sequence[str], vocabulary: Sequence[str], llm) -> List[Enrichment]:
+    if _uses_llm(llm):
+        # the backlog runs in a worker thread, which has no event loop of its own
+        return asyncio.run(generate_enrichments(texts, vocabulary, llm))
+    return KeywordEnricher(get_settings().enrichment_max_tags).enrich(texts, vocabulary)
+
+
+def enrich_backlog(
+    session: Session, llm=None, *, batch_size: Optional[int] = None, limit: Optional[int] = None
+) -> EnrichmentReport:
+    """Enrich live stories with text that were never enriched, one committed batch at a time.
+
+    Blocking (database I/O and CPU-bound scoring): call it from a worker thread, never the event loop.
+    A story edited while its batch is enriched keeps the edit and is skipped; its text, if new, is
+    enriched by a later run.
+    """
+    batch_size = batch_size or get_settings().enrichment_batch_size
+    started = time.perf_counter()
+    report = EnrichmentReport()
+    vocabulary = tag_vocabulary(session)
+    # the job reads it anyway; spares this worker's next transcription a reload
+    vocabulary_cache.replace(vocabulary)
+    stories_table = Story.__table__
+    # compared as text: SQLite stores timestamps as strings, and a value written by CURRENT_TIMESTAMP
+    # would not match the same instant bound back as a datetime
+    seen_updated_at = cast(stories_table.c.updated_at, String)
+    write = (
+        update(stories_table)
+        .where(
+            stories_table.c.id == bindparam("story_id"),
+            stories_table.c.enriched_at.is_(None),
+            seen_updated_at == bindparam("seen_updated_at"),
+        )
+        .values(
+            title=bindparam("new_title"),
+            abstract=bindparam("new_abstract"),
+            tags=bindparam("new_tags"),
+            enriched_at=bindparam("new_enriched_at"),
+        )
+    )
+    last_id = 0
+    while limit is None or report.scanned_stories < limit:
+        page = batch_size if limit is None else min(batch_size, limit - report.scanned_stories)
+        rows = session.exec(
+            select(Story, seen_updated_at.label("seen_updated_at"))
+            .join(StoryBody, StoryBody.story_id == Story.id)
+            .where(
+                Story.id > last_id,
+                Story.enriched_at.is_(None),
+                Story.moderation_status != ModerationStatus.removed,
+            )
+            .options(selectinload(Story.body))
+            .order_by(Story.id)
+            .limit(page)
+        ).all()
+        if not rows:
+            break
+        last_id = rows[-1][0].id
+        report.scanned_stories += len(rows)
+        pending = [(story, seen) for story, seen in rows if story.text.strip()]
+        # detached with their loaded state, so the read transaction can end before the (possibly
+        # remote, slow) enrichment instead of holding a snapshot or SQLite's shared lock through it
+        for story, _ in pending:
+            session.expunge(story)
+        session.rollback()
+        if not pending:
+            continue
+        enrichments = _enrich_batch([story.text for story, _ in pending], vocabulary, llm)
+        enriched_at = datetime.utcnow()
+        params, candidates = [], []
+        for (story, seen), enrichment in zip(pending, enrichments):
+            values = {**enriched_values(story, enrichment), "enriched_at": enriched_at}
+            candidates.append((story, values))
+            params.append(
+                {
+                    "story_id": story.id,
+                    "seen_updated_at": seen,
+                    **{f"new_{name}": value for name, value in values.items()},
+                }
+            )
+        session.connection().execute(write, params)
+        # executemany row counts are not reliable on every driver: read back which rows took the write
+        written = set(
+            session.exec(
+                select(Story.id).where(
+                    Story.id.in_([story.id for story, _ in candidates]), Story.enriched_at == enriched_at
+                )
+            ).scalars()
+        )
+        retitled = []
+        for story, values in candidates:
+            if story.id not in written:
+                report.skipped_stories += 1
+                continue
+            report.enriched_stories += 1
+            report.tagged_stories += len(values["tags"]) > len(story.tags or [])
+            if values["title"] != story.title:
+                # in-memory only, so the embedding below sees the new title without a second UPDATE
+                set_committed_value(story, "title", values["title"])
+                retitled.append(story)
+        # the title is part of the embedded document
+        embed_stories(session, retitled)
+        session.commit()
+        report.batches += 1
+        report.titled_stories += len(retitled)
+
+    report.duration_seconds = round(time.perf_counter() - started, 3)
+    logger.info("enrichment backlog: %s", report.as_dict())
+    return report
@@ -0,0 +1,107 @@
+"""In-process pub/sub for live reaction counts (``/stories/{id}/live``).
+
+Reaction endpoints run in the threadpool and call ``publish``; the hub moves the event onto the
+event loop and adds it to a per-story counter. Once per flush interval, every story with new
+reactions gets one delta message, encoded once and queued to each of its subscribers. A burst of
+reactions therefore costs each viewer one frame, and stories nobody watches cost nothing.
+"""
+from __future__ import annotations
+
+import asyncio
+from collections import Counter
+from typing import Dict, Optional, Set
+
+from ..schemas import ReactionEvent, ReactionSummary
+
+
+SUBSCRIBER_QUEUE_SIZE = 32
+# queued instead of a delta when a subscriber fell behind: it should send a fresh snapshot
+RESYNC = "resync"
+
+
+class ReactionHub:
+    def __init__(self, queue_size: int = SUBSCRIBER_QUEUE_SIZE) -> None:
+        self._queue_size = queue_size
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._dirty: Optional[asyncio.Event] = None
+        self._subscribers: Dict[int, Set[asyncio.Queue]] = {}
+        self._pending: Dict[int, Counter] = {}
+
+    async def run(self, interval_seconds: float) -> None:
+        """Flush coalesced deltas until cancelled; started from the app lifespan."""
+        self._loop = asyncio.get_running_loop()
+        self._dirty = asyncio.Event()
+        try:
+            while True:
+                await self._dirty.wait()
+                # the first reaction opens a coalescing window; the rest of the burst joins it
+                await asyncio.sleep(interval_seconds)
+                self._dirty.clear()
+                self.flush()
+        finally:
+            self._loop = self._dirty = None
+            self._pending.clear()
+
+    def publish(self, story_id: int, reaction_type: str) -> None:
+        """Record one reaction; safe to call from any thread."""
+        loop = self._loop
+        # unlocked read from a worker thread: a story gaining its first viewer right now
+        # may miss this reaction, which its snapshot already counts
+        if loop is None or story_id not in self._subscribers:
+            return
+        try:
+            loop.call_soon_threadsafe(self._record, story_id, reaction_type)
+        except RuntimeError:  # loop closed during shutdown
+            pass
+
+    def _record(self, story_id: int, reaction_type: str) -> None:
+        if story_id not in self._subscribers or self._dirty is None:
+            return
+        self._pending.setdefault(story_id, Counter())[reaction_type] += 1
+        self._dirty.set()
+
+    def flush(self) -> None:
+        pending, self._pending = self._pending, {}
+        for story_id, counts in pending.items():
+            queues = self._subscribers.get(story_id)
+            if not queues:
+                continue
+            message = ReactionEvent(
+                event="delta", story_id=story_id, reactions=ReactionSummary(**counts)
+            ).model_dump_json()
+            for queue in queues:
+                self._offer(queue, message)
+
+    @staticmethod
+    def _offer(queue: asyncio.Queue, message: str) -> None:
+        try:
+            queue.put_nowait(message)
+        except asyncio.QueueFull:
+            # a slow client gets one resync instead of an ever-growing backlog
+            while not queue.empty():
+                queue.get_nowait()
+            queue.put_nowait(RESYNC)
+
+    def subscribe(self, story_id: int) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(self._queue_size)
+        self._subscribers.setdefault(story_id, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, story_id: int, queue: asyncio.Queue) -> None:
+        queues = self._subscribers.get(story_id)
+        if queues is None:
+            return
+        queues.discard(queue)
+        if not queues:
+            del self._subscribers[story_id]
+            self._pending.pop(story_id, None)
+
+    def subscriber_count(self, story_id: int) -> int:
+        return len(self._subscribers.get(story_id, ()))
+
+
+reaction_hub = ReactionHub()
+
+
+def get_reaction_hub() -> ReactionHub:
+    return reaction_hub
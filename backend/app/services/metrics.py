@@ -0,0 +1,231 @@
+from __future__ import annotations
+
+import bisect
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+logger = logging.getLogger("storycircle.metrics")
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(pairs: Sequence[Tuple[str, str]]) -> str:
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+class Histogram:
+    """Minimal thread-safe Prometheus histogram keyed by a fixed label set."""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str], buckets: Sequence[float]):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self._series: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            # layout: per-bucket counts (+Inf last), then sum, then count
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0.0] * (len(self.buckets) + 3)
+            series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def reset(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = sorted((key, list(series)) for key, series in self._series.items())
+        for key, series in snapshot:
+            labels = list(zip(self.labelnames, key))
+            cumulative = 0.0
+            for bound, count in zip([*self.buckets, "+Inf"], series[:-2]):
+                cumulative += count
+                le = bound if isinstance(bound, str) else repr(float(bound))
+                lines.append(f"{self.name}_bucket{_format_labels([*labels, ('le', le)])} {int(cumulative)}")
+            lines.append(f"{self.name}_sum{_format_labels(labels)} {series[-2]}")
+            lines.append(f"{self.name}_count{_format_labels(labels)} {int(series[-1])}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._histograms: List[Histogram] = []
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        histogram = Histogram(name, documentation, labelnames, buckets)
+        self._histograms.append(histogram)
+        return histogram
+
+    def reset(self) -> None:
+        for histogram in self._histograms:
+            histogram.reset()
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for histogram in self._histograms:
+            lines.extend(histogram.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+REQUEST_DURATION = registry.histogram(
+    "storycircle_http_request_duration_seconds",
+    "HTTP request latency by route template.",
+    ("method", "route", "status"),
+)
+REQUEST_DB_QUERIES = registry.histogram(
+    "storycircle_http_request_db_queries",
+    "SQL statements issued while serving one HTTP request.",
+    ("method", "route"),
+    buckets=QUERY_COUNT_BUCKETS,
+)
+DB_QUERY_DURATION = registry.histogram(
+    "storycircle_db_query_duration_seconds",
+    "SQL statement execution time by statement type.",
+    ("operation",),
+)
+UPSTREAM_DURATION = registry.histogram(
+    "storycircle_upstream_request_duration_seconds",
+    "Latency of calls to ElevenLabs/OpenAI and ffmpeg.",
+    ("service", "operation", "outcome"),
+)
+
+
+@dataclass
+class RequestStats:
+    db_queries: int = 0
+    db_seconds: float = 0.0
+
+
+# Set per request by MetricsMiddleware; sync endpoints see the same object from the threadpool.
+_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("storycircle_request_stats", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    conn.info.setdefault("storycircle_query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    started = conn.info["storycircle_query_start"].pop()
+    elapsed = time.perf_counter() - started
+    operation = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "UNKNOWN"
+    DB_QUERY_DURATION.observe(elapsed, operation=operation)
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.db_queries += 1
+        stats.db_seconds += elapsed
+
+
+def _handle_error(exception_context) -> None:
+    # a failed statement never reaches after_cursor_execute; drop its start time so the next
+    # query on this (pooled) connection is not timed from it
+    connection = exception_context.connection
+    if exception_context.execution_context is None or connection is None:
+        return
+    started = connection.info.get("storycircle_query_start")
+    if started:
+        started.pop()
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Attach query timing listeners to ``engine`` (idempotent)."""
+    if event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+
+@contextmanager
+def observe_upstream(service: str, operation: str) -> Iterator[None]:
+    started = time.perf_counter()
+    outcome = "error"
+    try:
+        yield
+        outcome = "ok"
+    finally:
+        UPSTREAM_DURATION.observe(time.perf_counter() - started, service=service, operation=operation, outcome=outcome)
+
+
+def _route_label(scope) -> str:
+    route = scope.get("route")
+    # unmatched paths collapse into one series so scanners can't blow up label cardinality
+    return getattr(route, "path", None) or "unmatched"
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware recording per-route latency and DB usage, logging slow requests."""
+
+    def __init__(self, app, slow_request_threshold_ms: float = 0.0) -> None:
+        self.app = app
+        self.slow_request_threshold_ms = slow_request_threshold_ms
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+        status_code = 500
+        started = time.perf_counter()
+
+        async def send_wrapper(message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            _request_stats.reset(token)
+            method = scope["method"]
+            route = _route_label(scope)
+            REQUEST_DURATION.observe(elapsed, method=method, route=route, status=str(status_code))
+            REQUEST_DB_QUERIES.observe(stats.db_queries, method=method, route=route)
+            elapsed_ms = elapsed * 1000
+            if 0 < self.slow_request_threshold_ms <= elapsed_ms:
+                logger.warning(
+                    "slow request %s %s -> %s in %.1f ms (%d queries, %.1f ms in db)",
+                    method,
+                    scope["path"],
+                    status_code,
+                    elapsed_ms,
+                    stats.db_queries,
+                    stats.db_seconds * 1000,
+                )
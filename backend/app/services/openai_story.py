@@ -1,17 +1,20 @@
 from __future__ import annotations
 
+import json
 import textwrap
-from typing import Optional
+from functools import lru_cache
+from typing import List, Optional, Sequence
 
 import httpx
 
 from ..config import get_settings
+from .metrics import observe_upstream
 
 OPENAI_RESPONSES_ENDPOINT = "https://api.openai.com/v1/responses"
 
 
 class OpenAIStoryService:
-    """Wrapper around the OpenAI Responses API for transcript summarization."""
+    """Wrapper around the OpenAI Responses API for transcript summarization and enrichment."""
 
     def __init__(self, api_key: str, model: str, reasoning_effort: str) -> None:
         self.api_key = api_key
@@ -41,10 +44,11 @@ class OpenAIStoryService:
             "Content-Type": "application/json",
         }
 
-        async with httpx.AsyncClient(timeout=90) as client:
-            response = await client.post(OPENAI_RESPONSES_ENDPOINT, headers=headers, json=payload)
-            response.raise_for_status()
-            data = response.json()
+        with observe_upstream("openai", "generate_story"):
+            async with httpx.AsyncClient(timeout=90) as client:
+                response = await client.post(OPENAI_RESPONSES_ENDPOINT, headers=headers, json=payload)
+                response.raise_for_status()
+                data = response.json()
 
         story_text = self._extract_output_text(data)
         if not story_text:
@@ -52,6 +56,55 @@ class OpenAIStoryService:
             return cleaned
         return story_text.strip()
 
+    async def enrich_stories(
+        self, texts: Sequence[str], vocabulary: Sequence[str], max_tags: int
+    ) -> List[Optional[dict]]:
+        """Title, abstract and tags for every text in one request; ``None`` where the model gave none."""
+        results: List[Optional[dict]] = [None] * len(texts)
+        if not self.enabled or not texts:
+            return results
+
+        payload = {
+            "model": self.model,
+            "input": self._build_enrichment_prompt(texts, vocabulary, max_tags),
+            "reasoning": {"effort": self.reasoning_effort},
+            "text": {"format": {"type": "json_object"}},
+        }
+        headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json",
+        }
+
+        with observe_upstream("openai", "enrich_stories"):
+            async with httpx.AsyncClient(timeout=120) as client:
+                response = await client.post(OPENAI_RESPONSES_ENDPOINT, headers=headers, json=payload)
+                response.raise_for_status()
+                data = response.json()
+
+        parsed = json.loads(self._extract_output_text(data) or "{}")
+        items = parsed.get("stories") if isinstance(parsed, dict) else None
+        for item in items if isinstance(items, list) else []:
+            index = item.get("index") if isinstance(item, dict) else None
+            if isinstance(index, int) and 0 <= index < len(results):
+                results[index] = item
+        return results
+
+    @staticmethod
+    def _build_enrichment_prompt(texts: Sequence[str], vocabulary: Sequence[str], max_tags: int) -> str:
+        instructions = (
+            "You catalogue oral-history stories. For every numbered story below, write a short "
+            "title (at most 80 characters), a one- or two-sentence abstract (at most 240 "
+            f"characters) and up to {max_tags} short topic tags. Reuse tags from the existing list "
+            "whenever one fits. Answer with JSON only, in the form "
+            '{"stories": [{"index": 0, "title": "...", "abstract": "...", "tags": ["..."]}]}.'
+        )
+        # long transcripts are cut; the opening carries most of what a title and tags need
+        stories = "\n\n".join(
+            f"Story {index}:\n{textwrap.shorten(text, width=4000, placeholder='...')}"
+            for index, text in enumerate(texts)
+        )
+        return f"{instructions}\n\nExisting tags: {', '.join(vocabulary[:100]) or 'none'}\n\n{stories}"
+
     @staticmethod
     def _build_prompt(transcript: str) -> str:
         instructions = (
@@ -97,6 +150,7 @@ class OpenAIStoryService:
         return None
 
 
+@lru_cache
 def get_openai_story_service() -> OpenAIStoryService:
     settings = get_settings()
     return OpenAIStoryService(
@@ -0,0 +1,219 @@
+"""Write throttling for the public react/report endpoints, checked before any database work.
+
+Each request is counted against its client token (``hash_client_token``) for the endpoint and
+against the caller's IP across all throttled writes. Counters are sliding-window approximations:
+two fixed windows per key, the previous one weighted by how much of it still overlaps the
+sliding window, so every key costs two integers however busy it is.
+
+The default backend keeps counters in the worker's memory. With several workers, set
+``STORYCIRCLE_RATE_LIMIT_URL`` to a Redis URL (optional ``redis`` package) so they share them.
+"""
+from __future__ import annotations
+
+import logging
+import math
+import threading
+import time
+from functools import lru_cache
+from typing import Dict, List, NamedTuple, Optional, Protocol, Sequence
+
+from fastapi import HTTPException, Request, status
+
+from ..config import get_settings
+from .security import hash_client_token
+
+
+logger = logging.getLogger("storycircle.ratelimit")
+
+ANONYMOUS_CLIENT = hash_client_token(None)
+# endpoint scope -> (setting holding the per-client limit, window in seconds)
+SCOPES = {
+    "react": ("rate_limit_reactions_per_minute", 60.0),
+    "report": ("rate_limit_reports_per_hour", 3600.0),
+}
+IP_WINDOW_SECONDS = 60.0
+
+
+class Limit(NamedTuple):
+    key: str
+    limit: int
+    window_seconds: float
+
+
+def sliding_window_wait(previous: int, current: int, elapsed: float, limit: int, window: float) -> float:
+    """Seconds until one more hit fits under ``limit``; 0 when it fits now.
+
+    ``elapsed`` is the time since the current fixed window started. The estimate is
+    ``previous * (1 - elapsed / window) + current``.
+    """
+    if previous * (1 - elapsed / window) + current + 1 <= limit:
+        return 0.0
+    if current + 1 > limit:
+        # full until this window ends, then until its count decays enough in the next one
+        return window - elapsed + window * max(0.0, 1 - (limit - 1) / current)
+    return max(0.0, window * (1 - (limit - 1 - current) / previous) - elapsed)
+
+
+class RateLimitBackend(Protocol):
+    def acquire(self, limits: Sequence[Limit]) -> float:
+        """Count one hit against every limit if all have room; else return the wait in seconds."""
+
+    def clear(self) -> None:
+        ...
+
+
+class MemoryBackend:
+    """Per-process counters; right for a single worker and for tests."""
+
+    def __init__(self, prune_every: int = 4096) -> None:
+        self._lock = threading.Lock()
+        # key -> [window index, previous count, current count, window seconds]
+        self._counters: Dict[str, List[float]] = {}
+        self._prune_every = prune_every
+        self._hits = 0
+
+    def acquire(self, limits: Sequence[Limit], now: Optional[float] = None) -> float:
+        now = time.time() if now is None else now
+        with self._lock:
+            self._hits += 1
+            if self._hits % self._prune_every == 0:
+                self._prune(now)
+            counters = []
+            wait = 0.0
+            for key, limit, window in limits:
+                counter = self._roll(key, window, now)
+                elapsed = now - counter[0] * window
+                wait = max(wait, sliding_window_wait(counter[1], counter[2], elapsed, limit, window))
+                counters.append(counter)
+            if wait:
+                return wait
+            for counter in counters:
+                counter[2] += 1
+            return 0.0
+
+    def _roll(self, key: str, window: float, now: float) -> List[float]:
+        index = int(now // window)
+        counter = self._counters.get(key)
+        if counter is None:
+            counter = self._counters[key] = [index, 0, 0, window]
+        elif counter[0] != index:
+            previous = counter[2] if counter[0] == index - 1 else 0
+            counter[:3] = [index, previous, 0]
+        return counter
+
+    def _prune(self, now: float) -> None:
+        # keys idle for two windows would roll to all zeros anyway
+        stale = [key for key, counter in self._counters.items() if counter[0] < int(now // counter[3]) - 1]
+        for key in stale:
+            del self._counters[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._counters.clear()
+
+
+# KEYS: current/previous window key pairs; ARGV: limit, previous-window weight, ttl per pair.
+# Returns {allowed, current1, previous1, current2, previous2, ...}.
+_REDIS_ACQUIRE = """
+local allowed = 1
+local counts = {}
+for i = 1, #KEYS, 2 do
+  local j = (i - 1) / 2
+  local limit = tonumber(ARGV[3 * j + 1])
+  local weight = tonumber(ARGV[3 * j + 2])
+  local current = tonumber(redis.call('GET', KEYS[i]) or '0')
+  local previous = tonumber(redis.call('GET', KEYS[i + 1]) or '0')
+  counts[#counts + 1] = current
+  counts[#counts + 1] = previous
+  if previous * weight + current + 1 > limit then allowed = 0 end
+end
+if allowed == 1 then
+  for i = 1, #KEYS, 2 do
+    redis.call('INCR', KEYS[i])
+    redis.call('EXPIRE', KEYS[i], ARGV[3 * ((i - 1) / 2) + 3])
+  end
+end
+table.insert(counts, 1, allowed)
+return counts
+"""
+
+
+class RedisBackend:
+    """Counters shared by every worker, updated atomically by one Lua script per request."""
+
+    def __init__(self, url: str, prefix: str = "storycircle:ratelimit:") -> None:
+        import redis
+
+        self._client = redis.Redis.from_url(url)
+        self._script = self._client.register_script(_REDIS_ACQUIRE)
+        self._prefix = prefix
+
+    def acquire(self, limits: Sequence[Limit]) -> float:
+        now = time.time()
+        keys: List[str] = []
+        args: List[object] = []
+        elapsed: List[float] = []
+        for key, limit, window in limits:
+            index = int(now // window)
+            keys += [f"{self._prefix}{key}:{index}", f"{self._prefix}{key}:{index - 1}"]
+            elapsed.append(now - index * window)
+            args += [limit, repr(1 - elapsed[-1] / window), math.ceil(2 * window)]
+        allowed, *counts = self._script(keys=keys, args=args)
+        if allowed:
+            return 0.0
+        return max(
+            sliding_window_wait(int(counts[2 * i + 1]), int(counts[2 * i]), elapsed[i], limit, window)
+            for i, (_, limit, window) in enumerate(limits)
+        )
+
+    def clear(self) -> None:
+        for key in self._client.scan_iter(match=f"{self._prefix}*"):
+            self._client.delete(key)
+
+
+@lru_cache
+def get_rate_limiter() -> RateLimitBackend:
+    url = get_settings().rate_limit_url
+    if url:
+        try:
+            return RedisBackend(url)
+        except ImportError:
+            logger.warning("rate limit URL set but the redis package is missing; counting per worker")
+    return MemoryBackend()
+
+
+def _client_ip(request: Request) -> str:
+    # behind a proxy, run uvicorn with --proxy-headers so this is the real client
+    return request.client.host if request.client else "unknown"
+
+
+def write_limits(scope: str, client_token: Optional[str], ip: str) -> List[Limit]:
+    settings = get_settings()
+    setting, window = SCOPES[scope]
+    limits = []
+    client_hash = hash_client_token(client_token)
+    client_limit = getattr(settings, setting)
+    # every client without a token shares one hash; only the IP limit can tell them apart
+    if client_limit > 0 and client_hash != ANONYMOUS_CLIENT:
+        limits.append(Limit(f"{scope}:client:{client_hash}", client_limit, window))
+    if settings.rate_limit_ip_writes_per_minute > 0:
+        limits.append(Limit(f"writes:ip:{ip}", settings.rate_limit_ip_writes_per_minute, IP_WINDOW_SECONDS))
+    return limits
+
+
+def enforce_write_limit(request: Request, scope: str, client_token: Optional[str]) -> None:
+    """Raise 429 with ``Retry-After`` when the client or its IP is over its write limit."""
+    limits = write_limits(scope, client_token, _client_ip(request))
+    if not limits:
+        return
+    try:
+        wait = get_rate_limiter().acquire(limits)
+    except Exception as exc:  # a shared backend outage must not take the endpoints down
+        logger.warning("rate limit backend unavailable (%s); allowing request", exc)
+        return
+    if wait:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many requests, slow down",
+            headers={"Retry-After": str(max(1, math.ceil(wait)))},
+        )
@@ -10,9 +10,6 @@ from fastapi import HTTPException, status
 from ..config import get_settings
 
 
-settings = get_settings()
-
-
 def make_share_token() -> str:
     return secrets.token_urlsafe(16)
 
@@ -23,6 +20,7 @@ def hash_client_token(token: Optional[str]) -> str:
 
 
 def ensure_admin(token: Optional[str]) -> None:
+    settings = get_settings()
     if not settings.admin_token:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
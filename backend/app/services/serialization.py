@@ -0,0 +1,38 @@
+"""Fast JSON paths for list endpoints.
+
+FastAPI validates a returned model list against ``response_model`` again and runs it through
+``jsonable_encoder`` before encoding. The hot lists skip both: they select only the columns
+their schema exposes and encode the rows as plain dicts with orjson, returning the response
+directly. ``response_model`` stays on the route for the OpenAPI schema, and
+``test_serialization.py`` checks that both paths emit the same JSON.
+"""
+from __future__ import annotations
+
+import base64
+from typing import Any, Dict, List, Sequence
+
+from pydantic import TypeAdapter
+
+from ..models import Story
+from ..schemas import ReportRead, StoryRead
+
+
+STORY_CARD_FIELDS = tuple(StoryRead.model_fields)
+# StoryRead.waveform reads the raw peaks and base64-encodes them
+_CARD_SOURCES = {"waveform": "audio_peaks"}
+
+REPORT_LIST = TypeAdapter(List[ReportRead])
+
+
+def story_card_columns() -> list:
+    """The ``stories`` columns behind ``StoryRead``, in field order (select rows, not entities)."""
+    return [getattr(Story, _CARD_SOURCES.get(name, name)) for name in STORY_CARD_FIELDS]
+
+
+def story_card(row: Sequence[Any]) -> Dict[str, Any]:
+    """A ``story_card_columns()`` row as the dict ``StoryRead`` would serialize to."""
+    card = dict(zip(STORY_CARD_FIELDS, row))
+    peaks = card["waveform"]
+    card["waveform"] = base64.b64encode(peaks).decode("ascii") if peaks else None
+    card["tags"] = card["tags"] or []
+    return card
@@ -8,19 +8,21 @@ from fastapi import UploadFile
 from ..config import get_settings
 
 
-settings = get_settings()
+# audio_url of stories created from a live-agent transcript: no file exists behind it
+LIVE_AGENT_AUDIO_URL = "live-agent"
 
 
 def ensure_storage_root() -> Path:
-    settings.storage_dir.mkdir(parents=True, exist_ok=True)
-    return settings.storage_dir
+    storage_dir = get_settings().storage_dir
+    storage_dir.mkdir(parents=True, exist_ok=True)
+    return storage_dir
 
 
 def save_audio_file(file: UploadFile) -> str:
-    ensure_storage_root()
+    storage_dir = ensure_storage_root()
     suffix = Path(file.filename or "story.webm").suffix or ".webm"
     filename = f"story_{secrets.token_hex(8)}{suffix}"
-    destination = settings.storage_dir / filename
+    destination = storage_dir / filename
     with destination.open("wb") as buffer:
         while chunk := file.file.read(1024 * 1024):
             buffer.write(chunk)
@@ -28,4 +30,4 @@ def save_audio_file(file: UploadFile) -> str:
 
 
 def resolve_audio_path(filename: str) -> Path:
-    return settings.storage_dir / filename
+    return get_settings().storage_dir / filename
@@ -0,0 +1,222 @@
+"""Reconcile ``storage_dir`` with the ``stories`` table and reclaim space from dead audio.
+
+A file is garbage when no story points at it (a request failed after ``save_audio_file``, or a
+transcode was abandoned) or when its story was removed by moderation. Garbage older than the
+grace period is moved to ``storage_dir/.quarantine`` and only deleted once it has sat there for
+the quarantine period, so a mistaken removal can still be undone by moving the file back.
+
+The directory is read with ``os.scandir`` (one ``stat`` per entry, no full listing in memory
+besides the names) and looked up in batches of ``audio_url IN (...)`` against
+``ix_stories_audio_url``. Stories whose file is missing are counted, never touched.
+
+The periodic run happens in one worker per interval: workers share ``storage_dir``, so a
+non-blocking ``flock`` there elects the runner and a marker file's mtime records the last run.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from sqlalchemy import select
+from sqlmodel import Session
+
+from ..config import get_settings
+from ..database import file_lock, session_scope
+from ..models import ModerationStatus, Story
+from .storage import LIVE_AGENT_AUDIO_URL
+
+
+logger = logging.getLogger("storycircle.storage")
+
+QUARANTINE_DIR = ".quarantine"
+RUN_LOCK = ".reconcile.lock"
+LAST_RUN_MARKER = ".reconciled"
+# everything save_audio_file and the transcoder write; anything else in the folder is not ours
+MANAGED_PREFIX = "story_"
+BATCH_SIZE = 500
+
+
+@dataclass
+class ReconcileReport:
+    scanned_files: int = 0
+    scanned_bytes: int = 0
+    orphaned_files: int = 0
+    removed_story_files: int = 0
+    within_grace: int = 0
+    quarantined_files: int = 0
+    quarantined_bytes: int = 0
+    deleted_files: int = 0
+    reclaimed_bytes: int = 0
+    missing_files: int = 0
+    dry_run: bool = False
+    duration_seconds: float = 0.0
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+def _managed_files(directory: Path) -> Iterator[Tuple[str, int, float]]:
+    """(name, size, mtime) of our audio files directly inside ``directory``."""
+    try:
+        entries = os.scandir(directory)
+    except FileNotFoundError:
+        return
+    with entries:
+        for entry in entries:
+            if not entry.name.startswith(MANAGED_PREFIX) or not entry.is_file(follow_symlinks=False):
+                continue
+            try:
+                info = entry.stat(follow_symlinks=False)
+            except FileNotFoundError:  # deleted since the listing (e.g. a transcode swap)
+                continue
+            yield entry.name, info.st_size, info.st_mtime
+
+
+def _batches(files: Iterator[Tuple[str, int, float]], size: int) -> Iterator[List[Tuple[str, int, float]]]:
+    batch: List[Tuple[str, int, float]] = []
+    for item in files:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _owners(session: Session, names: List[str]) -> Dict[str, Tuple[ModerationStatus, Optional[datetime]]]:
+    rows = session.exec(
+        select(Story.audio_url, Story.moderation_status, Story.removed_at).where(
+            Story.audio_url.in_(names), Story.audio_url != LIVE_AGENT_AUDIO_URL
+        )
+    )
+    return {audio_url: (moderation_status, removed_at) for audio_url, moderation_status, removed_at in rows}
+
+
+def _quarantine(source: Path, quarantine_dir: Path) -> bool:
+    quarantine_dir.mkdir(exist_ok=True)
+    try:
+        os.replace(source, quarantine_dir / source.name)
+    except FileNotFoundError:  # another worker got there first
+        return False
+    # the quarantine period counts from now, not from the upload
+    os.utime(quarantine_dir / source.name)
+    return True
+
+
+def reconcile_storage(
+    session: Session,
+    *,
+    grace_seconds: Optional[float] = None,
+    quarantine_seconds: Optional[float] = None,
+    dry_run: bool = False,
+    batch_size: int = BATCH_SIZE,
+) -> ReconcileReport:
+    """Quarantine unreferenced or removed stories' audio, purge expired quarantine, report bytes."""
+    settings = get_settings()
+    grace_seconds = settings.storage_gc_grace_hours * 3600 if grace_seconds is None else grace_seconds
+    if quarantine_seconds is None:
+        quarantine_seconds = settings.storage_gc_quarantine_hours * 3600
+    storage_dir = settings.storage_dir
+    quarantine_dir = storage_dir / QUARANTINE_DIR
+    started = time.perf_counter()
+    now = time.time()
+    removed_before = datetime.utcnow() - timedelta(seconds=grace_seconds)
+    report = ReconcileReport(dry_run=dry_run)
+    present: Set[str] = set()
+
+    for batch in _batches(_managed_files(storage_dir), batch_size):
+        owners = _owners(session, [name for name, _, _ in batch])
+        for name, size, mtime in batch:
+            report.scanned_files += 1
+            report.scanned_bytes += size
+            present.add(name)
+            owner = owners.get(name)
+            if owner is None:
+                # uploads and transcodes exist on disk briefly before a story points at them
+                if now - mtime < grace_seconds:
+                    report.within_grace += 1
+                    continue
+                report.orphaned_files += 1
+            elif owner[0] == ModerationStatus.removed:
+                if owner[1] is not None and owner[1] > removed_before:
+                    report.within_grace += 1
+                    continue
+                report.removed_story_files += 1
+            else:
+                continue
+            if dry_run:
+                continue
+            if quarantine_seconds > 0:
+                if _quarantine(storage_dir / name, quarantine_dir):
+                    report.quarantined_files += 1
+                    report.quarantined_bytes += size
+            else:
+                (storage_dir / name).unlink(missing_ok=True)
+                report.deleted_files += 1
+                report.reclaimed_bytes += size
+
+    for name, size, mtime in _managed_files(quarantine_dir):
+        if now - mtime < quarantine_seconds:
+            continue
+        if not dry_run:
+            (quarantine_dir / name).unlink(missing_ok=True)
+        report.deleted_files += 1
+        report.reclaimed_bytes += size
+
+    # the other direction: live stories whose audio is gone (keyset pages, names only);
+    # stories from a live-agent transcript never had a file
+    last_id = 0
+    while True:
+        rows = session.exec(
+            select(Story.id, Story.audio_url)
+            .where(
+                Story.id > last_id,
+                Story.moderation_status != ModerationStatus.removed,
+                Story.audio_url != LIVE_AGENT_AUDIO_URL,
+            )
+            .order_by(Story.id)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            break
+        last_id = rows[-1].id
+        report.missing_files += sum(1 for _, audio_url in rows if audio_url not in present)
+
+    report.duration_seconds = round(time.perf_counter() - started, 3)
+    logger.info("storage reconciliation: %s", report.as_dict())
+    return report
+
+
+def _scheduled_run(interval_seconds: float) -> Optional[ReconcileReport]:
+    """Reconcile unless another worker is running it or did within ``interval_seconds``."""
+    storage_dir = get_settings().storage_dir
+    storage_dir.mkdir(parents=True, exist_ok=True)
+    marker = storage_dir / LAST_RUN_MARKER
+    with file_lock(storage_dir / RUN_LOCK, blocking=False) as acquired:
+        if not acquired:
+            return None
+        try:
+            if time.time() - marker.stat().st_mtime < interval_seconds:
+                return None
+        except FileNotFoundError:
+            pass
+        # stamped first: a run that fails is retried next interval, not by every other worker
+        marker.touch()
+        with session_scope() as session:
+            return reconcile_storage(session)
+
+
+async def run_periodic_reconciliation(interval_seconds: float) -> None:
+    """Lifespan task: reconcile every ``interval_seconds`` in a worker thread until cancelled."""
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            await asyncio.to_thread(_scheduled_run, interval_seconds)
+        except Exception:  # keep the schedule alive; the next run retries
+            logger.exception("storage reconciliation failed")
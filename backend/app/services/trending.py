@@ -0,0 +1,56 @@
+"""Time-decayed popularity for ``sort=trending``, kept in log space so it never needs rescoring.
+
+A reaction at time ``t`` is worth ``2 ** -((now - t) / half_life)``. Every story's weights share
+the ``now`` term, so ranking by ``log(sum(exp((t_i - EPOCH) / tau)))`` ranks by the decayed sum,
+and the stored value only changes when a reaction arrives:
+``score' = max(score, x) + ln(1 + exp(-|score - x|))`` with ``x = (t - EPOCH) / tau``.
+Every story starts with ``CREATION_WEIGHT`` of a reaction at its creation time: enough to order
+stories nobody has reacted to by age, small enough that a fresh story with no reactions ranks
+below an older one whose reactions still add up to more than that.
+"""
+from __future__ import annotations
+
+import math
+from datetime import datetime
+from typing import Iterable
+
+from sqlalchemy import ColumnElement, func
+
+
+EPOCH = datetime(2025, 1, 1)
+HALF_LIFE_HOURS = 24.0
+# e-folding time in seconds: exp(-age / TAU) halves every HALF_LIFE_HOURS
+TAU_SECONDS = HALF_LIFE_HOURS * 3600 / math.log(2)
+# changing it needs a revision that rescores existing stories (see 0014_trending_creation_weight)
+CREATION_WEIGHT = 0.1
+
+
+def decay_exponent(at: datetime) -> float:
+    return (at - EPOCH).total_seconds() / TAU_SECONDS
+
+
+def initial_score(created_at: datetime) -> float:
+    return decay_exponent(created_at) + math.log(CREATION_WEIGHT)
+
+
+def combine(score: float, exponent: float) -> float:
+    """Python counterpart of ``add_reaction``: log(exp(score) + exp(exponent))."""
+    high, low = max(score, exponent), min(score, exponent)
+    return high + math.log1p(math.exp(low - high))
+
+
+def score_for(created_at: datetime, reaction_times: Iterable[datetime]) -> float:
+    score = initial_score(created_at)
+    for at in reaction_times:
+        score = combine(score, decay_exponent(at))
+    return score
+
+
+def add_reaction(score: ColumnElement[float], at: datetime, dialect_name: str) -> ColumnElement[float]:
+    """SQL expression adding one reaction at ``at`` to ``score`` (atomic inside an UPDATE)."""
+    exponent = decay_exponent(at)
+    # SQLite spells GREATEST/LEAST as the two-argument scalar max()/min()
+    greatest, least = (func.greatest, func.least) if dialect_name == "postgresql" else (func.max, func.min)
+    high = greatest(score, exponent)
+    low = least(score, exponent)
+    return high + func.ln(1 + func.exp(low - high))
@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import base64
+import io
+import stat
+import sys
+import wave
+from array import array
+
+from fastapi import status
+from sqlalchemy import update
+from sqlmodel import Session
+
+from ..config import get_settings
+from ..models import Story
+from ..services import audio
+from ..services.audio import compute_peaks
+
+# Stands in for ffmpeg: "transcodes" by writing a small file, "decodes" one second of 8 kHz PCM.
+FAKE_FFMPEG = f"""#!{sys.executable}
+import sys
+from array import array
+args = sys.argv[1:]
+if args[-1] == "-":
+    sys.stderr.write("  Stream #0:0: Audio: opus, 48000 Hz, mono, fltp\\n")
+    sys.stdout.buffer.write(array("h", [1000, -4000] * 4000).tobytes())
+else:
+    open(args[-1], "wb").write(b"OggS" + b"\\0" * 60)
+"""
+
+
+def _wav_bytes(seconds: float = 2.0, rate: int = 16000) -> bytes:
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as writer:
+        writer.setnchannels(1)
+        writer.setsampwidth(2)
+        writer.setframerate(rate)
+        frames = int(seconds * rate)
+        # silent first half, loud second half
+        writer.writeframes(array("h", [0] * (frames // 2) + [12000] * (frames - frames // 2)).tobytes())
+    return buffer.getvalue()
+
+
+def _install_ffmpeg(monkeypatch, tmp_path, script: str) -> None:
+    fake = tmp_path / "ffmpeg"
+    fake.write_text(script)
+    fake.chmod(fake.stat().st_mode | stat.S_IEXEC)
+    monkeypatch.setattr(get_settings(), "ffmpeg_path", str(fake))
+
+
+def _upload(client, name, payload):
+    response = client.post("/stories", files={"audio": (name, payload, "audio/wav")})
+    assert response.status_code == status.HTTP_201_CREATED
+    return response.json()
+
+
+def test_compute_peaks_scales_to_loudest_bucket():
+    pcm = array("h", [0, 0, 100, -200, 50, 50, -32768, 10]).tobytes()
+    assert compute_peaks(pcm, 4) == bytes([0, 1, 0, 127])
+    # stereo: only the first channel counts
+    assert compute_peaks(array("h", [10, -32768, 20, 0]).tobytes(), 2, channels=2) == bytes([64, 127])
+    assert compute_peaks(b"", 4) == b""
+
+
+def test_wav_upload_is_analysed_without_ffmpeg(client, monkeypatch):
+    monkeypatch.setattr(get_settings(), "ffmpeg_path", "definitely-not-ffmpeg")
+    story = _upload(client, "story.wav", _wav_bytes())
+    assert story["audio_duration_seconds"] == 2.0
+    assert story["audio_sample_rate"] == 16000
+
+    client.put(f"/stories/{story['id']}", json={"visibility": "public_anon"})
+    card = next(item for item in client.get("/stories/public").json() if item["id"] == story["id"])
+    peaks = base64.b64decode(card["waveform"])
+    assert len(peaks) == get_settings().audio_waveform_peaks
+    assert set(peaks[:64]) == {0} and set(peaks[64:]) == {127}
+    # no transcoding without ffmpeg
+    assert (get_settings().storage_dir / story["audio_url"]).exists()
+
+
+def test_upload_is_analysed_and_transcoded_with_ffmpeg(client, monkeypatch, tmp_path):
+    _install_ffmpeg(monkeypatch, tmp_path, FAKE_FFMPEG)
+    story = _upload(client, "story.webm", b"\x1a\x45\xdf\xa3" + b"\0" * 4096)
+    assert story["audio_duration_seconds"] == 1.0
+    assert story["audio_sample_rate"] == 48000
+    assert len(base64.b64decode(story["waveform"])) == get_settings().audio_waveform_peaks
+
+    # TestClient runs background tasks before returning the response
+    detail = client.get(f"/stories/{story['id']}", params={"token": story["share_token"]}).json()
+    storage_dir = get_settings().storage_dir
+    assert detail["audio_url"].endswith(".ogg")
+    assert (storage_dir / detail["audio_url"]).stat().st_size == 64
+    assert not (storage_dir / story["audio_url"]).exists()
+
+
+def test_slow_upload_is_analysed_in_the_background(client, monkeypatch, tmp_path):
+    # decoding takes a second, longer than the request is allowed to wait
+    slow = FAKE_FFMPEG.replace("import sys\n", "import sys\nimport time\n", 1)
+    _install_ffmpeg(monkeypatch, tmp_path, slow.replace('if args[-1] == "-":\n', 'if args[-1] == "-":\n    time.sleep(1)\n'))
+    monkeypatch.setattr(get_settings(), "audio_probe_timeout_seconds", 0.2)
+    story = _upload(client, "story.webm", b"\x1a\x45\xdf\xa3" + b"\0" * 4096)
+    assert story["audio_duration_seconds"] is None and story["waveform"] is None
+
+    detail = client.get(f"/stories/{story['id']}", params={"token": story["share_token"]}).json()
+    assert detail["audio_url"].endswith(".ogg")
+    assert (detail["audio_duration_seconds"], detail["audio_sample_rate"]) == (1.0, 48000)
+    assert len(base64.b64decode(detail["waveform"])) == get_settings().audio_waveform_peaks
+
+
+def test_ogg_upload_is_normalised_under_a_new_name(client, monkeypatch, tmp_path):
+    _install_ffmpeg(monkeypatch, tmp_path, FAKE_FFMPEG)
+    story = _upload(client, "story.ogg", b"OggS" + b"\1" * 4096)
+
+    detail = client.get(f"/stories/{story['id']}", params={"token": story["share_token"]}).json()
+    storage_dir = get_settings().storage_dir
+    assert detail["audio_url"] == story["audio_url"].replace(".ogg", "_opus.ogg")
+    assert (storage_dir / detail["audio_url"]).stat().st_size == 64
+    assert not (storage_dir / story["audio_url"]).exists()
+
+
+def test_transcode_does_not_overwrite_audio_replaced_meanwhile(client, engine, monkeypatch, tmp_path):
+    _install_ffmpeg(monkeypatch, tmp_path, FAKE_FFMPEG)
+    real_transcode = audio.transcode_to_opus
+
+    def transcode_while_replaced(binary, source, destination, bitrate_kbps, timeout):
+        real_transcode(binary, source, destination, bitrate_kbps, timeout)
+        with Session(engine) as session:
+            session.execute(update(Story).values(audio_url="rerecorded.webm"))
+            session.commit()
+
+    monkeypatch.setattr(audio, "transcode_to_opus", transcode_while_replaced)
+    story = _upload(client, "story.webm", b"\x1a\x45\xdf\xa3" + b"\0" * 4096)
+
+    storage_dir = get_settings().storage_dir
+    with Session(engine) as session:
+        stored = session.get(Story, story["id"])
+        assert (stored.audio_url, stored.audio_processed_at) == ("rerecorded.webm", None)
+    assert (storage_dir / story["audio_url"]).exists()
+    assert not list(storage_dir.glob("*.ogg"))
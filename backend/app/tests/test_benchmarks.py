@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+import asyncio
+
+from benchmarks.api import SCENARIOS, compare_reports, percentile, run_benchmarks
+from benchmarks.seed import SeedConfig
+
+
+def test_benchmark_suite_smoke(tmp_path):
+    config = SeedConfig(stories=30, reactions_per_story=2, text_words=20)
+    report = asyncio.run(run_benchmarks(tmp_path, config, requests=4, concurrency=2, scenarios=list(SCENARIOS)))
+
+    assert set(report["scenarios"]) == set(SCENARIOS)
+    for result in report["scenarios"].values():
+        assert result["errors"] == 0
+        assert result["p50_ms"] <= result["p99_ms"]
+    assert compare_reports(report, report, tolerance=0.0) == []
+
+
+def test_percentile_nearest_rank():
+    samples = list(range(1, 101))
+    assert percentile(samples, 50) == 50
+    assert percentile(samples, 99) == 99
+    assert percentile([], 99) == 0.0
+
+
+def test_serialization_benchmark_paths_agree():
+    from benchmarks.serialization import run
+
+    report = run(page_size=10, runs=3)
+    sizes = {result["bytes"] for result in report["paths"].values()}
+    assert len(sizes) == 1
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from alembic.autogenerate import compare_metadata
+from alembic.migration import MigrationContext
+from sqlalchemy import inspect, text
+from sqlmodel import Session, SQLModel
+
+from ..database import _create_engine, init_db, require_current_schema
+from ..migrations import include_object_for
+from ..services.compression import decompress_text
+from ..services.embeddings import backfill_embeddings
+from .conftest import drop_schema
+
+
+def test_migrations_match_models_and_rerun_is_noop(engine):
+    try:
+        assert init_db(engine) is True
+        assert init_db(engine) is False
+
+        with engine.connect() as conn:
+            context = MigrationContext.configure(
+                conn, opts={"include_object": include_object_for(conn.dialect.name)}
+            )
+            diff = compare_metadata(context, SQLModel.metadata)
+        assert diff == []
+    finally:
+        drop_schema(engine)
+
+
+def test_workers_starting_together_migrate_once(engine, tmp_path):
+    if engine.dialect.name == "sqlite":
+        # the in-memory test database has a single connection; workers share a file in production
+        engine = _create_engine(f"sqlite:///{tmp_path / 'storycircle.db'}")
+    try:
+        with pytest.raises(RuntimeError, match="alembic upgrade head"):
+            require_current_schema(engine)
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            applied = list(pool.map(lambda _: init_db(engine), range(4)))
+        assert applied.count(True) == 1
+        require_current_schema(engine)
+    finally:
+        drop_schema(engine)
+
+
+def test_legacy_create_all_database_is_adopted_and_upgraded(engine):
+    if engine.dialect.name != "sqlite":
+        pytest.skip("the prototype's create_all databases were SQLite only")
+    legacy_schema = [
+        "CREATE TABLE stories (id INTEGER NOT NULL, title VARCHAR(255) NOT NULL, text VARCHAR DEFAULT '' NOT NULL, "
+        "raw_transcript VARCHAR DEFAULT '' NOT NULL, abstract VARCHAR(512), audio_url VARCHAR NOT NULL, "
+        "visibility VARCHAR(11), age_range VARCHAR(32), city VARCHAR(64), tags JSON DEFAULT '[]' NOT NULL, "
+        "share_token VARCHAR, consent_choice VARCHAR, consent_timestamp DATETIME, "
+        "moderation_status VARCHAR(7) DEFAULT 'ok', created_at DATETIME DEFAULT (CURRENT_TIMESTAMP) NOT NULL, "
+        "updated_at DATETIME DEFAULT (CURRENT_TIMESTAMP) NOT NULL, PRIMARY KEY (id))",
+        "CREATE UNIQUE INDEX ix_stories_share_token ON stories (share_token)",
+        "CREATE TABLE reactions (id INTEGER NOT NULL, story_id INTEGER NOT NULL, type VARCHAR(6), "
+        "client_hash VARCHAR NOT NULL, created_at DATETIME DEFAULT (utcnow()) NOT NULL, PRIMARY KEY (id), "
+        "FOREIGN KEY(story_id) REFERENCES stories (id))",
+        "CREATE INDEX ix_reactions_client_hash ON reactions (client_hash)",
+        "CREATE TABLE reports (id INTEGER NOT NULL, story_id INTEGER NOT NULL, reason VARCHAR(500) NOT NULL, "
+        "client_hash VARCHAR NOT NULL, handled BOOLEAN NOT NULL, created_at DATETIME DEFAULT (CURRENT_TIMESTAMP) "
+        "NOT NULL, PRIMARY KEY (id), FOREIGN KEY(story_id) REFERENCES stories (id))",
+        "CREATE INDEX ix_reports_client_hash ON reports (client_hash)",
+        "INSERT INTO stories (id, title, text, audio_url, visibility, moderation_status) "
+        "VALUES (1, 'Old', 'Once upon a time', 'a.webm', 'public_anon', 'flagged')",
+        "INSERT INTO reports (story_id, reason, client_hash, handled, created_at) VALUES "
+        "(1, 'spam', 'same', 0, '2025-01-01 10:00:00'), (1, 'spam', 'same', 0, '2025-01-01 11:00:00'), "
+        "(1, 'spam', 'other', 0, '2025-01-01 12:00:00')",
+    ]
+    try:
+        with engine.begin() as conn:
+            for statement in legacy_schema:
+                conn.execute(text(statement))
+
+        assert init_db(engine) is True
+
+        with engine.connect() as conn:
+            report_count = conn.execute(text("SELECT report_count FROM stories WHERE id = 1")).scalar()
+            indexes = {index["name"] for index in inspect(conn).get_indexes("stories")}
+            story_columns = {column["name"] for column in inspect(conn).get_columns("stories")}
+            codec, blob = conn.execute(text("SELECT codec, text FROM story_bodies WHERE story_id = 1")).one()
+        assert report_count == 2
+        assert "ix_stories_feed" in indexes
+        assert "text" not in story_columns
+        assert decompress_text(blob, codec) == "Once upon a time"
+        with Session(engine) as session:
+            assert backfill_embeddings(session) == 1
+    finally:
+        drop_schema(engine)
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import threading
+
+from sqlmodel import Session
+
+from ..models import Story, StoryEmbedding
+from ..services.embeddings import HASHING_MODEL, HashingEmbedder, VectorIndex
+
+TEXTS = [
+    "Every Saturday grandfather heated the lakeside sauna and we swam in the lake.",
+    "I drove the number three tram through Helsinki for thirty years.",
+    "Mother baked rye bread every Friday and the whole street smelled of it.",
+]
+
+
+def _seed(engine, vectors) -> None:
+    with Session(engine) as session:
+        for story_id, vector in enumerate(vectors, start=1):
+            session.add(Story(id=story_id, title="Untitled Story", audio_url=f"{story_id}.webm"))
+            session.flush()
+            session.add(StoryEmbedding(story_id=story_id, model=HASHING_MODEL, vector=vector.tobytes()))
+        session.commit()
+
+
+def test_upsert_updates_the_built_index_without_a_rebuild(client, engine, monkeypatch):
+    vectors = HashingEmbedder().embed(TEXTS)
+    _seed(engine, vectors)
+    index = VectorIndex()
+    with Session(engine) as session:
+        index.ensure_fresh(session, ttl_seconds=300)
+    assert index.search(1, k=5) == []  # nothing above the noise floor yet
+
+    builds = []
+    real_build = index._build
+    monkeypatch.setattr(index, "_build", lambda: builds.append(1) or real_build())
+    index.search(1, k=5)
+    for story_id in range(4, 8):  # past the initial capacity: the matrix grows in place
+        index.upsert(story_id, vectors[0], HASHING_MODEL)
+    index.upsert(2, vectors[2], HASHING_MODEL)
+
+    neighbours = dict(index.search(1, k=10))
+    assert set(neighbours) == {4, 5, 6, 7}
+    assert all(abs(cosine - 1.0) < 1e-5 for cosine in neighbours.values())
+    assert [story_id for story_id, _ in index.search(2, k=10)] == [3]  # now the same text as story 3
+    assert builds == []
+
+
+def test_upsert_after_a_reload_waits_for_the_rebuild(client, engine):
+    vectors = HashingEmbedder().embed(TEXTS)
+    _seed(engine, vectors)
+    index = VectorIndex()
+    with Session(engine) as session:
+        index.ensure_fresh(session, ttl_seconds=300)
+        index.search(1, k=5)  # built matrix
+        index.ensure_fresh(session, ttl_seconds=0)  # TTL reload drops it
+
+    index.upsert(3, vectors[0], HASHING_MODEL)
+    index.upsert(9, vectors[0], HASHING_MODEL)
+    assert dict(index.search(1, k=5)).keys() == {3, 9}
+
+
+def test_reload_keeps_vectors_staged_while_it_reads(client, engine):
+    vectors = HashingEmbedder().embed(TEXTS)
+    _seed(engine, vectors[:2])
+    index = VectorIndex()
+    reading, staged = threading.Event(), threading.Event()
+
+    class SlowSession(Session):
+        def exec(self, statement, *args, **kwargs):
+            reading.set()
+            staged.wait(timeout=5)
+            return super().exec(statement, *args, **kwargs)
+
+    def stage_during_reload():
+        reading.wait(timeout=5)
+        index.upsert(9, vectors[0], HASHING_MODEL)
+        staged.set()
+
+    writer = threading.Thread(target=stage_during_reload)
+    writer.start()
+    with SlowSession(engine) as session:
+        index.ensure_fresh(session, ttl_seconds=300)
+    writer.join()
+    assert dict(index.search(1, k=5)).keys() == {9}
@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from io import BytesIO
+
+from fastapi import status
+from sqlmodel import Session
+
+from ..config import get_settings
+from ..models import Story
+from ..services.enrichment import (
+    KeywordEnricher,
+    enrich_backlog,
+    generate_enrichments,
+    get_tag_vocabulary,
+    merge_tags,
+)
+
+ADMIN = {"x-admin-token": "test-admin"}
+
+SAUNA_STORY = (
+    "So, every Saturday my grandfather heated the sauna by the lake. "
+    "The sauna smelled of birch and tar, and we children waited on the pier. "
+    "Afterwards we swam in the lake until our lips turned blue. "
+    "Those evenings at the lake cottage are what I miss most."
+)
+TRAM_STORY = (
+    "I met my husband on the number three tram in Helsinki. "
+    "He offered me his seat and the tram conductor winked at us. "
+    "We rode that tram every morning for a year before he asked me out."
+)
+
+
+class FakeModel:
+    enabled = True
+
+    def __init__(self, answer=None, error=None):
+        self.answer, self.error, self.calls = answer, error, []
+
+    async def enrich_stories(self, texts, vocabulary, max_tags):
+        self.calls.append(list(texts))
+        if self.error:
+            raise self.error
+        return self.answer
+
+
+def test_keyword_enricher_prefers_existing_tags_and_scores_batch():
+    enricher = KeywordEnricher(max_tags=3)
+    sauna, tram = enricher.enrich([SAUNA_STORY, TRAM_STORY], vocabulary=["Love", "Summer Cottage", "Lake"])
+
+    assert sauna.title == "Every Saturday my grandfather heated the sauna by the lake"
+    assert sauna.tags[0] == "Lake"  # vocabulary spelling, boosted over new keywords
+    assert "Sauna" in sauna.tags
+    assert tram.tags[0] == "Tram"
+    assert "Love" not in tram.tags  # vocabulary tags must occur in the text
+    assert sauna.abstract == (
+        "Every Saturday my grandfather heated the sauna by the lake. "
+        "Afterwards we swam in the lake until our lips turned blue."
+    )
+
+
+def test_generated_tags_never_replace_user_tags():
+    assert merge_tags(["Family", "lake"], ["Lake", "Sauna", "Birch", "Tar"], max_tags=4) == [
+        "Family",
+        "lake",
+        "Sauna",
+        "Birch",
+    ]
+    assert merge_tags(["A", "B", "C"], ["D"], max_tags=2) == ["A", "B", "C"]
+
+
+def test_model_enrichment_is_one_request_per_batch_with_local_fallback(monkeypatch):
+    monkeypatch.setattr(get_settings(), "enrichment_use_llm", True)
+    answer = {"index": 0, "title": "Saturday Sauna", "abstract": "A lake sauna.", "tags": ["Sauna"]}
+    model = FakeModel(answer=[answer, None])
+
+    sauna, tram = asyncio.run(generate_enrichments([SAUNA_STORY, TRAM_STORY], ["Lake"], model))
+    assert len(model.calls) == 1
+    assert (sauna.title, sauna.abstract, sauna.tags) == ("Saturday Sauna", "A lake sauna.", ["Sauna"])
+    assert tram.tags[0] == "Tram"  # the model skipped it: keyword result
+
+    failing = FakeModel(error=RuntimeError("upstream down"))
+    (fallback,) = asyncio.run(generate_enrichments([SAUNA_STORY], ["Lake"], failing))
+    assert fallback.tags[0] == "Lake"
+
+
+def test_tag_vocabulary_is_cached_per_worker(client):
+    files = {"audio": ("story.webm", BytesIO(b"fake audio"), "audio/webm")}
+    client.post("/stories", files=files, data={"tags": json.dumps(["Lake"])})
+    vocabulary = get_tag_vocabulary()
+    assert vocabulary.get(ttl_seconds=300) == ["Lake"]
+
+    client.post("/stories", files=files, data={"tags": json.dumps(["Sauna", "Lake"])})
+    assert vocabulary.get(ttl_seconds=300) == ["Lake"]
+    assert vocabulary.get(ttl_seconds=0) == ["Lake", "Sauna"]
+
+
+def test_story_from_transcript_is_titled_and_tagged(client):
+    files = {"audio": ("story.webm", BytesIO(b"fake audio"), "audio/webm")}
+    client.post("/stories", files=files, data={"tags": json.dumps(["Lake", "Lake", "Sauna"])})
+
+    response = client.post("/stories/from-transcript", json={"transcript": SAUNA_STORY, "tags": ["Family"]})
+    assert response.status_code == status.HTTP_201_CREATED
+    story = response.json()
+    assert story["title"] == "Every Saturday my grandfather heated the sauna by the lake"
+    assert story["tags"][:3] == ["Family", "Lake", "Sauna"]
+    assert story["abstract"]
+
+
+def test_backlog_enriches_untagged_stories_in_batches(client, engine, monkeypatch):
+    monkeypatch.setattr(get_settings(), "enrichment_batch_size", 2)
+    files = {"audio": ("story.webm", BytesIO(b"fake audio"), "audio/webm")}
+    ids = [client.post("/stories", files=files).json()["id"] for _ in range(3)]
+    for story_id, text in zip(ids, [SAUNA_STORY, TRAM_STORY, SAUNA_STORY]):
+        client.put(f"/stories/{story_id}", json={"text": text})
+    client.put(f"/stories/{ids[2]}", json={"title": "Grandpa's Sauna", "tags": ["Family"]})
+
+    assert client.post("/admin/enrichment/backlog").status_code == status.HTTP_401_UNAUTHORIZED
+    first = client.post("/admin/enrichment/backlog", params={"limit": 1}, headers=ADMIN).json()
+    assert (first["enriched_stories"], first["titled_stories"], first["batches"]) == (1, 1, 1)
+    rest = client.post("/admin/enrichment/backlog", headers=ADMIN).json()
+    assert (rest["enriched_stories"], rest["titled_stories"], rest["batches"]) == (2, 1, 1)
+    assert client.post("/admin/enrichment/backlog", headers=ADMIN).json()["scanned_stories"] == 0
+
+    with Session(engine) as session:
+        stories = {story.id: story for story in session.exec(Story.__table__.select()).all()}
+    assert stories[ids[1]].title == "I met my husband on the number three tram in Helsinki"
+    assert "Tram" in stories[ids[1]].tags
+    assert stories[ids[2]].title == "Grandpa's Sauna"
+    assert stories[ids[2]].tags[0] == "Family" and "Sauna" in stories[ids[2]].tags
+    assert all(story.enriched_at is not None for story in stories.values())
+
+    # edited text goes back into the backlog
+    client.put(f"/stories/{ids[0]}", json={"text": TRAM_STORY})
+    again = client.post("/admin/enrichment/backlog", headers=ADMIN).json()
+    assert (again["scanned_stories"], again["enriched_stories"]) == (1, 1)
+
+
+def test_backlog_sends_each_batch_to_the_model_once(client, engine, monkeypatch):
+    monkeypatch.setattr(get_settings(), "enrichment_use_llm", True)
+    files = {"audio": ("story.webm", BytesIO(b"fake audio"), "audio/webm")}
+    for text in (SAUNA_STORY, TRAM_STORY):
+        story_id = client.post("/stories", files=files).json()["id"]
+        client.put(f"/stories/{story_id}", json={"text": text})
+    model = FakeModel(answer=[None, {"index": 1, "title": "The Number Three Tram", "tags": ["Love"]}])
+
+    with Session(engine) as session:
+        report = enrich_backlog(session, model)
+        assert (report.enriched_stories, len(model.calls)) == (2, 1)
+        assert session.get(Story, story_id).title == "The Number Three Tram"
+
+
+def test_backlog_skips_stories_edited_while_the_model_runs(client, engine, monkeypatch):
+    monkeypatch.setattr(get_settings(), "enrichment_use_llm", True)
+    files = {"audio": ("story.webm", BytesIO(b"fake audio"), "audio/webm")}
+    retitled, rewritten = (client.post("/stories", files=files).json()["id"] for _ in range(2))
+    for story_id in (retitled, rewritten):
+        client.put(f"/stories/{story_id}", json={"text": SAUNA_STORY})
+
+    class EditingModel(FakeModel):
+        async def enrich_stories(self, texts, vocabulary, max_tags):
+            # the storyteller saves while the upstream call is in flight
+            client.put(f"/stories/{retitled}", json={"title": "Grandpa's Sauna"})
+            client.put(f"/stories/{rewritten}", json={"text": TRAM_STORY})
+            return await super().enrich_stories(texts, vocabulary, max_tags)
+
+    with Session(engine) as session:
+        report = enrich_backlog(session, EditingModel(answer=[None, None]))
+        assert (report.enriched_stories, report.skipped_stories) == (0, 2)
+        assert session.get(Story, retitled).title == "Grandpa's Sauna"
+
+        again = enrich_backlog(session, FakeModel(answer=[None, None]))
+        assert (again.enriched_stories, again.skipped_stories) == (2, 0)
+        session.expire_all()
+        assert session.get(Story, retitled).title == "Grandpa's Sauna"
+        assert "Tram" in session.get(Story, rewritten).tags
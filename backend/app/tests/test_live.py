@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from io import BytesIO
+
+import pytest
+from fastapi import status
+from starlette.websockets import WebSocketDisconnect
+
+from ..services.live import ReactionHub
+
+
+def _create_story(client, visibility):
+    files = {"audio": ("story.webm", BytesIO(b"fake audio"), "audio/webm")}
+    story = client.post("/stories", files=files, data={"tags": json.dumps([])}).json()
+    client.put(f"/stories/{story['id']}", json={"visibility": visibility})
+    return story
+
+
+def test_hub_coalesces_reactions_from_worker_threads():
+    async def scenario():
+        hub = ReactionHub()
+        flusher = asyncio.create_task(hub.run(0.05))
+        await asyncio.sleep(0)
+        watched = hub.subscribe(1)
+
+        def burst():
+            for reaction in ("heart", "heart", "star", "heart"):
+                hub.publish(1, reaction)
+            hub.publish(2, "heart")  # nobody watches story 2
+
+        await asyncio.get_running_loop().run_in_executor(None, burst)
+        message = await asyncio.wait_for(watched.get(), timeout=5)
+        hub.unsubscribe(1, watched)
+        flusher.cancel()
+        return json.loads(message), watched.qsize(), hub.subscriber_count(1)
+
+    message, backlog, subscribers = asyncio.run(scenario())
+    assert message == {"event": "delta", "story_id": 1, "reactions": {"heart": 3, "thanks": 0, "star": 1}}
+    assert backlog == 0
+    assert subscribers == 0
+
+
+def test_live_reactions_stream_snapshot_then_deltas(client):
+    story_id = _create_story(client, "public_anon")["id"]
+    client.post(f"/stories/{story_id}/react", json={"type": "thanks", "client_token": "early"})
+
+    with client.websocket_connect(f"/stories/{story_id}/live") as socket:
+        snapshot = socket.receive_json()
+        assert snapshot == {
+            "event": "snapshot",
+            "story_id": story_id,
+            "reactions": {"heart": 0, "thanks": 1, "star": 0},
+        }
+        response = client.post(f"/stories/{story_id}/react", json={"type": "heart", "client_token": "live"})
+        assert response.status_code == status.HTTP_200_OK
+        assert socket.receive_json()["reactions"] == {"heart": 1, "thanks": 0, "star": 0}
+
+
+def test_live_reactions_follow_story_visibility(client):
+    story = _create_story(client, "private")
+    with pytest.raises(WebSocketDisconnect) as closed:
+        with client.websocket_connect(f"/stories/{story['id']}/live"):
+            pass
+    assert closed.value.code == status.WS_1008_POLICY_VIOLATION
+
+    with client.websocket_connect(f"/stories/{story['id']}/live?token={story['share_token']}") as socket:
+        assert socket.receive_json()["event"] == "snapshot"
@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import pytest
+from fastapi import status
+from sqlalchemy import create_engine, exc, text
+
+from ..services.metrics import Histogram, instrument_engine, registry
+
+
+def _sample(body: str, prefix: str) -> float:
+    for line in body.splitlines():
+        if line.startswith(prefix):
+            return float(line.rsplit(" ", 1)[1])
+    raise AssertionError(f"{prefix} not found in metrics output")
+
+
+def test_metrics_endpoint_reports_routes_and_queries(client):
+    registry.reset()
+    client.get("/stories/public")
+    client.get("/stories/12345")
+
+    response = client.get("/metrics")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"].startswith("text/plain")
+    body = response.text
+
+    assert _sample(body, 'storycircle_http_request_duration_seconds_count{method="GET",route="/stories/public",status="200"}') == 1
+    assert _sample(body, 'storycircle_http_request_duration_seconds_count{method="GET",route="/stories/{story_id}",status="404"}') == 1
+    assert _sample(body, 'storycircle_http_request_db_queries_sum{method="GET",route="/stories/public"}') >= 1
+    assert _sample(body, 'storycircle_db_query_duration_seconds_count{operation="SELECT"}') >= 2
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram("demo_seconds", "Demo.", ("route",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 5.0):
+        histogram.observe(value, route="/x")
+
+    lines = histogram.render()
+    assert 'demo_seconds_bucket{route="/x",le="0.1"} 1' in lines
+    assert 'demo_seconds_bucket{route="/x",le="1.0"} 2' in lines
+    assert 'demo_seconds_bucket{route="/x",le="+Inf"} 3' in lines
+    assert 'demo_seconds_count{route="/x"} 3' in lines
+
+
+def test_failed_query_does_not_leak_its_start_time():
+    engine = create_engine("sqlite://")
+    instrument_engine(engine)
+    with engine.connect() as conn:
+        with pytest.raises(exc.OperationalError):
+            conn.execute(text("SELECT * FROM missing_table"))
+        conn.execute(text("SELECT 1"))
+        assert conn.connection.info["storycircle_query_start"] == []
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import json
+from io import BytesIO
+
+import pytest
+
+# (method, path, json body, max statements, tables that must not be full-scanned)
+BUDGETS = [
+    pytest.param("GET", "/stories/public", None, 2, {"stories"}, id="public-feed"),
+    pytest.param("GET", "/stories/public?tag=Love", None, 2, {"stories"}, id="public-feed-tag"),
+    pytest.param("GET", "/stories/public?sort=trending", None, 2, {"stories"}, id="public-feed-trending"),
+    pytest.param("GET", "/stories/{story_id}", None, 2, {"stories"}, id="story-detail"),
+    # stories by IN, their bodies by IN (selectinload); the same two for any number of ids
+    pytest.param(
+        "POST",
+        "/stories/batch",
+        {"stories": [{"id": 1}, {"id": 2}, {"id": 3}, {"id": 999999}]},
+        2,
+        {"stories", "story_bodies"},
+        id="batch",
+    ),
+    # source story, vector-index candidates, tag-overlap candidates
+    pytest.param("GET", "/stories/{story_id}/similar", None, 3, {"stories"}, id="similar"),
+    pytest.param(
+        "POST",
+        "/stories/{story_id}/react",
+        {"type": "star", "client_token": "budget"},
+        4,
+        {"stories", "reactions"},
+        id="react",
+    ),
+    pytest.param(
+        "POST",
+        "/stories/{story_id}/report",
+        {"reason": "budget check", "client_token": "budget"},
+        4,
+        {"stories", "reports"},
+        id="report",
+    ),
+]
+
+
+def _seed_public_stories(client, count=5):
+    ids = []
+    for index in range(count):
+        files = {"audio": ("story.webm", BytesIO(b"fake audio"), "audio/webm")}
+        data = {"tags": json.dumps(["Love", f"tag-{index}"])}
+        story_id = client.post("/stories", files=files, data=data).json()["id"]
+        text = f"Story {index} about the summer cottage by the lake and the sauna."
+        client.put(f"/stories/{story_id}", json={"visibility": "public_anon", "text": text})
+        client.post(f"/stories/{story_id}/react", json={"type": "heart", "client_token": f"seed-{index}"})
+        ids.append(story_id)
+    return ids
+
+
+@pytest.mark.parametrize("method, path, body, max_queries, no_full_scan", BUDGETS)
+def test_endpoint_query_budget(client, query_budget, method, path, body, max_queries, no_full_scan):
+    story_id = _seed_public_stories(client)[0]
+    if method == "GET":
+        # budgets cover the steady state; lazy per-process caches (the vector index) load on first use
+        client.get(path.format(story_id=story_id))
+
+    with query_budget(max_queries=max_queries, no_full_scan=no_full_scan):
+        response = client.request(method, path.format(story_id=story_id), json=body)
+
+    assert response.status_code < 400
+
+
+def test_query_budget_catches_per_row_queries(client, query_budget, engine):
+    from sqlalchemy import text
+
+    with pytest.raises(pytest.fail.Exception, match="budget is 1"):
+        with query_budget(max_queries=1):
+            with engine.connect() as conn:
+                for _ in range(3):
+                    conn.execute(text("SELECT 1"))
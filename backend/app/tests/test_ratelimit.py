@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import json
+from io import BytesIO
+
+import pytest
+from fastapi import status
+
+from ..config import get_settings
+from ..services.ratelimit import Limit, MemoryBackend, sliding_window_wait
+
+
+def test_sliding_window_weights_the_previous_window():
+    # half-way through: 10 of the previous window still count as 5
+    assert sliding_window_wait(previous=10, current=4, elapsed=30, limit=10, window=60) == 0
+    # 5 + 5 leaves no room until the previous window weighs 4, six seconds later
+    assert sliding_window_wait(previous=10, current=5, elapsed=30, limit=10, window=60) == pytest.approx(6)
+    # a full current window waits for the next one and for its own decay there
+    assert sliding_window_wait(previous=0, current=10, elapsed=50, limit=10, window=60) == pytest.approx(10 + 6)
+
+
+def test_memory_backend_counts_all_limits_or_none():
+    backend = MemoryBackend()
+    client, ip = Limit("client", 2, 60), Limit("ip", 3, 60)
+    assert backend.acquire([client, ip], now=0) == 0
+    assert backend.acquire([client, ip], now=1) == 0
+    assert backend.acquire([client, ip], now=2) > 0
+    # the rejected hit was not counted against the IP
+    assert backend.acquire([Limit("other", 2, 60), ip], now=3) == 0
+    assert backend.acquire([ip], now=4) > 0
+    # two windows later everything has expired
+    assert backend.acquire([client, ip], now=125) == 0
+
+
+def test_reactions_are_throttled_before_the_database(client, query_budget, monkeypatch):
+    monkeypatch.setattr(get_settings(), "rate_limit_reactions_per_minute", 2)
+    files = {"audio": ("story.webm", BytesIO(b"fake audio"), "audio/webm")}
+    story_id = client.post("/stories", files=files, data={"tags": json.dumps([])}).json()["id"]
+
+    for reaction in ("heart", "thanks"):
+        response = client.post(f"/stories/{story_id}/react", json={"type": reaction, "client_token": "eager"})
+        assert response.status_code == status.HTTP_200_OK
+    with query_budget(max_queries=0):
+        response = client.post(f"/stories/{story_id}/react", json={"type": "star", "client_token": "eager"})
+    assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+    assert 1 <= int(response.headers["retry-after"]) <= 120
+
+    # other clients are unaffected until the shared IP limit is reached
+    response = client.post(f"/stories/{story_id}/react", json={"type": "star", "client_token": "calm"})
+    assert response.status_code == status.HTTP_200_OK
+    monkeypatch.setattr(get_settings(), "rate_limit_ip_writes_per_minute", 3)
+    response = client.post(f"/stories/{story_id}/report", json={"reason": "spam", "client_token": "calm"})
+    assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+from io import BytesIO
+
+import pytest
+from fastapi import status
+from sqlmodel import create_engine
+
+from .. import database
+from ..database import PRIMARY_STICKY_COOKIE
+
+
+@pytest.fixture()
+def lagging_replica(tmp_path):
+    """A second SQLite file with the schema but none of the primary's rows (maximum replica lag)."""
+    replica = create_engine(f"sqlite:///{tmp_path / 'replica.db'}", connect_args={"check_same_thread": False})
+    database.init_db(replica)
+    database.replica_engines = [replica]
+    yield replica
+    database.replica_engines = None
+    replica.dispose()
+
+
+def test_reads_use_replica_unless_client_just_wrote(client, lagging_replica):
+    files = {"audio": ("story.webm", BytesIO(b"fake audio"), "audio/webm")}
+    story = client.post("/stories", files=files).json()
+    published = client.put(f"/stories/{story['id']}", json={"visibility": "public_anon"})
+    assert PRIMARY_STICKY_COOKIE in published.cookies
+
+    # the writer reads its own write from the primary
+    assert [item["id"] for item in client.get("/stories/public").json()] == [story["id"]]
+    assert client.get(f"/stories/{story['id']}").status_code == status.HTTP_200_OK
+
+    # everyone else is served by the replica, which has not caught up yet
+    client.cookies.clear()
+    assert client.get("/stories/public").json() == []
+    assert client.get(f"/stories/{story['id']}").status_code == status.HTTP_404_NOT_FOUND
+    # the batch lookup is a read: served by the replica and never makes the client sticky
+    batch = client.post("/stories/batch", json={"stories": [{"id": story["id"]}]})
+    assert batch.json()["results"][0]["status"] == status.HTTP_404_NOT_FOUND
+    assert PRIMARY_STICKY_COOKIE not in batch.cookies
+
+
+def test_no_sticky_cookie_without_replicas(client):
+    files = {"audio": ("story.webm", BytesIO(b"fake audio"), "audio/webm")}
+    response = client.post("/stories", files=files)
+    assert PRIMARY_STICKY_COOKIE not in response.cookies
@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+import orjson
+from sqlalchemy import select
+from sqlmodel import Session
+
+from ..models import Story, Visibility
+from ..schemas import StoryRead
+from ..services.serialization import story_card, story_card_columns
+
+
+def test_story_card_matches_story_read(client, engine):
+    with Session(engine) as session:
+        for peaks, tags in ((bytes(range(0, 128, 2)), ["Love", "Sauna"]), (None, [])):
+            session.add(
+                Story(
+                    title="Card",
+                    audio_url="card.ogg",
+                    visibility=Visibility.public_anon,
+                    tags=tags,
+                    created_at=datetime(2025, 6, 1, 9, 30, 15, 250000),
+                    audio_duration_seconds=12.5 if peaks else None,
+                    audio_sample_rate=48000 if peaks else None,
+                    audio_peaks=peaks,
+                )
+            )
+        session.commit()
+        stories = session.exec(select(Story).order_by(Story.id)).scalars().all()
+        expected = [StoryRead.model_validate(story).model_dump(mode="json") for story in stories]
+        rows = session.exec(select(*story_card_columns()).order_by(Story.id)).all()
+
+    assert orjson.loads(orjson.dumps([story_card(row) for row in rows])) == expected
+    assert client.get("/stories/public").json() == sorted(expected, key=lambda card: card["id"], reverse=True)
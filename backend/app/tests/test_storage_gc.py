@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import fcntl
+import os
+import time
+from datetime import datetime, timedelta
+from io import BytesIO
+
+from fastapi import status
+from sqlalchemy import update
+from sqlmodel import Session
+
+from ..config import get_settings
+from ..models import Story
+from ..services.storage import LIVE_AGENT_AUDIO_URL
+from ..services.storage_gc import LAST_RUN_MARKER, QUARANTINE_DIR, RUN_LOCK, _scheduled_run, reconcile_storage
+
+ADMIN = {"x-admin-token": "test-admin"}
+
+
+def _upload(client, payload):
+    files = {"audio": ("story.webm", BytesIO(payload), "audio/webm")}
+    return client.post("/stories", files=files).json()
+
+
+def test_reconciliation_quarantines_then_deletes_dead_audio(client, engine):
+    storage_dir = get_settings().storage_dir
+    live = _upload(client, b"live audio")
+    # no file behind it: neither garbage nor missing
+    transcript = client.post("/stories/from-transcript", json={"transcript": "Once upon a time."})
+    assert transcript.json()["audio_url"] == LIVE_AGENT_AUDIO_URL
+    removed = _upload(client, b"removed audio!")
+    assert client.delete(f"/admin/stories/{removed['id']}", headers=ADMIN).status_code == status.HTTP_204_NO_CONTENT
+
+    stale, fresh = storage_dir / "story_stale.webm", storage_dir / "story_fresh.webm"
+    stale.write_bytes(b"x" * 100)
+    fresh.write_bytes(b"y" * 10)
+    two_days_ago = time.time() - 2 * 24 * 3600
+    os.utime(stale, (two_days_ago, two_days_ago))
+    (storage_dir / "README.txt").write_text("not ours")
+
+    dry = client.post("/admin/storage/reconcile", params={"dry_run": True}, headers=ADMIN).json()
+    assert (dry["scanned_files"], dry["orphaned_files"], dry["within_grace"]) == (4, 1, 2)
+    assert stale.exists()
+
+    report = client.post("/admin/storage/reconcile", headers=ADMIN).json()
+    assert (report["quarantined_files"], report["quarantined_bytes"], report["deleted_files"]) == (1, 100, 0)
+    assert not stale.exists() and (storage_dir / QUARANTINE_DIR / stale.name).exists()
+
+    # past every grace period: the fresh orphan and the removed story's audio go, quarantine is purged
+    with Session(engine) as session:
+        report = reconcile_storage(session, grace_seconds=0, quarantine_seconds=0)
+    assert report.removed_story_files == 1
+    assert (report.deleted_files, report.reclaimed_bytes) == (3, 100 + 10 + len(b"removed audio!"))
+    assert (storage_dir / live["audio_url"]).exists()
+    assert (storage_dir / "README.txt").exists()
+    assert report.missing_files == 0
+
+    (storage_dir / live["audio_url"]).unlink()
+    with Session(engine) as session:
+        assert reconcile_storage(session, dry_run=True).missing_files == 1
+
+
+def test_reconciliation_requires_admin(client):
+    assert client.post("/admin/storage/reconcile").status_code == status.HTTP_401_UNAUTHORIZED
+
+
+def test_removal_grace_counts_from_removal_not_later_edits(client, engine):
+    removed = _upload(client, b"removed audio")
+    client.delete(f"/admin/stories/{removed['id']}", headers=ADMIN)
+    with Session(engine) as session:
+        session.execute(
+            update(Story)
+            .where(Story.id == removed["id"])
+            .values(removed_at=datetime.utcnow() - timedelta(hours=48), updated_at=datetime.utcnow())
+        )
+        session.commit()
+        # a second removal (or any other write) must not restart the grace period
+        client.delete(f"/admin/stories/{removed['id']}", headers=ADMIN)
+        report = reconcile_storage(session, dry_run=True)
+    assert (report.removed_story_files, report.within_grace) == (1, 0)
+
+
+def test_scheduled_reconciliation_runs_once_per_interval(client):
+    storage_dir = get_settings().storage_dir
+    assert _scheduled_run(3600) is not None
+    assert _scheduled_run(3600) is None  # another worker ran it within the interval
+
+    os.utime(storage_dir / LAST_RUN_MARKER, (0, 0))
+    with open(storage_dir / RUN_LOCK, "a") as held:
+        fcntl.flock(held, fcntl.LOCK_EX)
+        assert _scheduled_run(3600) is None  # another worker is running it
+    assert _scheduled_run(3600) is not None
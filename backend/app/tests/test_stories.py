@@ -1,9 +1,14 @@
 from __future__ import annotations
 
 import json
+from datetime import datetime, timedelta
 from io import BytesIO
 
 from fastapi import status
+from sqlalchemy import update
+from sqlmodel import Session
+
+from ..models import Story
 
 
 def _create_story(client, tags=None):
@@ -101,3 +106,194 @@ def test_conversation_token_endpoint(client):
     payload = response.json()
     assert "token" in payload
     assert payload["token"].startswith("dev-token-agent_test")
+
+
+def _publish(client, story_id):
+    response = client.put(f"/stories/{story_id}", json={"visibility": "public_anon"})
+    assert response.status_code == status.HTTP_200_OK
+
+
+def test_reports_are_deduplicated_and_thresholds_applied(client):
+    story = _create_story(client)
+    story_id = story["id"]
+    share_token = story["share_token"]
+    _publish(client, story_id)
+
+    def _moderation_status():
+        detail = client.get(f"/stories/{story_id}", params={"token": share_token})
+        return detail.json()["moderation_status"]
+
+    for _ in range(3):
+        client.post(f"/stories/{story_id}/report", json={"reason": "spam", "client_token": "same-client"})
+    assert _moderation_status() == "flagged"
+    assert any(item["id"] == story_id for item in client.get("/stories/public").json())
+
+    client.post(f"/stories/{story_id}/report", json={"reason": "spam", "client_token": "second"})
+    client.post(f"/stories/{story_id}/report", json={"reason": "spam", "client_token": "third"})
+    assert _moderation_status() == "hidden"
+    assert all(item["id"] != story_id for item in client.get("/stories/public").json())
+
+    reports = client.get("/admin/reports", headers={"x-admin-token": "test-admin"}).json()
+    assert len(reports) == 3
+
+
+def test_moderation_queue_orders_by_report_velocity(client, engine):
+    quiet = _create_story(client)["id"]
+    busy = _create_story(client)["id"]
+    client.post(f"/stories/{quiet}/report", json={"reason": "spam", "client_token": "a"})
+    for token in ["a", "b"]:
+        client.post(f"/stories/{busy}/report", json={"reason": "spam", "client_token": token})
+
+    queue = client.get("/admin/queue", headers={"x-admin-token": "test-admin"})
+    assert queue.status_code == status.HTTP_200_OK
+    items = queue.json()
+    assert [item["story_id"] for item in items] == [busy, quiet]
+    assert items[0]["report_count"] == 2
+    assert items[0]["open_reports"] == 2
+
+    # five reports spread over ten hours are less urgent than one in the last hour
+    stale = _create_story(client)["id"]
+    for token in "abcde":
+        client.post(f"/stories/{stale}/report", json={"reason": "spam", "client_token": token})
+    with Session(engine) as session:
+        session.execute(
+            update(Story).where(Story.id == stale).values(first_reported_at=datetime.utcnow() - timedelta(hours=10))
+        )
+        session.commit()
+    items = client.get("/admin/queue", params={"limit": 2}, headers={"x-admin-token": "test-admin"}).json()
+    assert [item["story_id"] for item in items] == [busy, quiet]
+    assert items[1]["reports_per_hour"] == 1.0
+    items = client.get("/admin/queue", headers={"x-admin-token": "test-admin"}).json()
+    assert items[-1]["story_id"] == stale and items[-1]["reports_per_hour"] == 0.5
+
+
+def test_public_feed_filters_tags_and_paginates_in_sql(client):
+    ids = []
+    for tags in (["Love"], ["War"], ["Love", "Sauna"]):
+        story_id = _create_story(client, tags=tags)["id"]
+        _publish(client, story_id)
+        ids.append(story_id)
+
+    tagged = client.get("/stories/public", params={"tag": "Love"}).json()
+    assert {item["id"] for item in tagged} == {ids[0], ids[2]}
+
+    second_page = client.get("/stories/public", params={"tag": "Love", "size": 1, "page": 2}).json()
+    assert len(second_page) == 1
+    assert second_page[0]["id"] in {ids[0], ids[2]}
+
+    similar = client.get(f"/stories/{ids[2]}/similar").json()["stories"]
+    assert [item["id"] for item in similar] == [ids[0]]
+
+
+def test_story_text_is_stored_compressed_and_kept_out_of_the_feed(client, engine, query_budget):
+    from sqlalchemy import text as sql
+
+    body = "We rowed across the lake to grandmother's island every summer. " * 40
+    story_id = _create_story(client)["id"]
+    _publish(client, story_id)
+    assert client.put(f"/stories/{story_id}", json={"text": body}).json()["text"] == body
+    assert client.get(f"/stories/{story_id}").json()["text"] == body
+
+    with engine.connect() as conn:
+        stored = conn.execute(sql("SELECT text FROM story_bodies WHERE story_id = :id"), {"id": story_id}).scalar_one()
+    assert len(stored) < len(body) // 10
+
+    with query_budget(max_queries=2) as recorder:
+        client.get("/stories/public")
+    assert not any("story_bodies" in statement for statement, _, _ in recorder.statements)
+
+
+def test_similar_stories_blend_text_similarity_with_case_insensitive_tags(client):
+    texts = {
+        "sauna": "Every Saturday grandfather heated the lakeside sauna and we swam in the cold lake after.",
+        "sauna_again": "The smoke sauna by the lake took all day to heat; after the steam we swam in the lake.",
+        "tram": "I drove the number three tram through Helsinki for thirty years, night shifts mostly.",
+    }
+    ids = {}
+    for key, text in texts.items():
+        story_id = _create_story(client, tags=["love"] if key == "tram" else [])["id"]
+        client.put(f"/stories/{story_id}", json={"visibility": "public_anon", "text": text})
+        ids[key] = story_id
+    tagged = _create_story(client, tags=["Love"])["id"]
+    _publish(client, tagged)
+
+    # no tags at all: found through the text alone, the unrelated story is not suggested
+    similar = client.get(f"/stories/{ids['sauna']}/similar").json()["stories"]
+    assert [item["id"] for item in similar] == [ids["sauna_again"]]
+
+    # "Love" and "love" are the same tag
+    similar = client.get(f"/stories/{tagged}/similar").json()["stories"]
+    assert [item["id"] for item in similar] == [ids["tram"]]
+
+    # every text was embedded when written: the backfill has nothing to do
+    backfill = client.post("/admin/embeddings/backfill", headers={"x-admin-token": "test-admin"})
+    assert backfill.json() == {"embedded_stories": 0}
+
+
+def test_trending_feed_ranks_by_decayed_reactions(client, engine):
+    from ..services.trending import HALF_LIFE_HOURS, score_for
+
+    quiet, popular, newest = (_create_story(client)["id"] for _ in range(3))
+    for story_id in (quiet, popular, newest):
+        _publish(client, story_id)
+    for token in ("a", "b", "c"):
+        client.post(f"/stories/{popular}/react", json={"type": "heart", "client_token": token})
+
+    trending = [item["id"] for item in client.get("/stories/public", params={"sort": "trending"}).json()]
+    assert trending == [popular, newest, quiet]
+    recent = [item["id"] for item in client.get("/stories/public").json()]
+    assert recent == [newest, popular, quiet]
+
+    # three reactions two days ago weigh less than one reaction now
+    now = datetime(2026, 3, 1)
+    two_days = timedelta(hours=2 * HALF_LIFE_HOURS)
+    stale = score_for(now - 2 * two_days, [now - two_days] * 3)
+    fresh = score_for(now - 2 * two_days, [now])
+    assert stale < fresh
+    assert client.post("/stories/999999/react", json={"type": "heart"}).status_code == status.HTTP_404_NOT_FOUND
+
+    # five reactions three days ago (5/8 of one today) still beat a story nobody has reacted to yet
+    three_days_ago = datetime.utcnow() - timedelta(hours=3 * HALF_LIFE_HOURS)
+    with Session(engine) as session:
+        session.execute(
+            update(Story)
+            .where(Story.id == quiet)
+            .values(created_at=three_days_ago, trending_score=score_for(three_days_ago, [three_days_ago] * 5))
+        )
+        session.commit()
+    unreacted = _create_story(client)["id"]
+    _publish(client, unreacted)
+    trending = [item["id"] for item in client.get("/stories/public", params={"sort": "trending"}).json()]
+    assert trending.index(quiet) < trending.index(unreacted)
+
+
+def test_batch_fetch_applies_visibility_per_item_in_request_order(client):
+    public = _create_story(client)
+    _publish(client, public["id"])
+    private = _create_story(client)
+    client.put(f"/stories/{private['id']}", json={"text": "Only for family."})
+
+    response = client.post(
+        "/stories/batch",
+        json={
+            "stories": [
+                {"id": private["id"]},
+                {"id": 999999},
+                {"id": public["id"]},
+                {"id": private["id"], "token": private["share_token"]},
+            ]
+        },
+    )
+    assert response.status_code == status.HTTP_200_OK
+    results = response.json()["results"]
+    assert [(item["id"], item["status"]) for item in results] == [
+        (private["id"], status.HTTP_403_FORBIDDEN),
+        (999999, status.HTTP_404_NOT_FOUND),
+        (public["id"], status.HTTP_200_OK),
+        (private["id"], status.HTTP_200_OK),
+    ]
+    assert results[0]["story"] is None and results[0]["detail"] == "Story is restricted"
+    assert results[2]["story"] == client.get(f"/stories/{public['id']}").json()
+    assert results[3]["story"]["text"] == "Only for family."
+
+    assert client.post("/stories/batch", json={"stories": []}).status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
@@ -0,0 +1 @@
+"""Reproducible load/latency benchmarks for the StoryCircle API (see "Benchmarks" in backend/README.md)."""
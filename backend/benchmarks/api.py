@@ -0,0 +1,275 @@
+"""Seed a synthetic corpus and measure API throughput and latency under concurrency.
+
+Usage (from ``backend/``)::
+
+    python -m benchmarks.api --stories 5000 --requests 500 --concurrency 8 --output bench.json
+    python -m benchmarks.api --compare bench-main.json --output bench-branch.json
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import math
+import platform
+import random
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import httpx
+from sqlmodel import Session, SQLModel, create_engine
+
+from app import database
+from app.config import get_settings
+from app.database import get_session
+from app.main import create_app
+from app.services.elevenlabs import ElevenLabsService, get_elevenlabs_service
+from app.services.openai_story import OpenAIStoryService, get_openai_story_service
+
+from .seed import SeedConfig, SeededCorpus, seed_corpus
+
+
+Scenario = Callable[[httpx.AsyncClient, random.Random, SeededCorpus, int], Awaitable[httpx.Response]]
+AUDIO_PAYLOAD = bytes(range(256)) * 256  # 64 KiB of fake audio
+
+
+async def _public_feed(client, rng, corpus, index):
+    return await client.get("/stories/public", params={"page": rng.randint(1, 5), "size": 20})
+
+
+async def _public_feed_by_tag(client, rng, corpus, index):
+    return await client.get("/stories/public", params={"tag": rng.choice(corpus.tags), "size": 20})
+
+
+async def _public_feed_trending(client, rng, corpus, index):
+    return await client.get("/stories/public", params={"sort": "trending", "page": rng.randint(1, 5), "size": 20})
+
+
+async def _similar_stories(client, rng, corpus, index):
+    return await client.get(f"/stories/{rng.choice(corpus.public_ids)}/similar")
+
+
+async def _story_batch(client, rng, corpus, index):
+    # a favourites list: mostly public stories, a few the caller has no token for
+    ids = rng.sample(corpus.public_ids, 18) + rng.sample(corpus.story_ids, 2)
+    return await client.post("/stories/batch", json={"stories": [{"id": story_id} for story_id in ids]})
+
+
+async def _react(client, rng, corpus, index):
+    payload = {"type": rng.choice(["heart", "thanks", "star"]), "client_token": f"bench-{index}"}
+    return await client.post(f"/stories/{rng.choice(corpus.public_ids)}/react", json=payload)
+
+
+async def _upload(client, rng, corpus, index):
+    files = {"audio": ("story.webm", AUDIO_PAYLOAD, "audio/webm")}
+    data = {"age_range": "70-79", "city": "Helsinki", "tags": json.dumps(rng.sample(corpus.tags, 2))}
+    return await client.post("/stories", files=files, data=data)
+
+
+SCENARIOS: Dict[str, Scenario] = {
+    "public_feed": _public_feed,
+    "public_feed_tag": _public_feed_by_tag,
+    "public_feed_trending": _public_feed_trending,
+    "similar_stories": _similar_stories,
+    "story_batch": _story_batch,
+    "react": _react,
+    "upload": _upload,
+}
+
+
+@dataclass
+class ScenarioResult:
+    requests: int
+    errors: int
+    concurrency: int
+    wall_seconds: float
+    throughput_rps: float
+    mean_ms: float
+    p50_ms: float
+    p99_ms: float
+    max_ms: float
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an unsorted sample list."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(math.ceil(pct / 100 * len(ordered)) - 1, 0)
+    return ordered[min(rank, len(ordered) - 1)]
+
+
+async def _run_scenario(
+    client: httpx.AsyncClient,
+    scenario: Scenario,
+    corpus: SeededCorpus,
+    requests: int,
+    concurrency: int,
+    seed: int,
+) -> ScenarioResult:
+    rng = random.Random(seed)
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    errors = 0
+
+    async def _one(index: int) -> None:
+        nonlocal errors
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                response = await scenario(client, rng, corpus, index)
+                if response.status_code >= 400:
+                    errors += 1
+            except Exception:  # pragma: no cover - surfaced as an error count
+                errors += 1
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(_one(index) for index in range(requests)))
+    wall = time.perf_counter() - started
+    return ScenarioResult(
+        requests=requests,
+        errors=errors,
+        concurrency=concurrency,
+        wall_seconds=round(wall, 4),
+        throughput_rps=round(requests / wall, 2) if wall else 0.0,
+        mean_ms=round(sum(latencies) / len(latencies), 3) if latencies else 0.0,
+        p50_ms=round(percentile(latencies, 50), 3),
+        p99_ms=round(percentile(latencies, 99), 3),
+        max_ms=round(max(latencies), 3) if latencies else 0.0,
+    )
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run_benchmarks(
+    workdir: Path,
+    seed_config: SeedConfig,
+    requests: int,
+    concurrency: int,
+    scenarios: List[str],
+) -> dict:
+    engine = create_engine(f"sqlite:///{workdir / 'bench.db'}", connect_args={"check_same_thread": False})
+    database.install_sqlite_functions(engine)
+    SQLModel.metadata.create_all(engine)
+    seed_started = time.perf_counter()
+    corpus = seed_corpus(engine, seed_config)
+    seed_seconds = time.perf_counter() - seed_started
+
+    previous_engine = database.db_engine
+    settings = get_settings()
+    previous_storage = settings.storage_dir
+    previous_ip_limit = settings.rate_limit_ip_writes_per_minute
+    database.db_engine = engine
+    settings.storage_dir = workdir / "audio"
+    # all benchmark traffic comes from one address; the per-token write limits still apply
+    settings.rate_limit_ip_writes_per_minute = 0
+    settings.storage_dir.mkdir(parents=True, exist_ok=True)
+    try:
+        app = create_app()
+
+        def _session_override():
+            with Session(engine) as session:
+                yield session
+
+        # never hit the network: the services fall back to deterministic stubs without keys
+        app.dependency_overrides[get_session] = _session_override
+        app.dependency_overrides[get_elevenlabs_service] = lambda: ElevenLabsService("")
+        app.dependency_overrides[get_openai_story_service] = lambda: OpenAIStoryService("", "stub", "low")
+
+        results = {}
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for offset, name in enumerate(scenarios):
+                # one unmeasured request per scenario warms caches and lazy imports
+                await SCENARIOS[name](client, random.Random(0), corpus, -1)
+                result = await _run_scenario(
+                    client, SCENARIOS[name], corpus, requests, concurrency, seed_config.seed + offset
+                )
+                results[name] = asdict(result)
+    finally:
+        database.db_engine = previous_engine
+        settings.storage_dir = previous_storage
+        settings.rate_limit_ip_writes_per_minute = previous_ip_limit
+        engine.dispose()
+
+    return {
+        "meta": {
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "seed": asdict(seed_config),
+            "requests_per_scenario": requests,
+            "concurrency": concurrency,
+            "seed_seconds": round(seed_seconds, 3),
+        },
+        "scenarios": results,
+    }
+
+
+def compare_reports(baseline: dict, current: dict, tolerance: float) -> List[str]:
+    """Return human-readable regressions where current is worse than baseline beyond ``tolerance``."""
+    regressions = []
+    for name, result in current["scenarios"].items():
+        before = baseline.get("scenarios", {}).get(name)
+        if not before:
+            continue
+        if before["p99_ms"] and result["p99_ms"] > before["p99_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p99 {before['p99_ms']:.2f} -> {result['p99_ms']:.2f} ms")
+        if before["throughput_rps"] and result["throughput_rps"] < before["throughput_rps"] * (1 - tolerance):
+            regressions.append(
+                f"{name}: throughput {before['throughput_rps']:.1f} -> {result['throughput_rps']:.1f} req/s"
+            )
+        if result["errors"] > before["errors"]:
+            regressions.append(f"{name}: errors {before['errors']} -> {result['errors']}")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--stories", type=int, default=SeedConfig.stories)
+    parser.add_argument("--reactions-per-story", type=int, default=SeedConfig.reactions_per_story)
+    parser.add_argument("--requests", type=int, default=300, help="requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS), help="repeatable; default all")
+    parser.add_argument("--seed", type=int, default=SeedConfig.seed)
+    parser.add_argument("--output", type=Path, help="write the JSON report here")
+    parser.add_argument("--compare", type=Path, help="baseline JSON report to diff against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative regression (0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    seed_config = SeedConfig(stories=args.stories, reactions_per_story=args.reactions_per_story, seed=args.seed)
+    with tempfile.TemporaryDirectory(prefix="storycircle-bench-") as workdir:
+        report = asyncio.run(
+            run_benchmarks(Path(workdir), seed_config, args.requests, args.concurrency, args.scenario or list(SCENARIOS))
+        )
+
+    rendered = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        args.output.write_text(rendered + "\n")
+    print(rendered)
+
+    if args.compare:
+        regressions = compare_reports(json.loads(args.compare.read_text()), report, args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
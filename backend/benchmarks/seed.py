@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import random
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import List
+
+from sqlalchemy import bindparam, insert, select, update
+from sqlalchemy.engine import Engine
+from sqlmodel import Session
+
+from app.models import ModerationStatus, Reaction, ReactionType, Report, Story, StoryBody, StoryEmbedding, Visibility
+from app.services.compression import DEFAULT_CODEC, compress_text
+from app.services.embeddings import HashingEmbedder
+from app.services.security import hash_client_token, make_share_token
+from app.services.trending import score_for
+
+
+TAG_VOCABULARY = [
+    "Love", "love", "War", "Migration", "City Life", "Childhood", "Family", "Work", "Music", "Food",
+    "Travel", "School", "Winter", "Summer", "Sauna", "Lake", "Farm", "Friendship", "Loss", "Humor",
+    "Dance", "Church", "Radio", "Tram", "Harbour", "Forest", "Wedding", "Sports", "Crafts", "Books",
+]
+WORDS = (
+    "we lived by the lake and every summer my father rowed us across to the island where grandmother "
+    "kept bees baked rye bread and told stories about the war the winters were long and the trams "
+    "rattled through the city while my mother sang in the church choir and i learned to dance"
+).split()
+
+
+@dataclass
+class SeedConfig:
+    stories: int = 2000
+    reactions_per_story: int = 5
+    reports_per_story: float = 0.1
+    public_ratio: float = 0.7
+    text_words: int = 600
+    seed: int = 2025
+
+
+@dataclass
+class SeededCorpus:
+    story_ids: List[int] = field(default_factory=list)
+    public_ids: List[int] = field(default_factory=list)
+    tags: List[str] = field(default_factory=lambda: list(TAG_VOCABULARY))
+
+
+def _text(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+
+def seed_corpus(engine: Engine, config: SeedConfig, batch_size: int = 1000) -> SeededCorpus:
+    """Bulk-insert a synthetic corpus of stories, reactions and reports."""
+    rng = random.Random(config.seed)
+    now = datetime.utcnow()
+    embedder = HashingEmbedder()
+    with Session(engine) as session:
+        for offset in range(0, config.stories, batch_size):
+            rows = []
+            texts = []
+            for index in range(offset, min(offset + batch_size, config.stories)):
+                text = _text(rng, config.text_words)
+                texts.append(text)
+                created_at = now - timedelta(minutes=rng.randint(0, 90 * 24 * 60))
+                rows.append(
+                    {
+                        "title": f"Story {index}",
+                        "abstract": text[:200],
+                        "audio_url": f"seed_{index}.webm",
+                        "visibility": Visibility.public_anon if rng.random() < config.public_ratio else Visibility.private,
+                        "age_range": rng.choice(["60-69", "70-79", "80-89"]),
+                        "city": rng.choice(["Helsinki", "Espoo", "Tampere", "Turku"]),
+                        "tags": rng.sample(TAG_VOCABULARY, rng.randint(0, 4)),
+                        "share_token": make_share_token(),
+                        "moderation_status": ModerationStatus.ok,
+                        "created_at": created_at,
+                        "trending_score": score_for(created_at, []),
+                        "updated_at": now,
+                    }
+                )
+            inserted = session.execute(insert(Story).returning(Story.id, sort_by_parameter_order=True), rows)
+            story_ids = inserted.scalars().all()
+            bodies = []
+            for story_id, text in zip(story_ids, texts):
+                blob = compress_text(text)
+                bodies.append({"story_id": story_id, "codec": DEFAULT_CODEC, "text": blob, "raw_transcript": blob})
+            session.execute(insert(StoryBody), bodies)
+            embeddings = [
+                {"story_id": story_id, "model": embedder.name, "vector": vector.tobytes(), "updated_at": now}
+                for story_id, vector in zip(story_ids, embedder.embed(texts))
+            ]
+            session.execute(insert(StoryEmbedding), embeddings)
+        session.commit()
+
+        corpus = SeededCorpus()
+        created = {}
+        for story_id, visibility, created_at in session.execute(select(Story.id, Story.visibility, Story.created_at)):
+            corpus.story_ids.append(story_id)
+            created[story_id] = created_at
+            if visibility == Visibility.public_anon:
+                corpus.public_ids.append(story_id)
+
+        reaction_types = list(ReactionType)
+        reactions = []
+        reports = []
+        scores = []
+        for story_id in corpus.story_ids:
+            reacted_at = sorted(
+                now - timedelta(minutes=rng.randint(0, 7 * 24 * 60))
+                for _ in range(rng.randint(0, 2 * config.reactions_per_story))
+            )
+            for index, created_at in enumerate(reacted_at):
+                reactions.append(
+                    {
+                        "story_id": story_id,
+                        "type": rng.choice(reaction_types),
+                        "client_hash": hash_client_token(f"seed-listener-{index}"),
+                        "created_at": created_at,
+                    }
+                )
+            scores.append({"story_id": story_id, "score": score_for(created[story_id], reacted_at)})
+            if rng.random() < config.reports_per_story:
+                reports.append(
+                    {
+                        "story_id": story_id,
+                        "reason": "seeded report",
+                        "client_hash": hash_client_token(f"seed-reporter-{story_id}"),
+                        "created_at": now,
+                    }
+                )
+        for chunk_start in range(0, len(reactions), batch_size):
+            session.execute(insert(Reaction), reactions[chunk_start:chunk_start + batch_size])
+        if reports:
+            session.execute(insert(Report), reports)
+        session.connection().execute(
+            update(Story.__table__)
+            .where(Story.__table__.c.id == bindparam("story_id"))
+            .values(trending_score=bindparam("score")),
+            scores,
+        )
+        session.commit()
+    return corpus
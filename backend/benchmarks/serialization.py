@@ -0,0 +1,137 @@
+"""Per-page cost of encoding the public feed, without a database or HTTP in the way.
+
+Compares the path list endpoints used to take (one ``StoryRead.model_validate`` per row, then
+FastAPI's ``response_model`` validation and serialization, then ``json.dumps``) with the row
+fast path (``story_card`` dicts encoded by orjson) and a single ``TypeAdapter`` pass.
+
+Usage (from ``backend/``)::
+
+    python -m benchmarks.serialization --page-size 100 --runs 300 --output serialization.json
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import orjson
+import pydantic
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.utils import create_response_field
+from pydantic import TypeAdapter
+
+from app.models import Story, Visibility
+from app.schemas import StoryRead
+from app.services.serialization import STORY_CARD_FIELDS, story_card, story_card_columns
+from benchmarks.seed import TAG_VOCABULARY, WORDS
+
+
+STORY_LIST = TypeAdapter(List[StoryRead])
+# what FastAPI builds once per route from response_model=List[StoryRead]
+RESPONSE_FIELD = create_response_field(name="Response_get_public_stories", type_=List[StoryRead])
+
+
+def build_page(size: int, seed: int = 2025) -> Tuple[List[Story], List[tuple]]:
+    """``size`` detached stories shaped like feed cards, and the same data as selected rows."""
+    rng = random.Random(seed)
+    now = datetime(2025, 11, 20, 12, 0, 0, 123456)
+    stories = []
+    for index in range(size):
+        stories.append(
+            Story(
+                id=index + 1,
+                title=f"Story {index}",
+                abstract=" ".join(rng.choice(WORDS) for _ in range(35))[:200],
+                audio_url=f"seed_{index}.ogg",
+                visibility=Visibility.public_anon,
+                age_range="70-79",
+                city="Helsinki",
+                tags=rng.sample(TAG_VOCABULARY, rng.randint(0, 4)),
+                created_at=now - timedelta(minutes=rng.randint(0, 90 * 24 * 60)),
+                audio_duration_seconds=round(rng.uniform(30, 600), 3),
+                audio_sample_rate=48000,
+                audio_peaks=bytes(rng.randrange(128) for _ in range(128)),
+            )
+        )
+    columns = [column.key for column in story_card_columns()]
+    rows = [tuple(getattr(story, column) for column in columns) for story in stories]
+    return stories, rows
+
+
+def encode_models(stories: List[Story]) -> bytes:
+    models = [StoryRead.model_validate(story) for story in stories]
+    value, _ = RESPONSE_FIELD.validate(models, {}, loc=("response",))
+    return JSONResponse(RESPONSE_FIELD.serialize(value, mode="json", by_alias=True)).body
+
+
+def encode_rows(rows: List[tuple]) -> bytes:
+    return ORJSONResponse([story_card(row) for row in rows]).body
+
+
+def encode_type_adapter(stories: List[Story]) -> bytes:
+    return STORY_LIST.dump_json(STORY_LIST.validate_python(stories, from_attributes=True))
+
+
+def measure(encode: Callable[[], bytes], runs: int) -> Dict[str, float]:
+    for _ in range(min(runs, 20)):
+        encode()
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        payload = encode()
+        samples.append((time.perf_counter() - started) * 1e6)
+    samples.sort()
+    return {
+        "median_us": round(statistics.median(samples), 1),
+        "p99_us": round(samples[min(len(samples) - 1, int(len(samples) * 0.99))], 1),
+        "bytes": len(payload),
+    }
+
+
+def run(page_size: int, runs: int) -> dict:
+    stories, rows = build_page(page_size)
+    paths = {
+        "models": lambda: encode_models(stories),
+        "rows_orjson": lambda: encode_rows(rows),
+        "type_adapter": lambda: encode_type_adapter(stories),
+    }
+    # every path must produce the same document, or the comparison is meaningless
+    documents = {name: json.loads(encode()) for name, encode in paths.items()}
+    if any(document != documents["models"] for document in documents.values()):
+        raise AssertionError("serialization paths disagree")
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "pydantic": pydantic.VERSION,
+            "orjson": orjson.__version__,
+            "page_size": page_size,
+            "runs": runs,
+            "fields": list(STORY_CARD_FIELDS),
+        },
+        "paths": {name: measure(encode, runs) for name, encode in paths.items()},
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--runs", type=int, default=300)
+    parser.add_argument("--output", type=Path)
+    args = parser.parse_args(argv)
+
+    report = run(args.page_size, args.runs)
+    rendered = json.dumps(report, indent=2, sort_keys=True)
+    print(rendered)
+    if args.output:
+        args.output.write_text(rendered + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,112 @@
+"""Measure cold-start cost: importing ``app.main`` and spawning a uvicorn worker until it answers.
+
+Usage (from ``backend/``)::
+
+    python -m benchmarks.startup --runs 5 --output startup.json
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import httpx
+
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _env(workdir: Path) -> Dict[str, str]:
+    env = dict(os.environ)
+    env["STORYCIRCLE_DATABASE_URL"] = f"sqlite:///{workdir / 'startup.db'}"
+    env["STORYCIRCLE_STORAGE_DIR"] = str(workdir / "audio")
+    return env
+
+
+def measure_import(workdir: Path) -> float:
+    """Seconds for a fresh interpreter to import ``app.main`` (interpreter start-up excluded)."""
+    code = "import time; t = time.perf_counter(); import app.main; print(time.perf_counter() - t)"
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=BACKEND_DIR, env=_env(workdir), capture_output=True, text=True, check=True
+    )
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def measure_worker_spawn(workdir: Path, timeout: float = 30.0) -> float:
+    """Seconds from spawning ``uvicorn app.main:app`` until ``GET /`` returns 200."""
+    port = _free_port()
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR,
+        env=_env(workdir),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            try:
+                if httpx.get(f"http://127.0.0.1:{port}/", timeout=0.5).status_code == 200:
+                    return time.perf_counter() - started
+            except httpx.TransportError:
+                pass
+            time.sleep(0.01)
+        raise TimeoutError("uvicorn did not become ready")
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+
+def _summary(samples: List[float]) -> dict:
+    return {
+        "runs": len(samples),
+        "median_ms": round(statistics.median(samples) * 1000, 1),
+        "min_ms": round(min(samples) * 1000, 1),
+        "max_ms": round(max(samples) * 1000, 1),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--output", type=Path)
+    args = parser.parse_args(argv)
+
+    imports: List[float] = []
+    first_boot: List[float] = []
+    warm_boot: List[float] = []
+    for _ in range(args.runs):
+        # fresh database each run: the first boot pays for schema creation, the second should not
+        with tempfile.TemporaryDirectory(prefix="storycircle-startup-") as workdir:
+            imports.append(measure_import(Path(workdir)))
+            first_boot.append(measure_worker_spawn(Path(workdir)))
+            warm_boot.append(measure_worker_spawn(Path(workdir)))
+
+    report = {
+        "import_app_main": _summary(imports),
+        "worker_spawn_fresh_db": _summary(first_boot),
+        "worker_spawn_existing_db": _summary(warm_boot),
+    }
+    rendered = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        args.output.write_text(rendered + "\n")
+    print(rendered)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())